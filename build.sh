@@ -4,5 +4,5 @@ set -o errexit
 
 pip install -r requirements.txt
 
-python manage.py collectstatic --no-input
+SHELTER_MANIFEST_STATIC=1 python manage.py build_assets
 python manage.py migrate
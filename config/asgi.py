@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SHELTER_ASYNC_VIEWS", "1")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once get_asgi_application() has set Django up.
+from shelter.assets import ASGIStaticFiles  # noqa: E402
+
+# Static files are served here, outside Django's middleware chain, so the
+# chain stays async (see MIDDLEWARE in config/settings.py).
+application = ASGIStaticFiles(django_application)
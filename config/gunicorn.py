@@ -0,0 +1,37 @@
+# gunicorn -c config/gunicorn.py config.wsgi:application
+#
+# The sync deployment; config/gunicorn_asgi.py is the ASGI one. Each worker
+# process serves a few requests at a time on its threads.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+max_requests = 1000
+max_requests_jitter = 100
+
+# As under ASGI, the workers share their Prometheus samples through files in
+# this directory, so /metrics reports the totals of all workers rather than of
+# whichever one answered the scrape.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "shelter-metrics")
+)
+
+
+def on_starting(server):
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
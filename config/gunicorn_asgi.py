@@ -0,0 +1,38 @@
+# gunicorn -c config/gunicorn_asgi.py config.asgi:application
+#
+# Each uvicorn worker runs an event loop, so slow clients and keep-alive
+# connections wait on the loop instead of occupying a worker process.
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+keepalive = 5
+backlog = 2048
+timeout = 60
+graceful_timeout = 30
+max_requests = 1000
+max_requests_jitter = 100
+
+# Workers write their Prometheus samples to mmap'd files in this directory and
+# /metrics merges them (shelter/metrics.py). It has to be set before the
+# workers import prometheus_client.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "shelter-metrics")
+)
+
+
+def on_starting(server):
+    # Files left by a previous run would add their counts to this one.
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 import dj_database_url
 from pathlib import Path
 from dotenv import load_dotenv
@@ -50,15 +51,19 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "shelter",
-    "debug_toolbar",
     "crispy_forms",
     "crispy_bootstrap5",
 ]
 
+# Serve the read-heavy pages with the async views in shelter/async_views.py.
+# config/asgi.py turns this on; WSGI workers keep the sync views.
+SHELTER_ASYNC_VIEWS = os.getenv("SHELTER_ASYNC_VIEWS", "0") == "1"
+
 MIDDLEWARE = [
+    "shelter.middleware.PerformanceMiddleware",
+    "shelter.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,11 +72,25 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("whitenoise.middleware.WhiteNoiseMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
+# WhiteNoise's middleware is sync-only and would make Django run the whole
+# chain, async views included, in a thread. Under ASGI config/asgi.py serves
+# static files in front of Django instead (shelter.assets.ASGIStaticFiles).
+# The debug toolbar is sync-only too, so DEBUG keeps the chain sync.
+if SHELTER_ASYNC_VIEWS:
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "shelter.profiling.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -98,6 +117,56 @@ DATABASES = {
     )
 }
 
+# Embedded SQLite profile for single-box shelters: sqlite:// URLs use a
+# backend that can take the write lock up front (shelter/transactions.py), and
+# every new SQLite connection gets these PRAGMAs (shelter/signals.py).
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["ENGINE"] = "shelter.sqlite_backend"
+
+SHELTER_SQLITE_PRAGMAS = {
+    # Readers don't block the writer and vice versa.
+    "journal_mode": "wal",
+    # In WAL mode a power loss can drop the last commits but not corrupt.
+    "synchronous": "normal",
+    "mmap_size": int(os.getenv("SHELTER_SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    # Negative sizes are in KiB: 64 MiB of page cache per connection.
+    "cache_size": -64000,
+    "busy_timeout": int(os.getenv("SHELTER_SQLITE_BUSY_TIMEOUT", "5000")),
+    "temp_store": "memory",
+}
+
+# Read replicas (shelter/db_router.py): a comma-separated list of database
+# URLs, added as "replica1", "replica2", ... Tests read them from "default".
+# A replica that stopped answering costs a request at most
+# SHELTER_REPLICA_CONNECT_TIMEOUT seconds per health interval.
+SHELTER_REPLICA_CONNECT_TIMEOUT = int(os.getenv("SHELTER_REPLICA_CONNECT_TIMEOUT", "2"))
+for number, url in enumerate(
+    filter(None, os.getenv("REPLICA_DATABASE_URLS", "").split(",")), start=1
+):
+    replica = dj_database_url.parse(url, conn_max_age=600)
+    if replica["ENGINE"] != "django.db.backends.sqlite3":
+        replica.setdefault("OPTIONS", {})
+        replica["OPTIONS"]["connect_timeout"] = SHELTER_REPLICA_CONNECT_TIMEOUT
+    DATABASES[f"replica{number}"] = {**replica, "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["shelter.db_router.ReplicaRouter"]
+
+SHELTER_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+# Seconds a client keeps reading from the primary after a write.
+SHELTER_REPLICA_STICKY_SECONDS = int(os.getenv("SHELTER_REPLICA_STICKY_SECONDS", "15"))
+SHELTER_REPLICA_HEALTH_INTERVAL = 30
+# PostgreSQL replicas further behind than this many seconds are skipped.
+SHELTER_REPLICA_MAX_LAG = 30
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -141,6 +210,77 @@ STATICFILES_DIRS = (BASE_DIR / "static",)
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Uploaded dog photos, stored under content-hash names and served by
+# shelter.views.PhotoFileView with long-lived caching.
+MEDIA_URL = "/media/"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", BASE_DIR / "media")
+
+# Widths of the resized copies "manage.py process_photos" renders, each as
+# JPEG and WebP. The smallest is the dog list thumbnail.
+SHELTER_PHOTO_WIDTHS = [320, 800, 1600]
+SHELTER_PHOTO_MAX_BYTES = 20 * 1024 * 1024
+# Parts of chunked uploads; the hourly purge-photo-uploads job deletes the
+# ones abandoned for a day, so run_worker must see the same directory.
+SHELTER_PHOTO_UPLOAD_DIR = os.getenv(
+    "SHELTER_PHOTO_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "shelter-uploads")
+)
+# Photos claimed by a worker that died are picked up again after this long.
+SHELTER_PHOTO_CLAIM_TIMEOUT = 10 * 60
+
+# Background jobs (shelter/jobs.py), run by "manage.py run_worker". Failed
+# jobs are retried after SHELTER_JOB_RETRY_DELAY seconds, doubling up to the
+# maximum. Workers refresh the claims of their running jobs every
+# SHELTER_JOB_HEARTBEAT seconds; jobs whose worker died are taken over after
+# SHELTER_JOB_TIMEOUT, or failed if that was their last attempt.
+SHELTER_JOB_CONCURRENCY = int(os.getenv("SHELTER_JOB_CONCURRENCY", "4"))
+SHELTER_JOB_MAX_ATTEMPTS = 3
+SHELTER_JOB_RETRY_DELAY = 10
+SHELTER_JOB_MAX_RETRY_DELAY = 60 * 60
+SHELTER_JOB_TIMEOUT = 30 * 60
+SHELTER_JOB_HEARTBEAT = 60
+# Enqueued by the workers at every minute their cron expression matches,
+# in TIME_ZONE.
+SHELTER_PERIODIC_JOBS = {
+    "rebuild-counters": {"task": "shelter.rebuild_counters", "cron": "15 3 * * *"},
+    "rebuild-vaccination-schedule": {
+        "task": "shelter.rebuild_vaccination_schedule",
+        "cron": "30 3 * * *",
+    },
+    "rebuild-intake-rollups": {
+        "task": "shelter.rebuild_intake_rollups",
+        "cron": "40 3 * * *",
+    },
+    "purge-jobs": {"task": "shelter.purge_jobs", "cron": "45 3 * * 0"},
+    "purge-photo-uploads": {
+        "task": "shelter.purge_photo_uploads",
+        "cron": "5 * * * *",
+    },
+}
+
+# SHELTER_MANIFEST_STATIC=1 (set by build.sh and in production) makes
+# collectstatic, through "manage.py build_assets", minify the project's CSS/JS,
+# build the bundles below and write content-hashed, gzip and Brotli copies;
+# pages then need that manifest. Without it the sources are served as they are
+# and WhiteNoise finds them without a collectstatic, e.g. under runserver.
+SHELTER_MANIFEST_STATIC = os.getenv("SHELTER_MANIFEST_STATIC", "0") == "1"
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "shelter.assets.ShelterStaticFilesStorage"
+        if SHELTER_MANIFEST_STATIC
+        else "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+}
+
+WHITENOISE_USE_FINDERS = not SHELTER_MANIFEST_STATIC
+
+# Bundle name -> source files, concatenated in order. Templates load them
+# with {% asset_bundle %}, which links the sources directly while DEBUG.
+SHELTER_ASSET_BUNDLES = {
+    "css/shelter.css": ["css/styles.css"],
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -149,3 +289,62 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
+
+# Default size of the ranked top N that search_ids() returns; search() itself
+# filters to every match (see shelter/search.py).
+SHELTER_SEARCH_LIMIT = 500
+
+# Whole-page cache for anonymous visitors of the public pages (shelter/cache.py).
+# Off in config/test_settings.py: cached pages would outlive each test's rollback.
+SHELTER_RESPONSE_CACHE_ENABLED = os.getenv("SHELTER_RESPONSE_CACHE", "1") == "1"
+SHELTER_RESPONSE_CACHE_TIMEOUT = 60 * 60
+SHELTER_RESPONSE_CACHE_LOCK_TIMEOUT = 10
+
+# {% fragment %} blocks (dog cards, dog page sections) for every visitor,
+# keyed on updated_at stamps. Off in the test settings like the page cache.
+SHELTER_FRAGMENT_CACHE_ENABLED = os.getenv("SHELTER_FRAGMENT_CACHE", "1") == "1"
+SHELTER_FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
+# How far ahead the vaccination dashboard lists boosters that are coming due.
+SHELTER_VACCINATION_UPCOMING_DAYS = 30
+
+# How many dogs a caretaker of each expert level can look after; the
+# "over capacity" page lists caretakers with more.
+SHELTER_CARETAKER_CAPACITY = {
+    "beginner": 2,
+    "intermediate": 4,
+    "advanced": 6,
+    "expert": 10,
+}
+
+# Per-request timings (shelter/middleware.py): SQL, templates and the whole
+# request for a random sample of requests.
+SHELTER_PERF_ENABLED = os.getenv("SHELTER_PERF", "1") == "1"
+SHELTER_PERF_SAMPLE_RATE = float(os.getenv("SHELTER_PERF_SAMPLE_RATE", "0.1"))
+SHELTER_PERF_N_PLUS_ONE_THRESHOLD = int(os.getenv("SHELTER_PERF_N_PLUS_ONE", "5"))
+SHELTER_PERF_SERVER_TIMING = os.getenv("SHELTER_PERF_SERVER_TIMING", "1") == "1"
+
+# Query fingerprint totals per URL name (shelter/query_profiles.py), flushed
+# from each worker's memory to the QueryProfile table; see "query_report".
+SHELTER_QUERY_PROFILE_ENABLED = os.getenv("SHELTER_QUERY_PROFILE", "1") == "1"
+SHELTER_QUERY_PROFILE_FLUSH_INTERVAL = 60
+SHELTER_QUERY_PROFILE_MAX_PENDING = 1000
+
+# Prometheus metrics served at /metrics (shelter/metrics.py) to scrapers
+# sending "Authorization: Bearer <SHELTER_METRICS_TOKEN>"; without a token
+# the endpoint answers 403.
+SHELTER_METRICS_ENABLED = os.getenv("SHELTER_METRICS", "1") == "1"
+SHELTER_METRICS_TOKEN = os.getenv("SHELTER_METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "shelter.performance": {
+            "handlers": ["console"],
+            "level": os.getenv("SHELTER_PERF_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
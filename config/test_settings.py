@@ -0,0 +1,24 @@
+"""Settings for the test suite.
+
+"manage.py test" loads this module unless DJANGO_SETTINGS_MODULE says
+otherwise; other runners should point DJANGO_SETTINGS_MODULE at it.
+"""
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import STORAGES
+
+# No collectstatic runs before the tests, so there is no manifest to read
+# even where SHELTER_MANIFEST_STATIC is set.
+STORAGES = {
+    **STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Cached pages and fragments would outlive each test's rollback, and the
+# samplers would time the test client. Tests of these features turn them on
+# with override_settings.
+SHELTER_RESPONSE_CACHE_ENABLED = False
+SHELTER_FRAGMENT_CACHE_ENABLED = False
+SHELTER_PERF_ENABLED = False
+SHELTER_QUERY_PROFILE_ENABLED = False
+SHELTER_METRICS_ENABLED = False
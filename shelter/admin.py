@@ -1,12 +1,28 @@
 from django.contrib import admin
+from django.contrib.admin import helpers
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils import timezone
 
-from shelter.models import Breed, Caretaker, Dog, Vaccination, Vaccine
+from shelter.forms import CaretakerAssignmentForm
+from shelter.models import (
+    Breed,
+    Caretaker,
+    Dog,
+    DogPhoto,
+    Job,
+    QueryProfile,
+    Vaccination,
+    VaccinationDue,
+    Vaccine,
+)
+from shelter.search import search_matches
 
 
 @admin.register(Breed)
 class BreedAdmin(admin.ModelAdmin):
-    list_display = ["name", "dog_size"]
+    list_display = ["name", "dog_size", "dog_count"]
     list_filter = ["dog_size"]
     list_per_page = 10
     search_fields = ["name"]
@@ -31,6 +47,17 @@ class CaretakerAdmin(UserAdmin):
     )
 
 
+class DogPhotoInline(admin.TabularInline):
+    model = DogPhoto
+    extra = 0
+    fields = ["content_hash", "width", "height", "status", "error", "uploaded_at"]
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None) -> bool:
+        # Photos are added through the upload views, which store the files.
+        return False
+
+
 @admin.register(Dog)
 class DogAdmin(admin.ModelAdmin):
     list_display = ["name", "date_registered", "breed"]
@@ -38,6 +65,41 @@ class DogAdmin(admin.ModelAdmin):
     list_per_page = 10
     search_fields = ["breed__name", "name"]
     list_select_related = ["breed"]
+    inlines = [DogPhotoInline]
+    actions = ["change_caretakers"]
+
+    @admin.action(description="Assign or remove caretakers", permissions=["change"])
+    def change_caretakers(self, request, queryset):
+        if "apply" in request.POST:
+            form = CaretakerAssignmentForm(request.POST)
+            if form.is_valid():
+                form.save(queryset.values_list("pk", flat=True))
+                self.message_user(
+                    request, f"Updated the caretakers of {queryset.count()} dogs."
+                )
+                return None
+        else:
+            form = CaretakerAssignmentForm()
+        return TemplateResponse(
+            request,
+            "admin/shelter/dog/change_caretakers.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Assign or remove caretakers",
+                "opts": self.model._meta,
+                "form": form,
+                "dogs": queryset.select_related("breed"),
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        breeds = Breed.objects.filter(search_matches(Breed, search_term))
+        matches = search_matches(Dog, search_term) | Q(breed__in=breeds)
+        return queryset.filter(matches), False
 
 
 @admin.register(Vaccination)
@@ -48,4 +110,38 @@ class VaccinationAdmin(admin.ModelAdmin):
     search_fields = ["vaccine__name"]
 
 
-admin.site.register(Vaccine)
+@admin.register(Vaccine)
+class VaccineAdmin(admin.ModelAdmin):
+    list_display = ["name", "booster_interval_days"]
+
+
+@admin.register(VaccinationDue)
+class VaccinationDueAdmin(admin.ModelAdmin):
+    list_display = ["dog", "vaccine", "last_vaccinated", "next_due"]
+    list_filter = ["vaccine"]
+    list_per_page = 20
+    list_select_related = ["dog", "dog__breed", "vaccine"]
+    readonly_fields = ["dog", "vaccine", "last_vaccinated", "next_due"]
+
+
+@admin.register(QueryProfile)
+class QueryProfileAdmin(admin.ModelAdmin):
+    list_display = ["view_name", "fingerprint", "count", "total_ms", "max_ms"]
+    list_filter = ["view_name"]
+    list_per_page = 20
+    readonly_fields = [field.name for field in QueryProfile._meta.fields]
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "task", "priority", "status", "attempts", "run_at"]
+    list_filter = ["status", "task"]
+    list_per_page = 50
+    readonly_fields = ["claimed_at", "worker", "finished_at", "result", "error"]
+    actions = ["requeue"]
+
+    @admin.action(description="Run again", permissions=["change"])
+    def requeue(self, request, queryset):
+        queryset.filter(status__in=[Job.DONE, Job.FAILED]).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), error=""
+        )
@@ -0,0 +1,256 @@
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Type
+
+from django.db import models
+from django.db.models.query import QuerySet
+from django.http import HttpRequest, JsonResponse
+from django.views import View
+
+from shelter.cache import CachedResponseMixin
+from shelter.models import Breed, Dog, Vaccination, Vaccine
+from shelter.pagination import CursorPaginator, InvalidCursor
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MAX_IDS = 100
+
+JSON_PARAMS = {"separators": (",", ":")}
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400) -> None:
+        super().__init__(message)
+        self.status = status
+
+    def response(self) -> JsonResponse:
+        return JsonResponse({"error": str(self)}, status=self.status)
+
+
+@dataclass(frozen=True)
+class Include:
+    # Related rows fetched for a whole page in one query, grouped by foreign_key.
+    model: Type[models.Model]
+    foreign_key: str
+    fields: Dict[str, str]
+    ordering: Tuple[str, ...]
+
+    def fetch(self, ids: List[int]) -> Dict[int, List[dict]]:
+        grouped: Dict[int, List[dict]] = {pk: [] for pk in ids}
+        if not ids:
+            return grouped
+        rows = (
+            self.model.objects.filter(**{f"{self.foreign_key}__in": ids})
+            .order_by(*self.ordering)
+            .values(self.foreign_key, *self.fields.values())
+        )
+        for row in rows:
+            grouped[row[self.foreign_key]].append(
+                {name: row[lookup] for name, lookup in self.fields.items()}
+            )
+        return grouped
+
+
+@dataclass(frozen=True)
+class Resource:
+    # fields map public names to values() lookups, so responses are built from
+    # plain dicts and never instantiate models.
+    model: Type[models.Model]
+    fields: Dict[str, str]
+    ordering: Tuple[str, ...]
+    cache_models: Tuple[str, ...]
+    includes: Dict[str, Include] = field(default_factory=dict)
+
+    def select(self, requested: Optional[str]) -> Dict[str, str]:
+        if not requested:
+            return self.fields
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+        selected = {"id": self.fields["id"]}
+        selected.update((name, self.fields[name]) for name in names)
+        return selected
+
+    def include(self, requested: Optional[str]) -> Dict[str, Include]:
+        if not requested:
+            return {}
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.includes]
+        if unknown:
+            raise ApiError(f"Unknown includes: {', '.join(unknown)}")
+        return {name: self.includes[name] for name in names}
+
+    def values(self, queryset: QuerySet, selected: Dict[str, str]) -> QuerySet:
+        lookups = {"id", *selected.values()}
+        lookups.update(field.lstrip("-") for field in self.ordering)
+        return queryset.order_by().values(*lookups)
+
+    def serialize(
+        self, rows: List[dict], selected: Dict[str, str], includes: Dict[str, Include]
+    ) -> List[dict]:
+        records = [
+            {name: row[lookup] for name, lookup in selected.items()} for row in rows
+        ]
+        ids = [row["id"] for row in rows]
+        for name, include in includes.items():
+            related = include.fetch(ids)
+            for record, pk in zip(records, ids):
+                record[name] = related[pk]
+        return records
+
+
+VACCINATION_FIELDS = {
+    "id": "id",
+    "dog": "dog_id",
+    "vaccine": "vaccine_id",
+    "vaccine_name": "vaccine__name",
+    "vaccination_date": "vaccination_date",
+}
+
+DOGS = Resource(
+    model=Dog,
+    fields={
+        "id": "id",
+        "name": "name",
+        "age": "age",
+        "date_registered": "date_registered",
+        "sterilized": "sterilized",
+        "gender": "gender",
+        "breed": "breed_id",
+        "breed_name": "breed__name",
+        "dog_size": "breed__dog_size",
+    },
+    ordering=("date_registered", "id"),
+    cache_models=("dog", "breed", "vaccine", "vaccination"),
+    includes={
+        "vaccinations": Include(
+            model=Vaccination,
+            foreign_key="dog_id",
+            fields={
+                name: lookup
+                for name, lookup in VACCINATION_FIELDS.items()
+                if name != "dog"
+            },
+            ordering=("vaccination_date", "id"),
+        )
+    },
+)
+
+BREEDS = Resource(
+    model=Breed,
+    fields={
+        "id": "id",
+        "name": "name",
+        "dog_size": "dog_size",
+        "dog_count": "dog_count",
+    },
+    ordering=("name", "id"),
+    cache_models=("breed", "dog"),
+)
+
+VACCINES = Resource(
+    model=Vaccine,
+    fields={"id": "id", "name": "name"},
+    ordering=("name", "id"),
+    cache_models=("vaccine",),
+)
+
+VACCINATIONS = Resource(
+    model=Vaccination,
+    fields=VACCINATION_FIELDS,
+    ordering=("vaccination_date", "id"),
+    cache_models=("vaccination", "vaccine"),
+)
+
+
+def _int_list(value: str) -> List[int]:
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ApiError("ids must be a comma-separated list of integers")
+    if len(ids) > MAX_IDS:
+        raise ApiError(f"At most {MAX_IDS} ids can be requested at once")
+    return list(dict.fromkeys(ids))
+
+
+def _limit(value: Optional[str]) -> int:
+    if not value:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+class ResourceView(CachedResponseMixin, View, metaclass=ABCMeta):
+    resource: Resource = None
+
+    @property
+    def cache_models(self) -> Tuple[str, ...]:
+        return self.resource.cache_models
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        try:
+            selected = self.resource.select(request.GET.get("fields"))
+            includes = self.resource.include(request.GET.get("include"))
+            payload = self.get_payload(selected, includes, **kwargs)
+        except ApiError as error:
+            return error.response()
+        return JsonResponse(payload, json_dumps_params=JSON_PARAMS)
+
+    @abstractmethod
+    def get_payload(self, selected, includes, **kwargs) -> dict:
+        """The JSON body for the requested ``selected`` fields and ``includes``;
+        raise ApiError to answer with an error instead.
+        """
+
+
+class ResourceListView(ResourceView):
+    def _link(self, cursor: Optional[str]) -> Optional[str]:
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params["cursor"] = cursor
+        return f"{self.request.path}?{params.urlencode()}"
+
+    def get_payload(self, selected, includes, **kwargs) -> dict:
+        resource = self.resource
+        queryset = resource.values(resource.model.objects.all(), selected)
+
+        if "ids" in self.request.GET:
+            ids = _int_list(self.request.GET["ids"])
+            found = {row["id"]: row for row in queryset.filter(pk__in=ids)}
+            rows = [found[pk] for pk in ids if pk in found]
+            return {
+                "results": resource.serialize(rows, selected, includes),
+                "missing": [pk for pk in ids if pk not in found],
+            }
+
+        paginator = CursorPaginator(
+            queryset, _limit(self.request.GET.get("limit")), resource.ordering
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise ApiError("Invalid cursor")
+        return {
+            "results": resource.serialize(page.object_list, selected, includes),
+            "next": self._link(page.next_cursor),
+            "previous": self._link(page.previous_cursor),
+        }
+
+
+class ResourceDetailView(ResourceView):
+    def get_payload(self, selected, includes, **kwargs) -> dict:
+        resource = self.resource
+        rows = list(
+            resource.values(resource.model.objects.filter(pk=kwargs["pk"]), selected)
+        )
+        if not rows:
+            raise ApiError("Not found", status=404)
+        return resource.serialize(rows, selected, includes)[0]
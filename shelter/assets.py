@@ -0,0 +1,175 @@
+import os
+from typing import Dict, Iterable, List, NamedTuple
+
+import rcssmin
+import rjsmin
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.core.files.base import ContentFile
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+MINIFIERS = {".css": rcssmin.cssmin, ".js": rjsmin.jsmin}
+STATIC_CHUNK_SIZE = 64 * 1024
+
+
+def minify(name: str, content: str) -> str:
+    return MINIFIERS[os.path.splitext(name)[1]](content)
+
+
+def project_assets(paths: Dict[str, tuple]) -> List[str]:
+    # The project's own CSS/JS under STATICFILES_DIRS; app assets such as the
+    # admin's ship as their authors wrote them.
+    project_dirs = {
+        os.path.realpath(directory) for directory in settings.STATICFILES_DIRS
+    }
+    return [
+        name
+        for name, (storage, _) in paths.items()
+        if os.path.splitext(name)[1] in MINIFIERS
+        and os.path.realpath(getattr(storage, "location", "")) in project_dirs
+    ]
+
+
+def project_asset_names() -> List[str]:
+    paths = {path: (storage, path) for path, storage in FileSystemFinder().list([])}
+    return sorted(project_assets(paths))
+
+
+class ShelterStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Minifies the project's CSS/JS and builds SHELTER_ASSET_BUNDLES before
+    WhiteNoise hashes the files and writes their gzip and Brotli variants.
+
+    WhiteNoise serves the hashed names with far-future immutable headers.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = {**paths, **self.build(paths)}
+        yield from super().post_process(paths, dry_run, **options)
+
+    def build(self, paths: Dict[str, tuple]) -> Dict[str, tuple]:
+        built = {}
+        for name in project_assets(paths):
+            self.replace(name, minify(name, self.read_source(paths, name)))
+            built[name] = (self, name)
+        for bundle, sources in settings.SHELTER_ASSET_BUNDLES.items():
+            content = "\n".join(
+                minify(source, self.read_source(paths, source)) for source in sources
+            )
+            self.replace(bundle, content)
+            built[bundle] = (self, bundle)
+        return built
+
+    def read_source(self, paths: Dict[str, tuple], name: str) -> str:
+        storage, path = paths[name]
+        with storage.open(path) as source:
+            return source.read().decode()
+
+    def replace(self, name: str, content: str) -> None:
+        if self.exists(name):
+            self.delete(name)
+        self.save(name, ContentFile(content.encode()))
+
+
+class AssetSize(NamedTuple):
+    name: str
+    stored_name: str
+    source: int
+    minified: int
+    gzip: int
+    brotli: int
+
+
+def asset_report(storage, names: Iterable[str]) -> List[AssetSize]:
+    """Bytes of each asset before the build and of what is served after it.
+
+    Compressed sizes fall back to the uncompressed one when WhiteNoise didn't
+    keep a variant (it skips compression that saves less than 5%).
+    """
+    sizes = []
+    for name in names:
+        sources = settings.SHELTER_ASSET_BUNDLES.get(name, [name])
+        stored_name = storage.stored_name(name)
+        minified = storage.size(stored_name)
+        variants = {}
+        for extension in (".gz", ".br"):
+            variant = stored_name + extension
+            variants[extension] = (
+                storage.size(variant) if storage.exists(variant) else minified
+            )
+        sizes.append(
+            AssetSize(
+                name=name,
+                stored_name=stored_name,
+                source=sum(os.path.getsize(finders.find(source)) for source in sources),
+                minified=minified,
+                gzip=variants[".gz"],
+                brotli=variants[".br"],
+            )
+        )
+    return sizes
+
+
+class ASGIStaticFiles:
+    """Serves static files in front of an ASGI application.
+
+    WhiteNoise's middleware is sync-only and would turn the whole Django
+    middleware chain sync, so config/asgi.py serves the files here instead,
+    with the same WHITENOISE_* settings and headers. Files are read in a
+    thread; every other request goes to ``application``.
+    """
+
+    def __init__(self, application) -> None:
+        self.application = application
+        self.whitenoise = WhiteNoiseMiddleware()
+
+    async def __call__(self, scope, receive, send) -> None:
+        static_file = None
+        if scope["type"] == "http":
+            path = scope["path"].removeprefix(scope.get("root_path", ""))
+            if self.whitenoise.autorefresh:
+                static_file = await sync_to_async(self.whitenoise.find_file)(path)
+            else:
+                static_file = self.whitenoise.files.get(path)
+        if static_file is None:
+            await self.application(scope, receive, send)
+            return
+        await self.serve(static_file, scope, send)
+
+    async def serve(self, static_file, scope, send) -> None:
+        # The WSGI-style names WhiteNoise reads the conditional headers from.
+        headers = {
+            "HTTP_"
+            + name.decode("latin-1").upper().replace("-", "_"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        response = static_file.get_response(scope["method"], headers)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": int(response.status),
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response.headers
+                ],
+            }
+        )
+        if response.file is None:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        read = sync_to_async(response.file.read, thread_sensitive=False)
+        try:
+            while True:
+                chunk = await read(STATIC_CHUNK_SIZE)
+                more = len(chunk) == STATIC_CHUNK_SIZE
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": more}
+                )
+                if not more:
+                    break
+        finally:
+            response.file.close()
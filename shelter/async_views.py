@@ -0,0 +1,179 @@
+from typing import Any, Dict
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models.query import QuerySet
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect, render
+from django.views import View
+
+from shelter.cache import CachedResponseMixin
+from shelter.caretaking import SELF_ACTIONS, toggle_caretaker
+from shelter.forms import BreedSearchForm, DogSearchForm
+from shelter.models import Breed, Dog, DogPhoto
+from shelter.pagination import CursorPaginationMixin, InvalidCursor
+from shelter.search import search
+from shelter.timeline import avaccination_timeline
+
+
+# These views back the same URLs and templates as shelter.views when the app
+# is served through config/asgi.py (see SHELTER_ASYNC_VIEWS).
+
+
+async def aget_user(request):
+    # request.user is loaded lazily from the session; force that in the sync
+    # thread so templates can read it from the event loop afterwards.
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+class AsyncListView(CursorPaginationMixin, View):
+    model = None
+    template_name = None
+    context_object_name = None
+    search_form_class = None
+    paginate_by = None
+    page_kwarg = "page"
+
+    async def aget_queryset(self) -> QuerySet:
+        queryset = self.model.objects.all()
+        form = self.search_form_class(self.request.GET)
+        if form.is_valid() and form.cleaned_data["name"]:
+            # Resolving a search term queries the index right away.
+            return await sync_to_async(self.search)(queryset, form)
+        return queryset
+
+    def search(self, queryset: QuerySet, form) -> QuerySet:
+        return search(queryset, form.cleaned_data["name"])
+
+    async def apaginate_queryset(self, queryset: QuerySet, page_size: int):
+        ordering = self.get_cursor_ordering(queryset)
+        if ordering and self.page_kwarg not in self.request.GET:
+            paginator = self.get_cursor_paginator(queryset, page_size, ordering)
+            try:
+                page = await paginator.apage(self.request.GET.get(self.cursor_kwarg))
+            except InvalidCursor:
+                raise Http404("Invalid cursor")
+            return paginator, page
+
+        paginator = Paginator(queryset, page_size)
+        paginator.count = await queryset.acount()
+        try:
+            page = paginator.page(self.request.GET.get(self.page_kwarg) or 1)
+        except InvalidPage as error:
+            raise Http404(str(error))
+        page.object_list = [obj async for obj in page.object_list]
+        return paginator, page
+
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        await aget_user(request)
+        queryset = await self.aget_queryset()
+        paginator, page = await self.apaginate_queryset(queryset, self.paginate_by)
+        context = {
+            "view": self,
+            "paginator": paginator,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+            "object_list": page.object_list,
+            self.context_object_name: page.object_list,
+            "search_form": await self.aget_search_form(),
+        }
+        return render(request, self.template_name, context)
+
+    async def aget_search_form(self):
+        return self.search_form_class(
+            initial={"name": self.request.GET.get("name", "")}
+        )
+
+
+class AsyncBreedListView(CachedResponseMixin, AsyncListView):
+    cache_models = ("breed", "dog")
+    model = Breed
+    template_name = "shelter/breed_list.html"
+    context_object_name = "breed_list"
+    search_form_class = BreedSearchForm
+    paginate_by = 15
+    cursor_ordering = ("name", "id")
+
+
+class AsyncDogListView(CachedResponseMixin, AsyncListView):
+    cache_models = ("dog", "breed", "caretaker")
+    model = Dog
+    template_name = "shelter/dog_list.html"
+    context_object_name = "dog_list"
+    search_form_class = DogSearchForm
+    paginate_by = 10
+    cursor_ordering = ("date_registered", "id")
+
+    async def aget_queryset(self) -> QuerySet:
+        queryset = Dog.objects.select_related("breed", "cover_photo")
+        self.search_form = DogSearchForm(self.request.GET)
+        # Validating breeds and resolving a search term both query right away.
+        if await sync_to_async(self.search_form.is_valid)():
+            return await sync_to_async(self.search_form.filter_queryset)(queryset)
+        return queryset
+
+    async def aget_search_form(self):
+        await sync_to_async(self.search_form.add_facet_counts)(Dog.objects.all())
+        return self.search_form
+
+
+class AsyncBreedDetailView(CachedResponseMixin, View):
+    cache_models = ("breed", "dog")
+
+    async def get(self, request, pk: int) -> HttpResponse:
+        await aget_user(request)
+        breed = await Breed.objects.filter(pk=pk).prefetch_related("dogs").afirst()
+        if breed is None:
+            raise Http404("No breed found matching the query")
+        context = {"breed": breed, "object": breed, "view": self}
+        return render(request, "shelter/breed_detail.html", context)
+
+
+class AsyncDogDetailView(CachedResponseMixin, View):
+    cache_models = ("dog", "breed", "vaccine", "vaccination", "caretaker")
+
+    async def get(self, request, pk: int) -> HttpResponse:
+        # Django 4.2 runs every async ORM call on its one thread-sensitive
+        # executor, so these queries run one after another however they are
+        # awaited; the event loop serves other connections meanwhile.
+        user = await aget_user(request)
+        dog = await Dog.objects.select_related("breed").filter(pk=pk).afirst()
+        if dog is None:
+            raise Http404("No dog found matching the query")
+        caretakers = await self.acaretakers(pk)
+        timeline = await avaccination_timeline(pk)
+        photos = await self.aphotos(pk)
+        context: Dict[str, Any] = {
+            "dog": dog,
+            "object": dog,
+            "view": self,
+            "caretakers": caretakers,
+            "is_caretaker": user in caretakers,
+            "timeline": timeline,
+            "photos": photos,
+        }
+        return render(request, "shelter/dog_detail.html", context)
+
+    async def acaretakers(self, pk: int) -> list:
+        return [
+            caretaker async for caretaker in get_user_model().objects.filter(dogs=pk)
+        ]
+
+    async def aphotos(self, pk: int) -> list:
+        photos = DogPhoto.objects.filter(dog=pk, status=DogPhoto.READY)
+        return [photo async for photo in photos.order_by("uploaded_at")]
+
+    async def post(self, request, pk: int) -> HttpResponse:
+        user = await aget_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not await Dog.objects.filter(pk=pk).aexists():
+            raise Http404("No dog found matching the query")
+
+        await sync_to_async(toggle_caretaker)(
+            pk, user.pk, SELF_ACTIONS.get(request.POST.get("action"))
+        )
+        return redirect("shelter:dog-detail", pk)
@@ -0,0 +1,145 @@
+import multiprocessing
+import random
+import shutil
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from shelter.benchmarks.harness import percentile
+from shelter.models import Caretaker, Dog
+
+
+class Profile(NamedTuple):
+    engine: str
+    # None keeps SHELTER_SQLITE_PRAGMAS, {} leaves SQLite's defaults.
+    pragmas: Optional[dict]
+
+
+PROFILES: Dict[str, Profile] = {
+    "stock": Profile("django.db.backends.sqlite3", {}),
+    "pragmas": Profile("django.db.backends.sqlite3", None),
+    "tuned": Profile("shelter.sqlite_backend", None),
+}
+
+
+def use_sqlite_file(path: str, engine: str) -> None:
+    """Point the default alias at another SQLite file for this process."""
+    connections.close_all()
+    connections.settings["default"] = {
+        **connections.settings["default"],
+        "ENGINE": engine,
+        "NAME": path,
+        "OPTIONS": {},
+    }
+    try:
+        del connections["default"]
+    except AttributeError:
+        pass
+
+
+class Worker:
+    """One process' request loop, like a gunicorn worker behind a busy shelter.
+
+    Reads are dog list pages and dog pages; writes toggle the worker's own
+    caretaker on a random dog, a read-then-write transaction.
+    """
+
+    def __init__(self, index: int, seed: int, write_ratio: float) -> None:
+        self.rng = random.Random(seed * 1000 + index)
+        self.write_ratio = write_ratio
+        self.username = f"benchmark-{index}"
+
+    def next_request(self, dog_id: int):
+        if self.rng.random() < self.write_ratio:
+            action = self.rng.choice(["add", "remove"])
+            return (
+                "write",
+                reverse("shelter:dog-detail", args=[dog_id]),
+                {"action": action},
+            )
+        if self.rng.random() < 0.5:
+            page = self.rng.randint(1, 5)
+            return "read", reverse("shelter:dog-list"), {"page": page}
+        return "read", reverse("shelter:dog-detail", args=[dog_id]), {}
+
+    def run(self, deadline: float) -> Dict[str, dict]:
+        client = Client()
+        client.force_login(Caretaker.objects.get(username=self.username))
+        dog_ids = list(Dog.objects.values_list("pk", flat=True))
+        results = defaultdict(lambda: {"timings": [], "errors": 0})
+
+        while time.monotonic() < deadline:
+            kind, url, data = self.next_request(self.rng.choice(dog_ids))
+            send = client.post if kind == "write" else client.get
+            started = time.perf_counter()
+            try:
+                send(url, data)
+            except OperationalError:
+                # "database is locked": the request would have been a 500.
+                results[kind]["errors"] += 1
+                continue
+            results[kind]["timings"].append((time.perf_counter() - started) * 1000)
+
+        connections.close_all()
+        return dict(results)
+
+
+def _run_worker(arguments) -> Dict[str, dict]:
+    index, seed, write_ratio, deadline = arguments
+    return Worker(index, seed, write_ratio).run(deadline)
+
+
+def create_benchmark_users(workers: int) -> None:
+    for index in range(workers):
+        Caretaker.objects.create_user(f"benchmark-{index}")
+
+
+def summarize(samples: List[Dict[str, dict]], duration: float) -> Dict[str, dict]:
+    summary = {}
+    for kind in ("read", "write"):
+        timings = [
+            t for sample in samples for t in sample.get(kind, {}).get("timings", [])
+        ]
+        errors = sum(sample.get(kind, {}).get("errors", 0) for sample in samples)
+        summary[kind] = {
+            "requests": len(timings),
+            "per_second": round(len(timings) / duration, 1),
+            "p50_ms": round(percentile(timings, 0.5), 3) if timings else None,
+            "p95_ms": round(percentile(timings, 0.95), 3) if timings else None,
+            "errors": errors,
+        }
+    return summary
+
+
+def run_profile(
+    template: str,
+    path: str,
+    profile: Profile,
+    workers: int,
+    duration: float,
+    write_ratio: float,
+    seed: int = 0,
+) -> Dict[str, dict]:
+    """Serve ``duration`` seconds of mixed traffic from ``workers`` processes
+    sharing a copy of ``template``.
+    """
+    shutil.copyfile(template, path)
+    use_sqlite_file(path, profile.engine)
+    pragmas = (
+        settings.SHELTER_SQLITE_PRAGMAS if profile.pragmas is None else profile.pragmas
+    )
+    with override_settings(SHELTER_SQLITE_PRAGMAS=pragmas):
+        # Forked like gunicorn's workers: each child opens its own connection.
+        context = multiprocessing.get_context("fork")
+        deadline = time.monotonic() + duration
+        with context.Pool(workers) as pool:
+            samples = pool.map(
+                _run_worker,
+                [(index, seed, write_ratio, deadline) for index in range(workers)],
+            )
+    return summarize(samples, duration)
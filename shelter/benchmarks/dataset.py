@@ -0,0 +1,245 @@
+import datetime
+import random
+from typing import Dict, List, Optional
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from shelter import counters, schedule
+from shelter.cache import bump_versions
+from shelter.models import Breed, Caretaker, Dog, Vaccination, Vaccine
+from shelter.search import SEARCH_FIELDS, get_search_backend
+
+
+BREED_NAMES = [
+    "Labrador Retriever",
+    "German Shepherd",
+    "Golden Retriever",
+    "French Bulldog",
+    "Beagle",
+    "Poodle",
+    "Rottweiler",
+    "Dachshund",
+    "Yorkshire Terrier",
+    "Boxer",
+    "Siberian Husky",
+    "Border Collie",
+    "Chihuahua",
+    "Shih Tzu",
+    "Great Dane",
+    "Doberman Pinscher",
+    "Cocker Spaniel",
+    "Pug",
+    "Jack Russell Terrier",
+    "Bernese Mountain Dog",
+    "Akita",
+    "Dalmatian",
+    "Pekingese",
+    "Saint Bernard",
+    "Newfoundland",
+    "Maltese",
+    "Shar Pei",
+    "Samoyed",
+    "Whippet",
+    "Mastiff",
+]
+BREED_PREFIXES = ["", "Miniature ", "Standard ", "Toy ", "Giant ", "Wire-haired "]
+DOG_SIZES = {"small": 30, "medium": 35, "large": 25, "giant": 10}
+
+DOG_NAMES = [
+    "Bella",
+    "Max",
+    "Luna",
+    "Charlie",
+    "Lucy",
+    "Cooper",
+    "Daisy",
+    "Rocky",
+    "Molly",
+    "Buddy",
+    "Sadie",
+    "Tucker",
+    "Bailey",
+    "Bear",
+    "Maggie",
+    "Duke",
+    "Zoe",
+    "Teddy",
+    "Stella",
+    "Oscar",
+    "Бровко",
+    "Сірко",
+    "Жучка",
+    "Рябко",
+    "Лайка",
+    "Барон",
+    "Найда",
+    "Дружок",
+]
+FIRST_NAMES = ["Olena", "Taras", "Iryna", "Andrii", "Maria", "Oleh", "Sofia", "Ivan"]
+LAST_NAMES = ["Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Melnyk"]
+EXPERT_LEVELS = {"beginner": 50, "intermediate": 30, "advanced": 15, "expert": 5}
+# Vaccine name -> booster interval in days (None: given once).
+VACCINES = {
+    "Rabies": 365,
+    "Distemper": 1095,
+    "Parvovirus": 1095,
+    "Adenovirus": 1095,
+    "Leptospirosis": 365,
+    "Bordetella": 180,
+    "Parainfluenza": None,
+    "Lyme disease": 365,
+}
+
+# Number of caretakers per dog and vaccinations per dog, as (value, weight).
+CARETAKERS_PER_DOG = {0: 50, 1: 30, 2: 15, 3: 5}
+VACCINATIONS_PER_DOG = {0: 10, 1: 20, 2: 30, 3: 20, 4: 15, 5: 5}
+
+REGISTRATION_DAYS = 5 * 365
+BATCH_SIZE = 2000
+
+
+def _weighted(rng: random.Random, weights: Dict, k: int = 1) -> list:
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def _breed_names(count: int) -> List[str]:
+    names = [
+        f"{prefix}{name}".strip() for prefix in BREED_PREFIXES for name in BREED_NAMES
+    ]
+    names += [f"{name} {number}" for number in range(2, count) for name in BREED_NAMES]
+    return names[:count]
+
+
+class DatasetGenerator:
+    """Bulk-creates a synthetic shelter of ``dogs`` dogs.
+
+    Breeds, caretakers and vaccinations scale with the number of dogs; breed
+    popularity follows a Zipf curve so a few breeds hold most of the dogs.
+    Counters and the search index are rebuilt once at the end.
+    """
+
+    def __init__(self, dogs: int, seed: int = 0) -> None:
+        self.dogs = dogs
+        self.breeds = max(10, dogs // 50)
+        self.caretakers = max(5, dogs // 20)
+        self.rng = random.Random(seed)
+        self.today = datetime.date.today()
+
+    def generate(self) -> Dict[str, int]:
+        with transaction.atomic():
+            vaccine_ids = self._vaccines()
+            breed_ids = self._breeds()
+            caretaker_ids = self._caretakers()
+            created = {"vaccinations": 0, "caretaker_assignments": 0}
+            for start in range(0, self.dogs, BATCH_SIZE):
+                dogs = self._dogs(breed_ids, min(BATCH_SIZE, self.dogs - start))
+                created["vaccinations"] += self._vaccinations(dogs, vaccine_ids)
+                created["caretaker_assignments"] += self._assignments(
+                    dogs, caretaker_ids
+                )
+            self._rebuild_derived_data()
+        return {
+            "breeds": len(breed_ids),
+            "dogs": self.dogs,
+            "caretakers": len(caretaker_ids),
+            "vaccines": len(vaccine_ids),
+            **created,
+        }
+
+    def _vaccines(self) -> List[int]:
+        vaccines = Vaccine.objects.bulk_create(
+            Vaccine(name=name, booster_interval_days=interval)
+            for name, interval in VACCINES.items()
+        )
+        return [vaccine.pk for vaccine in vaccines]
+
+    def _breeds(self) -> List[int]:
+        sizes = _weighted(self.rng, DOG_SIZES, k=self.breeds)
+        breeds = Breed.objects.bulk_create(
+            (
+                Breed(name=name, dog_size=size)
+                for name, size in zip(_breed_names(self.breeds), sizes)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        return [breed.pk for breed in breeds]
+
+    def _caretakers(self) -> List[int]:
+        # Hashing is deliberately slow, so every caretaker shares one hash.
+        password = make_password("benchmark")
+        levels = _weighted(self.rng, EXPERT_LEVELS, k=self.caretakers)
+        caretakers = Caretaker.objects.bulk_create(
+            (
+                Caretaker(
+                    username=f"caretaker{number:06d}",
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    password=password,
+                    expert_level=level,
+                )
+                for number, level in enumerate(levels)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        return [caretaker.pk for caretaker in caretakers]
+
+    def _dogs(self, breed_ids: List[int], count: int) -> List[Dog]:
+        popularity = [1 / rank for rank in range(1, len(breed_ids) + 1)]
+        breeds = self.rng.choices(breed_ids, weights=popularity, k=count)
+        dogs = []
+        for breed_id in breeds:
+            dogs.append(
+                Dog(
+                    name=self.rng.choice(DOG_NAMES),
+                    age=self._age(),
+                    date_registered=self.today
+                    - datetime.timedelta(days=self.rng.randrange(REGISTRATION_DAYS)),
+                    sterilized=self.rng.random() < 0.6,
+                    gender=self.rng.choice(["female", "male"]),
+                    breed_id=breed_id,
+                )
+            )
+        return Dog.objects.bulk_create(dogs, batch_size=BATCH_SIZE)
+
+    def _age(self) -> Optional[str]:
+        if self.rng.random() < 0.1:
+            return None
+        months = self.rng.randint(2, 180)
+        return f"{months // 12} years" if months >= 12 else f"{months} months"
+
+    def _vaccinations(self, dogs: List[Dog], vaccine_ids: List[int]) -> int:
+        vaccinations = []
+        counts = _weighted(self.rng, VACCINATIONS_PER_DOG, k=len(dogs))
+        for dog, count in zip(dogs, counts):
+            days_in_shelter = max(1, (self.today - dog.date_registered).days)
+            for vaccine_id in self.rng.sample(vaccine_ids, count):
+                vaccinations.append(
+                    Vaccination(
+                        dog_id=dog.pk,
+                        vaccine_id=vaccine_id,
+                        vaccination_date=dog.date_registered
+                        + datetime.timedelta(days=self.rng.randrange(days_in_shelter)),
+                    )
+                )
+        Vaccination.objects.bulk_create(vaccinations, batch_size=BATCH_SIZE)
+        return len(vaccinations)
+
+    def _assignments(self, dogs: List[Dog], caretaker_ids: List[int]) -> int:
+        through = Dog.caretakers.through
+        assignments = []
+        counts = _weighted(self.rng, CARETAKERS_PER_DOG, k=len(dogs))
+        for dog, count in zip(dogs, counts):
+            for caretaker_id in self.rng.sample(caretaker_ids, count):
+                assignments.append(through(dog_id=dog.pk, caretaker_id=caretaker_id))
+        through.objects.bulk_create(assignments, batch_size=BATCH_SIZE)
+        return len(assignments)
+
+    def _rebuild_derived_data(self) -> None:
+        counters.rebuild()
+        schedule.rebuild()
+        backend = get_search_backend()
+        for label in SEARCH_FIELDS:
+            backend.rebuild(apps.get_model(label))
+        bump_versions("breed", "dog", "vaccine", "vaccination", "caretaker")
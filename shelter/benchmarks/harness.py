@@ -0,0 +1,167 @@
+import math
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.contrib import admin
+from django.db import connection, reset_queries
+from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.urls.converters import IntConverter
+
+from shelter import urls as shelter_urls
+from shelter.models import Caretaker, Dog, Job, Vaccination, Vaccine
+
+# Extra query strings measured next to the plain route, keyed by URL name.
+VARIANTS: Dict[str, List[str]] = {
+    "shelter:dog-list": ["name=bella", "page=5"],
+    "shelter:breed-list": ["name=terrier"],
+    "shelter:caretaker-list": ["username=oleh"],
+    "shelter:api-dog-list": ["include=vaccinations", "fields=name,breed_name"],
+}
+
+
+@dataclass
+class RouteResult:
+    name: str
+    url: str
+    status: int
+    p50_ms: float
+    p95_ms: float
+    queries: int
+    peak_memory_kb: float
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    # Nearest-rank percentile.
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def _sample_kwargs() -> Dict[str, int]:
+    # Detail pages are measured for the most recently registered dog and its
+    # breed; the generator gives every dog the same odds of related rows.
+    vaccination = Vaccination.objects.order_by("-dog__date_registered", "-id").values(
+        "pk", "dog_id"
+    ).first() or {"pk": 0, "dog_id": 0}
+    dog = Dog.objects.order_by("-date_registered", "-id").values_list(
+        "pk", "breed_id"
+    ).first() or (0, 0)
+    caretaker = (
+        Caretaker.objects.filter(is_superuser=False)
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return {
+        "dog": dog[0],
+        "breed": dog[1],
+        "caretaker": caretaker or 0,
+        "vaccine": Vaccine.objects.values_list("pk", flat=True).first() or 0,
+        "vaccination": vaccination["pk"],
+        "vaccination_dog": vaccination["dog_id"],
+        "job": Job.objects.values_list("pk", flat=True).first() or 0,
+    }
+
+
+def _kwargs_for(pattern: URLPattern, samples: Dict[str, int]) -> Dict[str, int]:
+    resource = pattern.name.removeprefix("api-").split("-")[0]
+    kwargs = {}
+    for param in pattern.pattern.converters:
+        if param == "dog_id":
+            kwargs[param] = samples["vaccination_dog"]
+        else:
+            kwargs[param] = samples[resource]
+    return kwargs
+
+
+def shelter_routes(admin_changelists: bool = True) -> Iterator[Tuple[str, str]]:
+    # Every named GET route of the shelter app, plus the admin changelists.
+    samples = _sample_kwargs()
+    for pattern in shelter_urls.urlpatterns:
+        converters = pattern.pattern.converters.values()
+        if not all(isinstance(converter, IntConverter) for converter in converters):
+            # Upload ids and photo names only exist once something is uploaded.
+            continue
+        name = f"shelter:{pattern.name}"
+        url = reverse(name, kwargs=_kwargs_for(pattern, samples))
+        yield name, url
+        for query in VARIANTS.get(name, []):
+            yield f"{name}?{query}", f"{url}?{query}"
+
+    if not admin_changelists:
+        return
+    for model in admin.site._registry:
+        opts = model._meta
+        name = f"admin:{opts.app_label}_{opts.model_name}_changelist"
+        yield name, reverse(name)
+
+
+class Harness:
+    def __init__(self, client: Client, repeat: int = 20, warmup: int = 2) -> None:
+        self.client = client
+        self.repeat = repeat
+        self.warmup = warmup
+
+    def get(self, url: str) -> HttpResponse:
+        response = self.client.get(url)
+        if response.streaming:
+            # Exports only do their work while the body is consumed.
+            for _ in response.streaming_content:
+                pass
+        return response
+
+    def measure(self, name: str, url: str) -> RouteResult:
+        for _ in range(self.warmup):
+            self.get(url)
+
+        # Each request resets the query log, so capture from an empty log and
+        # count before the next request clears it again.
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(url)
+        query_count = len(queries)
+
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            self.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # tracemalloc slows everything down, so memory gets a run of its own.
+        tracemalloc.start()
+        try:
+            self.get(url)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return RouteResult(
+            name=name,
+            url=url,
+            status=response.status_code,
+            p50_ms=round(percentile(timings, 0.5), 3),
+            p95_ms=round(percentile(timings, 0.95), 3),
+            queries=query_count,
+            peak_memory_kb=round(peak / 1024, 1),
+        )
+
+    def run(
+        self, only: Optional[str] = None, anonymous: bool = False
+    ) -> Dict[str, dict]:
+        # ``anonymous`` runs are for a logged-out client: their results are
+        # named "anon:<route>" and leave out the admin and the pages that only
+        # redirect to the login form.
+        results = {}
+        for name, url in shelter_routes(admin_changelists=not anonymous):
+            if only and only not in name:
+                continue
+            if anonymous:
+                name = f"anon:{name}"
+            result = self.measure(name, url)
+            if anonymous and result.status == 302:
+                continue
+            results[name] = asdict(result)
+        return results
@@ -0,0 +1,75 @@
+import datetime
+import json
+import platform
+from typing import Dict, List, NamedTuple
+
+import django
+from django.db import connection
+
+
+METRICS = ("p50_ms", "p95_ms", "queries", "peak_memory_kb")
+
+
+class Change(NamedTuple):
+    size: str
+    route: str
+    metric: str
+    before: float
+    after: float
+
+    @property
+    def ratio(self) -> float:
+        if not self.before:
+            return float("inf") if self.after else 1.0
+        return self.after / self.before
+
+
+def new_report(repeat: int, seed: int) -> dict:
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "repeat": repeat,
+        "seed": seed,
+        "sizes": {},
+    }
+
+
+def save_report(report: dict, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def compare_reports(before: dict, after: dict) -> List[Change]:
+    # Sizes and routes present in both reports, so added routes don't count
+    # as regressions.
+    changes = []
+    for size, results in after["sizes"].items():
+        previous: Dict[str, dict] = before["sizes"].get(size, {}).get("routes", {})
+        for route, metrics in results["routes"].items():
+            if route not in previous:
+                continue
+            for metric in METRICS:
+                changes.append(
+                    Change(
+                        size, route, metric, previous[route][metric], metrics[metric]
+                    )
+                )
+    return changes
+
+
+def regressions(changes: List[Change], threshold: float) -> List[Change]:
+    # Query counts are exact, so any increase counts; timings and memory are
+    # noisy and only count once they grow by more than ``threshold``.
+    return [
+        change
+        for change in changes
+        if (change.metric == "queries" and change.after > change.before)
+        or (change.metric != "queries" and change.ratio > 1 + threshold)
+    ]
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+from shelter import db_router
+from shelter.metrics import RESPONSE_CACHE
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "shelter:version:{}"
+PAGE_KEY = "shelter:page:{auth}:{path}:{versions}"
+
+
+def _initial_version() -> int:
+    # Start from a clock value so a version evicted from the cache can't come
+    # back at a number that older cached pages were stored under.
+    return int(time.time() * 1000)
+
+
+def model_versions(names: Iterable[str]) -> Dict[str, int]:
+    keys = {name: VERSION_KEY.format(name) for name in names}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        if key not in stored:
+            cache.add(key, _initial_version(), timeout=None)
+            stored[key] = cache.get(key, 0)
+        versions[name] = stored[key]
+    return versions
+
+
+def _bump(names: Tuple[str, ...]) -> None:
+    for name in names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), timeout=None)
+
+
+def bump_versions(*names: str) -> None:
+    # Bump now so readers stop using pages stored before the write, and again
+    # on commit in case one was re-filled from the not yet committed state.
+    _bump(names)
+    transaction.on_commit(lambda: _bump(names))
+
+
+def response_cache_key(request: HttpRequest, model_names: Iterable[str]) -> str:
+    versions = model_versions(model_names)
+    path = hashlib.md5(
+        request.path.encode() + b"?" + request.GET.urlencode().encode()
+    ).hexdigest()
+    return PAGE_KEY.format(
+        auth="user" if request.user.is_authenticated else "anon",
+        path=path,
+        versions=".".join(f"{name}{versions[name]}" for name in sorted(versions)),
+    )
+
+
+def _is_cacheable(response: HttpResponse) -> bool:
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not response.has_header("Cache-Control")
+    )
+
+
+def cached_response(
+    key: str, render: Callable[[], HttpResponse], timeout: int
+) -> HttpResponse:
+    response = cache.get(key)
+    if response is not None:
+        logger.debug("Response cache hit %s", key)
+        RESPONSE_CACHE.labels("hit").inc()
+        return response
+
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.SHELTER_RESPONSE_CACHE_LOCK_TIMEOUT
+    if not cache.add(lock_key, 1, timeout=lock_timeout):
+        # Someone else is rendering this page: wait for their result instead of
+        # stampeding the database with identical queries.
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            response = cache.get(key)
+            if response is not None:
+                RESPONSE_CACHE.labels("hit").inc()
+                return response
+        RESPONSE_CACHE.labels("miss").inc()
+        return render()
+
+    logger.debug("Response cache miss %s", key)
+    RESPONSE_CACHE.labels("miss").inc()
+    # The page is cached under the current versions; render it from the
+    # primary so replica lag can't be stored with them.
+    db_router.pin_primary()
+    try:
+        response = render()
+    except Exception:
+        cache.delete(lock_key)
+        raise
+
+    def store(rendered: HttpResponse) -> None:
+        if _is_cacheable(rendered):
+            cache.set(key, rendered, timeout=timeout)
+        cache.delete(lock_key)
+
+    if isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+    return response
+
+
+async def acached_response(
+    key: str, render: Callable[[], Awaitable[HttpResponse]], timeout: int
+) -> HttpResponse:
+    # Async views render plain HttpResponses, so there is no post-render step.
+    response = await cache.aget(key)
+    if response is not None:
+        logger.debug("Response cache hit %s", key)
+        RESPONSE_CACHE.labels("hit").inc()
+        return response
+
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.SHELTER_RESPONSE_CACHE_LOCK_TIMEOUT
+    if not await cache.aadd(lock_key, 1, timeout=lock_timeout):
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            response = await cache.aget(key)
+            if response is not None:
+                RESPONSE_CACHE.labels("hit").inc()
+                return response
+        RESPONSE_CACHE.labels("miss").inc()
+        return await render()
+
+    logger.debug("Response cache miss %s", key)
+    RESPONSE_CACHE.labels("miss").inc()
+    # As in cached_response; the routing state reaches the ORM's threads.
+    db_router.pin_primary()
+    try:
+        response = await render()
+        if _is_cacheable(response):
+            await cache.aset(key, response, timeout=timeout)
+    finally:
+        await cache.adelete(lock_key)
+    return response
+
+
+class CachedResponseMixin:
+    """Caches anonymous GET responses until one of ``cache_models`` changes.
+
+    Authenticated pages carry the username and a CSRF token, so they are
+    always rendered fresh.
+    """
+
+    cache_models: Tuple[str, ...] = ()
+
+    def _cache_key(self, request) -> Optional[str]:
+        if (
+            not settings.SHELTER_RESPONSE_CACHE_ENABLED
+            or request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+        ):
+            return None
+        return response_cache_key(request, self.cache_models)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+
+        key = self._cache_key(request)
+        if key is None:
+            return super().dispatch(request, *args, **kwargs)
+        return cached_response(
+            key,
+            lambda: super(CachedResponseMixin, self).dispatch(request, *args, **kwargs),
+            settings.SHELTER_RESPONSE_CACHE_TIMEOUT,
+        )
+
+    async def _adispatch(self, request, *args, **kwargs):
+        # Loading the session user and the version stamps may hit the database
+        # and the cache, so both happen in a single hop to the sync thread.
+        key = await sync_to_async(self._cache_key)(request)
+        render = super().dispatch
+        if key is None:
+            return await render(request, *args, **kwargs)
+        return await acached_response(
+            key,
+            lambda: render(request, *args, **kwargs),
+            settings.SHELTER_RESPONSE_CACHE_TIMEOUT,
+        )
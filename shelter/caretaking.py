@@ -0,0 +1,93 @@
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db.models import Case, Count, F, IntegerField, Q, QuerySet, Value, When
+
+from shelter.models import Breed, Dog
+from shelter.signals import caretakers_changed
+from shelter.transactions import immediate_atomic
+
+
+# Caretaker changes go straight to the dog/caretaker link table: membership is
+# an exists() on its unique (dog, caretaker) pair instead of loading every
+# caretaker of the dog, and each bulk operation is one INSERT or DELETE.
+DogCaretaker = Dog.caretakers.through
+
+# The "action" posted by the dog page's caretaker button. Sending the intent
+# rather than "toggle" keeps a double-click from undoing the first click.
+SELF_ACTIONS = {"add": True, "remove": False}
+
+
+def _pairs(dog_ids: Iterable[int], caretaker_ids: Iterable[int]):
+    return DogCaretaker.objects.filter(
+        dog_id__in=dog_ids, caretaker_id__in=caretaker_ids
+    )
+
+
+def assign_caretakers(dog_ids: Iterable[int], caretaker_ids: Iterable[int]) -> None:
+    dog_ids, caretaker_ids = list(dog_ids), list(caretaker_ids)
+    links = [
+        DogCaretaker(dog_id=dog_id, caretaker_id=caretaker_id)
+        for dog_id in dog_ids
+        for caretaker_id in caretaker_ids
+    ]
+    # Pairs that already exist, or that a concurrent request has just added,
+    # are skipped by the unique constraint.
+    DogCaretaker.objects.bulk_create(links, ignore_conflicts=True)
+    caretakers_changed.send(Dog, dog_ids=dog_ids, caretaker_ids=caretaker_ids)
+
+
+def remove_caretakers(dog_ids: Iterable[int], caretaker_ids: Iterable[int]) -> int:
+    dog_ids, caretaker_ids = list(dog_ids), list(caretaker_ids)
+    # No delete receivers listen to the link table, so this is a single
+    # fast DELETE; caretakers_changed below does the bookkeeping.
+    removed, _ = _pairs(dog_ids, caretaker_ids).delete()
+    if removed:
+        caretakers_changed.send(Dog, dog_ids=dog_ids, caretaker_ids=caretaker_ids)
+    return removed
+
+
+def toggle_caretaker(
+    dog_id: int, caretaker_id: int, assign: Optional[bool] = None
+) -> bool:
+    """Assign or remove one caretaker and return whether they now look after
+    the dog. Without ``assign`` the current membership is flipped.
+    """
+    with immediate_atomic():
+        if assign is None:
+            assign = not _pairs([dog_id], [caretaker_id]).exists()
+        if assign:
+            assign_caretakers([dog_id], [caretaker_id])
+        else:
+            remove_caretakers([dog_id], [caretaker_id])
+    return assign
+
+
+def with_workload(queryset: QuerySet) -> QuerySet:
+    """Annotate caretakers with ``dog_count`` and a ``<size>_dogs`` count per
+    breed size, grouped in the same query as the caretakers themselves.
+    """
+    counts = {"dog_count": Count("dogs")}
+    for size, _ in Breed.DOG_SIZES:
+        counts[f"{size}_dogs"] = Count("dogs", filter=Q(dogs__breed__dog_size=size))
+    return queryset.annotate(**counts)
+
+
+def over_capacity(queryset: QuerySet) -> QuerySet:
+    """Caretakers looking after more dogs than SHELTER_CARETAKER_CAPACITY
+    allows for their expert level, most overloaded first.
+    """
+    capacity = Case(
+        *[
+            When(expert_level=level, then=Value(limit))
+            for level, limit in settings.SHELTER_CARETAKER_CAPACITY.items()
+        ],
+        output_field=IntegerField(),
+    )
+    return (
+        with_workload(queryset)
+        .annotate(capacity=capacity)
+        .filter(dog_count__gt=F("capacity"))
+        .annotate(overload=F("dog_count") - F("capacity"))
+        .order_by("-overload", "username", "id")
+    )
@@ -0,0 +1,96 @@
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from shelter.models import Breed, Dog, ShelterStats
+
+
+DogKey = Tuple[int, str]
+
+
+def _stats_updates(deltas: Counter, sizes: dict) -> dict:
+    columns = Counter()
+    for (breed_id, gender), delta in deltas.items():
+        columns["total_dogs"] += delta
+        columns[f"{sizes[breed_id]}_dogs"] += delta
+        columns[f"{gender}_dogs"] += delta
+    return {column: F(column) + delta for column, delta in columns.items() if delta}
+
+
+# deltas map (breed_id, gender) -> change in number of dogs; callers run this
+# inside the transaction that changed the dog rows.
+def apply_dog_deltas(deltas: Counter) -> None:
+    deltas = Counter({key: delta for key, delta in deltas.items() if delta})
+    if not deltas:
+        return
+
+    per_breed = Counter()
+    for (breed_id, _), delta in deltas.items():
+        per_breed[breed_id] += delta
+    for breed_id, delta in per_breed.items():
+        if delta:
+            Breed.objects.filter(pk=breed_id).update(dog_count=F("dog_count") + delta)
+
+    sizes = dict(Breed.objects.filter(pk__in=per_breed).values_list("id", "dog_size"))
+    updates = _stats_updates(deltas, sizes)
+    if updates and not ShelterStats.objects.filter(pk=1).update(**updates):
+        rebuild_shelter_stats()
+
+
+def dog_changed(old: Optional[DogKey], new: Optional[DogKey]) -> None:
+    if old == new:
+        return
+    deltas = Counter()
+    if old is not None:
+        deltas[old] -= 1
+    if new is not None:
+        deltas[new] += 1
+    apply_dog_deltas(deltas)
+
+
+def dogs_created(dogs: Iterable[Dog]) -> None:
+    apply_dog_deltas(Counter((dog.breed_id, dog.gender) for dog in dogs))
+
+
+def breed_size_changed(breed_id: int, old_size: str, new_size: str) -> None:
+    if old_size == new_size:
+        return
+    dog_count = Breed.objects.filter(pk=breed_id).values_list("dog_count", flat=True)
+    moved = dog_count.first() or 0
+    if moved:
+        ShelterStats.objects.filter(pk=1).update(
+            **{
+                f"{old_size}_dogs": F(f"{old_size}_dogs") - moved,
+                f"{new_size}_dogs": F(f"{new_size}_dogs") + moved,
+            }
+        )
+
+
+def rebuild_breed_counts() -> int:
+    dog_counts = (
+        Dog.objects.filter(breed=OuterRef("pk"))
+        .order_by()
+        .values("breed")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Breed.objects.update(dog_count=Coalesce(Subquery(dog_counts), Value(0)))
+
+
+def rebuild_shelter_stats() -> ShelterStats:
+    aggregates = {"total_dogs": Count("pk")}
+    for size, _ in Breed.DOG_SIZES:
+        aggregates[f"{size}_dogs"] = Count("pk", filter=Q(breed__dog_size=size))
+    for gender, _ in Dog.DOG_GENDERS:
+        aggregates[f"{gender}_dogs"] = Count("pk", filter=Q(gender=gender))
+
+    values = Dog.objects.order_by().aggregate(**aggregates)
+    stats, _ = ShelterStats.objects.update_or_create(pk=1, defaults=values)
+    return stats
+
+
+def rebuild() -> ShelterStats:
+    rebuild_breed_counts()
+    return rebuild_shelter_stats()
@@ -0,0 +1,191 @@
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_COOKIE = "shelter_primary"
+
+
+@dataclass
+class RoutingState:
+    replica_reads: bool = False
+    wrote: bool = False
+
+
+# Set by ReplicaRoutingMiddleware for the duration of a request. Without it
+# (management commands, shell, workers) everything goes to the primary.
+current_routing: ContextVar[Optional[RoutingState]] = ContextVar(
+    "current_routing", default=None
+)
+
+
+def record_write() -> None:
+    state = current_routing.get()
+    if state is not None:
+        state.wrote = True
+        state.replica_reads = False
+
+
+def pin_primary() -> None:
+    # For the rest of the request, e.g. while rendering a page that will be
+    # cached: a lagging replica must not end up in the cache.
+    state = current_routing.get()
+    if state is not None:
+        state.replica_reads = False
+
+
+class ReplicaHealth:
+    """Remembers, per process, whether each replica answered its last check.
+
+    Replicas are probed at most every SHELTER_REPLICA_HEALTH_INTERVAL seconds,
+    so a replica that went down is retried after the interval. One thread
+    probes at a time; the others keep the last known state meanwhile.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.checked: Dict[str, Tuple[float, bool]] = {}
+        self.probing: Set[str] = set()
+
+    def is_healthy(self, alias: str) -> bool:
+        with self.lock:
+            checked_at, healthy = self.checked.get(alias, (None, False))
+            probe = alias not in self.probing and (
+                checked_at is None
+                or time.monotonic() - checked_at
+                >= settings.SHELTER_REPLICA_HEALTH_INTERVAL
+            )
+            if probe:
+                self.probing.add(alias)
+        if not probe:
+            return healthy
+        try:
+            healthy = check_replica(alias)
+        finally:
+            with self.lock:
+                self.checked[alias] = (time.monotonic(), healthy)
+                self.probing.discard(alias)
+        return healthy
+
+    def reset(self) -> None:
+        with self.lock:
+            self.checked.clear()
+
+
+def check_replica(alias: str) -> bool:
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                )
+                (lag,) = cursor.fetchone()
+                if lag is not None and lag > settings.SHELTER_REPLICA_MAX_LAG:
+                    logger.warning("Replica %s is %.0f s behind", alias, lag)
+                    return False
+            else:
+                cursor.execute("SELECT 1")
+    except DatabaseError as error:
+        logger.warning("Replica %s is unavailable: %s", alias, error)
+        return False
+    return True
+
+
+health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    """Sends the reads of shelter page requests to a healthy replica.
+
+    Writes, the reads of other requests, and every read of a client that
+    wrote in the last SHELTER_REPLICA_STICKY_SECONDS use the primary.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        state = current_routing.get()
+        if state is None or not state.replica_reads:
+            return None
+        replicas = [
+            alias for alias in settings.SHELTER_REPLICAS if health.is_healthy(alias)
+        ]
+        return random.choice(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        databases = {DEFAULT_DB_ALIAS, *settings.SHELTER_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.SHELTER_REPLICAS:
+            return self.get_response(request)
+
+        state = RoutingState()
+        token = current_routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.stick_to_primary(request, response, state)
+
+    async def __acall__(self, request):
+        if not settings.SHELTER_REPLICAS:
+            return await self.get_response(request)
+
+        state = RoutingState()
+        token = current_routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.stick_to_primary(request, response, state)
+
+    def stick_to_primary(self, request, response, state: RoutingState):
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.SHELTER_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = current_routing.get()
+        if state is not None and not state.wrote:
+            # The session and user are already loaded from the primary;
+            # only the shelter pages themselves read from a replica.
+            state.replica_reads = (
+                request.resolver_match.namespace == "shelter"
+                and request.method in SAFE_METHODS
+                and STICKY_COOKIE not in request.COOKIES
+            )
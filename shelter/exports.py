@@ -0,0 +1,120 @@
+import csv
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+from django.db.models.query import QuerySet
+
+from shelter.models import Vaccination
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+CSV_COLUMNS = [
+    "id",
+    "name",
+    "age",
+    "date_registered",
+    "sterilized",
+    "gender",
+    "breed",
+    "dog_size",
+    "caretakers",
+    "vaccinations",
+]
+
+
+def export_queryset(queryset: QuerySet) -> QuerySet:
+    return queryset.select_related("breed").prefetch_related(
+        Prefetch(
+            "caretakers",
+            queryset=get_user_model().objects.only("id", "username").order_by(),
+        ),
+        Prefetch(
+            "vaccination_set",
+            queryset=Vaccination.objects.select_related("vaccine").order_by(
+                "vaccination_date", "id"
+            ),
+        ),
+    )
+
+
+def dog_records(queryset: QuerySet, chunk_size: int = 1000) -> Iterator[dict]:
+    # iterator() runs the prefetches once per chunk, so memory stays bounded
+    # by chunk_size however many dogs are exported.
+    for dog in export_queryset(queryset).iterator(chunk_size=chunk_size):
+        yield {
+            "id": dog.pk,
+            "name": dog.name,
+            "age": dog.age,
+            "date_registered": dog.date_registered,
+            "sterilized": dog.sterilized,
+            "gender": dog.gender,
+            "breed": dog.breed.name,
+            "dog_size": dog.breed.dog_size,
+            "caretakers": [caretaker.username for caretaker in dog.caretakers.all()],
+            "vaccinations": [
+                {
+                    "vaccine": vaccination.vaccine.name,
+                    "date": vaccination.vaccination_date,
+                }
+                for vaccination in dog.vaccination_set.all()
+            ],
+        }
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(records: Iterable[dict]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in records:
+        record = dict(
+            record,
+            caretakers=";".join(record["caretakers"]),
+            vaccinations=";".join(
+                f"{item['vaccine']}@{item['date']}" for item in record["vaccinations"]
+            ),
+        )
+        yield writer.writerow([record[column] for column in CSV_COLUMNS])
+
+
+def jsonl_lines(records: Iterable[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def gzip_stream(chunks: Iterable[str], buffer_size: int = 64 * 1024) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    pending = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            compressed = compressor.compress(b"".join(pending))
+            pending, size = [], 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b"".join(pending)) + compressor.flush()
+
+
+def export_stream(
+    queryset: QuerySet,
+    export_format: str,
+    compress: bool = False,
+    chunk_size: int = 1000,
+) -> Iterator:
+    records = dog_records(queryset, chunk_size=chunk_size)
+    lines = csv_lines(records) if export_format == "csv" else jsonl_lines(records)
+    return gzip_stream(lines) if compress else lines
@@ -0,0 +1,53 @@
+from collections import Counter
+from typing import Dict, List, Set
+
+from django.db.models import Count, Exists, F, OuterRef
+from django.db.models.query import QuerySet
+
+from shelter.models import Dog
+
+
+FACETS = ("breed", "dog_size", "gender", "sterilized", "no_caretakers")
+
+
+def without_caretakers() -> Exists:
+    return ~Exists(Dog.caretakers.through.objects.filter(dog_id=OuterRef("pk")))
+
+
+def facet_rows(queryset: QuerySet) -> List[dict]:
+    """Number of dogs per combination of facet values, in one GROUP BY.
+
+    There are at most breeds x genders x 2 x 2 combinations, so every facet
+    can be counted from these rows without going back to the database.
+    """
+    return list(
+        queryset.annotate(no_caretakers=without_caretakers())
+        .values(
+            "breed",
+            "gender",
+            "sterilized",
+            "no_caretakers",
+            breed_name=F("breed__name"),
+            dog_size=F("breed__dog_size"),
+        )
+        .annotate(dogs=Count("pk"))
+        .order_by()
+    )
+
+
+def facet_counts(rows: List[dict], selected: Dict[str, Set]) -> Dict[str, Counter]:
+    # Each facet is counted with the selections of the other facets applied
+    # but not its own, so picking one option still shows its alternatives.
+    counts = {facet: Counter() for facet in FACETS}
+    for row in rows:
+        unmatched = [
+            facet
+            for facet in FACETS
+            if selected.get(facet) and row[facet] not in selected[facet]
+        ]
+        if not unmatched:
+            for facet in FACETS:
+                counts[facet][row[facet]] += row["dogs"]
+        elif len(unmatched) == 1:
+            counts[unmatched[0]][row[unmatched[0]]] += row["dogs"]
+    return counts
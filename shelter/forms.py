@@ -1,14 +1,21 @@
+from typing import Dict
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 
-from shelter.models import Caretaker, Dog
+from shelter.caretaking import assign_caretakers, remove_caretakers
+from shelter.facets import facet_counts, facet_rows, without_caretakers
+from shelter.models import Breed, Caretaker, Dog, Vaccine
+from shelter.search import search
+from shelter.widgets import AutocompleteSelectMultiple
 
 
 class DogForm(forms.ModelForm):
+    # Only the submitted ids are looked up when the form is validated.
     caretakers = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple("shelter:caretaker-autocomplete"),
         required=False,
     )
 
@@ -25,6 +32,33 @@ class DogForm(forms.ModelForm):
         ]
 
 
+class CaretakerAssignmentForm(forms.Form):
+    caretakers = forms.ModelMultipleChoiceField(
+        queryset=get_user_model().objects.all(),
+        widget=AutocompleteSelectMultiple("shelter:caretaker-autocomplete"),
+    )
+    operation = forms.ChoiceField(
+        choices=[("assign", "Assign to the dogs"), ("remove", "Remove from the dogs")]
+    )
+
+    def save(self, dog_ids) -> None:
+        caretaker_ids = [caretaker.pk for caretaker in self.cleaned_data["caretakers"]]
+        if self.cleaned_data["operation"] == "assign":
+            assign_caretakers(dog_ids, caretaker_ids)
+        else:
+            remove_caretakers(dog_ids, caretaker_ids)
+
+
+class DogCaretakerAssignmentForm(CaretakerAssignmentForm):
+    dogs = forms.ModelMultipleChoiceField(queryset=Dog.objects.all())
+
+
+class BulkVaccinationForm(forms.Form):
+    dogs = forms.ModelMultipleChoiceField(queryset=Dog.objects.all())
+    vaccine = forms.ModelChoiceField(queryset=Vaccine.objects.all())
+    vaccination_date = forms.DateField()
+
+
 class CaretakerCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = Caretaker
@@ -56,8 +90,18 @@ class CaretakerSearchForm(forms.Form):
         max_length=100,
         required=False,
         label="",
-        widget=forms.TextInput(attrs={"placeholder": "search by username"}),
+        widget=forms.TextInput(attrs={"placeholder": "search by username or name"}),
     )
+    sort = forms.ChoiceField(
+        choices=[("", "sort by username"), ("dogs", "most dogs")]
+        + [(size, f"most {size} dogs") for size, _ in Breed.DOG_SIZES],
+        required=False,
+        label="",
+    )
+
+
+def _breed_choices():
+    return Breed.objects.values_list("id", "name")
 
 
 class DogSearchForm(forms.Form):
@@ -67,3 +111,91 @@ class DogSearchForm(forms.Form):
         label="",
         widget=forms.TextInput(attrs={"placeholder": "search by dog name"}),
     )
+    breed = forms.TypedMultipleChoiceField(
+        choices=_breed_choices,
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+    dog_size = forms.MultipleChoiceField(
+        choices=Breed.DOG_SIZES,
+        required=False,
+        label="Size",
+        widget=forms.CheckboxSelectMultiple,
+    )
+    gender = forms.MultipleChoiceField(
+        choices=Dog.DOG_GENDERS,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+    sterilized = forms.TypedMultipleChoiceField(
+        choices=[("True", "yes"), ("False", "no")],
+        coerce=lambda value: value == "True",
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+    no_caretakers = forms.BooleanField(required=False, label="Without caretakers")
+    registered_after = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+    registered_before = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={"type": "date"})
+    )
+
+    def filter_base(self, queryset):
+        # The filters that aren't counted as facets.
+        data = self.cleaned_data
+        if data.get("name"):
+            queryset = search(queryset, data["name"])
+        if data.get("registered_after"):
+            queryset = queryset.filter(date_registered__gte=data["registered_after"])
+        if data.get("registered_before"):
+            queryset = queryset.filter(date_registered__lte=data["registered_before"])
+        return queryset
+
+    def selected_facets(self) -> Dict[str, set]:
+        data = self.cleaned_data
+        return {
+            "breed": set(data.get("breed", [])),
+            "dog_size": set(data.get("dog_size", [])),
+            "gender": set(data.get("gender", [])),
+            "sterilized": set(data.get("sterilized", [])),
+            "no_caretakers": {True} if data.get("no_caretakers") else set(),
+        }
+
+    def filter_queryset(self, queryset):
+        queryset = self.filter_base(queryset)
+        selected = self.selected_facets()
+        if selected["breed"]:
+            queryset = queryset.filter(breed_id__in=selected["breed"])
+        if selected["dog_size"]:
+            queryset = queryset.filter(breed__dog_size__in=selected["dog_size"])
+        if selected["gender"]:
+            queryset = queryset.filter(gender__in=selected["gender"])
+        if selected["sterilized"]:
+            queryset = queryset.filter(sterilized__in=selected["sterilized"])
+        if selected["no_caretakers"]:
+            queryset = queryset.filter(without_caretakers())
+        return queryset
+
+    def add_facet_counts(self, queryset) -> None:
+        """Show how many dogs each option would match beside its label."""
+        valid = self.is_valid()
+        rows = facet_rows(self.filter_base(queryset) if valid else queryset)
+        counts = facet_counts(rows, self.selected_facets() if valid else {})
+        breeds = {row["breed"]: row["breed_name"] for row in rows}
+
+        self.fields["breed"].choices = [
+            (pk, f"{breeds[pk]} ({count})")
+            for pk, count in sorted(
+                counts["breed"].items(), key=lambda item: breeds[item[0]]
+            )
+        ]
+        for facet in ("dog_size", "gender", "sterilized"):
+            field = self.fields[facet]
+            coerce = getattr(field, "coerce", str)
+            field.choices = [
+                (value, f"{label} ({counts[facet][coerce(value)]})")
+                for value, label in field.choices
+            ]
+        self.fields["no_caretakers"].label += f" ({counts['no_caretakers'][True]})"
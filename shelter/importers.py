@@ -0,0 +1,315 @@
+import csv
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import django
+from django import forms
+from django.db import connections, transaction
+
+from shelter.forms import DogForm
+from shelter.models import Breed, Dog, ImportCheckpoint, Vaccination, Vaccine
+from shelter.search import normalize
+from shelter.signals import bulk_created
+
+
+Row = Tuple[int, dict]
+OnReject = Callable[[int, dict, dict], None]
+
+
+class DogImportForm(DogForm):
+    # Breed names are resolved from the importer's cache, not per-row queries.
+    caretakers = None
+
+    class Meta(DogForm.Meta):
+        fields = ["name", "age", "date_registered", "sterilized", "gender"]
+
+
+class BreedImportForm(forms.ModelForm):
+    class Meta:
+        model = Breed
+        fields = ["name", "dog_size"]
+
+    def validate_unique(self):
+        # Existing names are skipped using the importer's breed cache.
+        pass
+
+
+class VaccinationImportForm(forms.ModelForm):
+    dog = forms.IntegerField(min_value=1)
+    vaccine = forms.CharField(max_length=255)
+
+    class Meta:
+        model = Vaccination
+        fields = ["vaccination_date"]
+
+
+IMPORT_FORMS = {
+    "dogs": DogImportForm,
+    "breeds": BreedImportForm,
+    "vaccinations": VaccinationImportForm,
+}
+
+
+def read_rows(path: str, file_format: str) -> Iterator[Row]:
+    with open(path, newline="", encoding="utf-8") as source:
+        if file_format == "csv":
+            for number, row in enumerate(csv.DictReader(source), start=1):
+                yield number, row
+            return
+        for number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                row = {"__error__": f"invalid JSON: {error}", "__line__": line}
+            if not isinstance(row, dict):
+                row = {"__error__": "expected a JSON object", "__line__": line}
+            yield number, row
+
+
+def clean_rows(kind: str, rows: List[Row]) -> List[tuple]:
+    # Runs in worker processes, so it must not touch the database.
+    form_class = IMPORT_FORMS[kind]
+    results = []
+    for number, row in rows:
+        if "__error__" in row:
+            results.append((number, row, None, {"__all__": [row["__error__"]]}))
+            continue
+        data = {key: value for key, value in row.items() if value not in ("", None)}
+        if kind == "dogs" and "sterilized" in data:
+            data["sterilized"] = str(data["sterilized"]).lower() in ("1", "true", "yes")
+        form = form_class(data=data)
+        if form.is_valid():
+            results.append((number, row, form.cleaned_data, None))
+        else:
+            errors = {name: list(messages) for name, messages in form.errors.items()}
+            results.append((number, row, None, errors))
+    return results
+
+
+def _rejected_rows(path: str) -> Set[int]:
+    numbers = set()
+    try:
+        with open(path, encoding="utf-8") as rejects:
+            for line in rejects:
+                try:
+                    numbers.add(json.loads(line)["row"])
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by the interruption.
+                    continue
+    except FileNotFoundError:
+        pass
+    return numbers
+
+
+@contextmanager
+def rejects_file(path: str, restart: bool = False) -> Iterator[OnReject]:
+    """Yields an ``on_reject`` that appends rejected rows to a JSONL file.
+
+    A resumed import reads the rows after its checkpoint again, and those
+    rejected before the interruption are already in the file, so they are not
+    written twice. A restart starts the file over.
+    """
+    written = set() if restart else _rejected_rows(path)
+    with open(path, "w" if restart else "a", encoding="utf-8") as output:
+
+        def on_reject(number: int, row: dict, errors: dict) -> None:
+            if number in written:
+                return
+            written.add(number)
+            output.write(json.dumps({"row": number, "errors": errors, "data": row}))
+            output.write("\n")
+
+        yield on_reject
+
+
+@dataclass
+class ImportStats:
+    resumed_from: int = 0
+    processed: int = 0
+    imported: int = 0
+    rejected: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class ShelterImporter:
+    path: str
+    kind: str
+    file_format: str = "csv"
+    batch_size: int = 500
+    batches_per_transaction: int = 10
+    workers: int = 0
+    create_breeds: bool = False
+    create_vaccines: bool = False
+    restart: bool = False
+    # multiprocessing start method of the workers; None is the platform's
+    # default (fork on Linux, spawn on macOS and Windows).
+    start_method: Optional[str] = None
+    on_reject: OnReject = lambda number, row, errors: None
+    on_progress: Callable[[ImportStats], None] = lambda stats: None
+    stats: ImportStats = field(default_factory=ImportStats)
+
+    def __post_init__(self) -> None:
+        self.breeds: Dict[str, int] = {
+            normalize(name): pk for name, pk in Breed.objects.values_list("name", "pk")
+        }
+        self.vaccines: Dict[str, int] = {
+            normalize(name): pk
+            for name, pk in Vaccine.objects.values_list("name", "pk")
+        }
+
+    def _batches(self, rows: Iterable[Row]) -> Iterator[List[Row]]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _cleaned_batches(
+        self, rows: Iterable[Row], executor: Optional[ProcessPoolExecutor]
+    ) -> Iterator[List[tuple]]:
+        if executor is None:
+            for batch in self._batches(rows):
+                yield clean_rows(self.kind, batch)
+            return
+
+        pending = deque()
+        for batch in self._batches(rows):
+            pending.append(executor.submit(clean_rows, self.kind, batch))
+            # Bound the read-ahead so memory stays flat on huge files.
+            if len(pending) >= self.workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def _start_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            return None
+        # Start the workers up front, without any open database connection
+        # for a forked one to inherit. Spawned workers set Django up anew.
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=django.setup,
+        )
+        executor.submit(int).result()
+        return executor
+
+    def _breed_id(self, name: str) -> Optional[int]:
+        key = normalize(name)
+        if key and key not in self.breeds and self.create_breeds:
+            breed = Breed.objects.create(name=name.strip())
+            self.breeds[key] = breed.pk
+        return self.breeds.get(key)
+
+    def _vaccine_id(self, name: str) -> Optional[int]:
+        key = normalize(name)
+        if key and key not in self.vaccines and self.create_vaccines:
+            self.vaccines[key] = Vaccine.objects.create(name=name.strip()).pk
+        return self.vaccines.get(key)
+
+    def _build(self, cleaned: List[tuple]) -> list:
+        objects = []
+        if self.kind == "vaccinations":
+            dog_ids = {data["dog"] for _, _, data, _ in cleaned if data}
+            existing_dogs = set(
+                Dog.objects.filter(pk__in=dog_ids).values_list("pk", flat=True)
+            )
+
+        for number, row, data, errors in cleaned:
+            self.stats.processed += 1
+            if errors:
+                self._reject(number, row, errors)
+            elif self.kind == "dogs":
+                breed_id = self._breed_id(row.get("breed") or "")
+                if breed_id is None:
+                    self._reject(number, row, {"breed": ["Unknown breed."]})
+                    continue
+                objects.append(Dog(breed_id=breed_id, **data))
+            elif self.kind == "breeds":
+                if normalize(data["name"]) in self.breeds:
+                    self.stats.skipped += 1
+                    continue
+                breed = Breed(**data)
+                self.breeds[normalize(breed.name)] = None
+                objects.append(breed)
+            else:
+                if data["dog"] not in existing_dogs:
+                    self._reject(number, row, {"dog": ["Unknown dog."]})
+                    continue
+                vaccine_id = self._vaccine_id(data["vaccine"])
+                if vaccine_id is None:
+                    self._reject(number, row, {"vaccine": ["Unknown vaccine."]})
+                    continue
+                objects.append(
+                    Vaccination(
+                        dog_id=data["dog"],
+                        vaccine_id=vaccine_id,
+                        vaccination_date=data["vaccination_date"],
+                    )
+                )
+        return objects
+
+    def _reject(self, number: int, row: dict, errors: dict) -> None:
+        self.stats.rejected += 1
+        self.on_reject(number, row, errors)
+
+    def _write(self, objects: list) -> None:
+        if not objects:
+            return
+        model = type(objects[0])
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        if model is Breed:
+            self.breeds.update({normalize(breed.name): breed.pk for breed in created})
+        bulk_created.send(sender=model, instances=created)
+        self.stats.imported += len(created)
+
+    def run(self) -> ImportStats:
+        executor = self._start_executor()
+        try:
+            return self._run(executor)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _run(self, executor: Optional[ProcessPoolExecutor]) -> ImportStats:
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            source=self.path, kind=self.kind
+        )
+        if self.restart:
+            checkpoint.rows_done = 0
+        start_after = checkpoint.rows_done
+        self.stats.resumed_from = start_after
+
+        rows = (
+            (number, row)
+            for number, row in read_rows(self.path, self.file_format)
+            if number > start_after
+        )
+        batches = self._cleaned_batches(rows, executor)
+        while True:
+            done = False
+            with transaction.atomic():
+                for _ in range(self.batches_per_transaction):
+                    cleaned = next(batches, None)
+                    if cleaned is None:
+                        done = True
+                        break
+                    self._write(self._build(cleaned))
+                    checkpoint.rows_done = cleaned[-1][0]
+                # Saved with the rows it covers, so a crash never replays them.
+                checkpoint.save(update_fields=["rows_done", "updated_at"])
+            self.on_progress(self.stats)
+            if done:
+                return self.stats
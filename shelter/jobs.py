@@ -0,0 +1,315 @@
+import logging
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.db.models import F, Q
+from django.utils import timezone
+
+from shelter.models import Job
+
+
+# A database-backed job queue: views enqueue rows and return, and
+# "manage.py run_worker" claims and runs them in a thread or process pool.
+
+logger = logging.getLogger(__name__)
+
+TASKS: Dict[str, Callable] = {}
+
+# Minute, hour, day of month, month and day of week (0 or 7 is Sunday).
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def task(name: str) -> Callable:
+    """Register a function that jobs named ``name`` run. It is called with
+    the job's kwargs and may return anything JSON serializable.
+    """
+
+    def register(func: Callable) -> Callable:
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def enqueue(
+    name: str,
+    *,
+    priority: int = 0,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+    unique_key: Optional[str] = None,
+    created_by=None,
+    **kwargs,
+) -> Job:
+    """Queue ``name`` to run with ``kwargs``, which must be JSON serializable.
+
+    Inside a transaction the job only becomes visible to workers on commit.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task {name}")
+    return Job.objects.create(
+        task=name,
+        kwargs=kwargs,
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.SHELTER_JOB_MAX_ATTEMPTS,
+        unique_key=unique_key,
+        created_by=created_by,
+    )
+
+
+def _timed_out(now: datetime) -> Q:
+    # Running workers refresh claimed_at every SHELTER_JOB_HEARTBEAT seconds.
+    stale = now - timedelta(seconds=settings.SHELTER_JOB_TIMEOUT)
+    return Q(status=Job.RUNNING, claimed_at__lt=stale)
+
+
+def _claimable(now: datetime) -> Q:
+    # Jobs of a worker that died are taken over once they time out, if they
+    # have attempts left; fail_timed_out() fails the others.
+    return Q(status=Job.QUEUED, run_at__lte=now) | (
+        _timed_out(now) & Q(attempts__lt=F("max_attempts"))
+    )
+
+
+def claim_jobs(limit: int, worker: str) -> List[int]:
+    """Mark up to ``limit`` due jobs as running for ``worker``, highest
+    priority first, and return their ids.
+    """
+    now = timezone.now()
+    queued = Job.objects.filter(_claimable(now)).order_by("-priority", "run_at", "id")
+    claim = {
+        "status": Job.RUNNING,
+        "claimed_at": now,
+        "worker": worker,
+        "attempts": F("attempts") + 1,
+    }
+    if connections[DEFAULT_DB_ALIAS].features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            locked = queued.select_for_update(skip_locked=True)
+            ids = list(locked.values_list("pk", flat=True)[:limit])
+            Job.objects.filter(pk__in=ids).update(**claim)
+        return ids
+
+    # SQLite has no row locks: each candidate is claimed by an UPDATE that
+    # only matches while it is still claimable, so of several workers racing
+    # for a job exactly one updates a row.
+    ids = []
+    for pk in queued.values_list("pk", flat=True)[:limit]:
+        if Job.objects.filter(_claimable(now), pk=pk).update(**claim):
+            ids.append(pk)
+    return ids
+
+
+def heartbeat(ids: Iterable[int], worker: str) -> int:
+    """Refresh the claims ``worker`` holds on the jobs ``ids``, so jobs that
+    run longer than SHELTER_JOB_TIMEOUT are not taken over.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    return Job.objects.filter(pk__in=ids, status=Job.RUNNING, worker=worker).update(
+        claimed_at=timezone.now()
+    )
+
+
+def fail_timed_out(now: datetime) -> int:
+    """Mark jobs whose worker died during their last attempt as failed."""
+    return Job.objects.filter(_timed_out(now), attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        error="Timed out: the worker running the last attempt stopped responding.",
+        finished_at=now,
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.SHELTER_JOB_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.SHELTER_JOB_MAX_RETRY_DELAY))
+
+
+def run_job(job_id: int) -> str:
+    """Run a claimed job and record the outcome; returns the new status.
+
+    Failed jobs are queued again with exponential backoff until they have
+    used up max_attempts.
+    """
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=job_id)
+        # Only the claim this worker holds may record the outcome; a job
+        # that timed out may have been taken over meanwhile, which counted
+        # another attempt.
+        claimed = Job.objects.filter(
+            pk=job.pk, status=Job.RUNNING, attempts=job.attempts
+        )
+        try:
+            result = TASKS[job.task](**job.kwargs)
+        except Exception:
+            logger.exception("Job %s (%s) failed", job.pk, job.task)
+            error = traceback.format_exc()
+            if job.attempts < job.max_attempts:
+                claimed.update(
+                    status=Job.QUEUED,
+                    run_at=timezone.now() + retry_delay(job.attempts),
+                    error=error,
+                )
+                return Job.QUEUED
+            claimed.update(status=Job.FAILED, error=error, finished_at=timezone.now())
+            return Job.FAILED
+        claimed.update(
+            status=Job.DONE, result=result, error="", finished_at=timezone.now()
+        )
+        return Job.DONE
+    finally:
+        close_old_connections()
+
+
+def _cron_values(field: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-"))
+        else:
+            start = int(part)
+            end = high if step else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"Invalid cron field {field!r}")
+        values.update(range(start, end + 1, int(step or 1)))
+    return frozenset(values)
+
+
+@lru_cache(maxsize=None)
+def parse_cron(expression: str) -> Tuple[frozenset, ...]:
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Invalid cron expression {expression!r}")
+    minute, hour, day, month, weekday = (
+        _cron_values(field, *limits) for field, limits in zip(fields, CRON_FIELDS)
+    )
+    weekday = frozenset(value % 7 for value in weekday)
+    # As in cron, a restricted day of month and day of week match either.
+    either_day = fields[2] != "*" and fields[4] != "*"
+    return minute, hour, day, month, weekday, either_day
+
+
+def cron_matches(expression: str, moment: datetime) -> bool:
+    """Whether the five-field cron ``expression`` fires at ``moment``'s
+    minute, in the shelter's time zone.
+    """
+    minute, hour, day, month, weekday, either_day = parse_cron(expression)
+    moment = timezone.localtime(moment)
+    day_matches = moment.day in day
+    weekday_matches = moment.isoweekday() % 7 in weekday
+    if either_day:
+        date_matches = day_matches or weekday_matches
+    else:
+        date_matches = day_matches and weekday_matches
+    return (
+        moment.minute in minute
+        and moment.hour in hour
+        and moment.month in month
+        and date_matches
+    )
+
+
+def next_run(expression: str, after: datetime) -> Optional[datetime]:
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    for _ in range(366 * 24 * 60):
+        if cron_matches(expression, moment):
+            return moment
+        moment += timedelta(minutes=1)
+    return None
+
+
+def enqueue_periodic(since: datetime, until: datetime) -> int:
+    """Enqueue SHELTER_PERIODIC_JOBS due in the minutes after ``since`` up to
+    ``until``. Each is enqueued once per minute it is due, however many
+    workers run this.
+    """
+    moment = max(since, until - timedelta(days=1))
+    moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    created = 0
+    while moment <= until:
+        for name, schedule in settings.SHELTER_PERIODIC_JOBS.items():
+            if not cron_matches(schedule["cron"], moment):
+                continue
+            try:
+                with transaction.atomic():
+                    enqueue(
+                        schedule["task"],
+                        priority=schedule.get("priority", 0),
+                        unique_key=f"{name}@{moment:%Y-%m-%dT%H:%M}",
+                        **schedule.get("kwargs", {}),
+                    )
+                created += 1
+            except IntegrityError:
+                pass
+        moment += timedelta(minutes=1)
+    return created
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def work(
+    executor: Executor,
+    concurrency: int,
+    poll: float = 1.0,
+    once: bool = False,
+    worker: Optional[str] = None,
+) -> int:
+    """Keep ``concurrency`` jobs running in ``executor`` and return how many
+    were started. With ``once``, returns when no job is due or running.
+    """
+    worker = worker or worker_name()
+    running: Dict[Future, int] = {}
+    started = 0
+    checked = timezone.now()
+    beat = None
+    while True:
+        now = timezone.now()
+        enqueue_periodic(checked, now)
+        checked = now
+        if (
+            beat is None
+            or (now - beat).total_seconds() >= settings.SHELTER_JOB_HEARTBEAT
+        ):
+            heartbeat(running.values(), worker)
+            fail_timed_out(now)
+            beat = now
+
+        ids = (
+            claim_jobs(concurrency - len(running), worker)
+            if len(running) < concurrency
+            else []
+        )
+        running.update((executor.submit(run_job, pk), pk) for pk in ids)
+        started += len(ids)
+        if not running:
+            if once:
+                return started
+            time.sleep(poll)
+            continue
+        done, _ = wait(running, timeout=0 if ids else poll, return_when=FIRST_COMPLETED)
+        for future in done:
+            del running[future]
+            if future.exception() is not None:
+                logger.error("Worker error", exc_info=future.exception())
@@ -0,0 +1,118 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from shelter.benchmarks.dataset import DatasetGenerator
+from shelter.benchmarks.harness import Harness
+from shelter.benchmarks.reports import (
+    compare_reports,
+    load_report,
+    new_report,
+    regressions,
+    save_report,
+)
+from shelter.models import Caretaker
+
+
+def _sizes(value: str):
+    try:
+        return [int(size) for size in value.split(",")]
+    except ValueError:
+        raise CommandError("--sizes must be a comma-separated list of integers")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency, query count and memory of every shelter route and admin "
+        "changelist against generated datasets in a throwaway test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=_sizes,
+            default=[100, 1000, 10000],
+            help="Comma-separated numbers of dogs to generate (default: 100,1000,10000)",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--only", help="Only measure routes containing this text")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--compare", help="Compare against an earlier JSON report")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed relative slowdown before a timing counts as a regression",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error if --compare finds regressions",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            report = self.run_benchmarks(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options["output"]:
+            save_report(report, options["output"])
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["compare"]:
+            self.compare(load_report(options["compare"]), report, options)
+
+    def run_benchmarks(self, options) -> dict:
+        report = new_report(options["repeat"], options["seed"])
+        for size in options["sizes"]:
+            call_command("flush", interactive=False, verbosity=0)
+            # flush only empties Django's tables, not the search index's.
+            call_command("rebuild_search_index", stdout=StringIO())
+            dataset = DatasetGenerator(size, seed=options["seed"]).generate()
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{size} dogs: {dataset}"))
+
+            user = Caretaker.objects.create_superuser("benchmark", password="benchmark")
+            client = Client()
+            client.force_login(user)
+            harness = Harness(
+                client, repeat=options["repeat"], warmup=options["warmup"]
+            )
+            routes = harness.run(only=options["only"])
+            # Logged-out visitors get the response cache, so this run measures
+            # its hits; the logged-in run above renders every page.
+            harness.client = Client()
+            with override_settings(SHELTER_RESPONSE_CACHE_ENABLED=True):
+                routes.update(harness.run(only=options["only"], anonymous=True))
+            for result in routes.values():
+                self.stdout.write(
+                    f"{result['status']} {result['name']:<50} "
+                    f"p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  "
+                    f"{result['queries']:>4} queries  {result['peak_memory_kb']:>8.0f} KiB"
+                )
+            report["sizes"][str(size)] = {"dataset": dataset, "routes": routes}
+        return report
+
+    def compare(self, before: dict, after: dict, options) -> None:
+        found = regressions(compare_reports(before, after), options["threshold"])
+        for change in found:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{change.size} dogs {change.route} {change.metric}: "
+                    f"{change.before} -> {change.after}"
+                )
+            )
+        if not found:
+            self.stdout.write(self.style.SUCCESS("No regressions"))
+        elif options["fail_on_regression"]:
+            raise CommandError(f"{len(found)} regressions")
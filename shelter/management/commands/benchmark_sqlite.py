@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from shelter.benchmarks.concurrency import (
+    PROFILES,
+    create_benchmark_users,
+    run_profile,
+    use_sqlite_file,
+)
+from shelter.benchmarks.dataset import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent read/write throughput of the SQLite profile: worker "
+        "processes serve a mix of dog pages and caretaker toggles from one "
+        "database file, once per profile"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dogs", type=int, default=2000)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument(
+            "--write-ratio",
+            type=float,
+            default=0.2,
+            help="Share of requests that write (default: 0.2)",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--profiles",
+            default=",".join(PROFILES),
+            help=f"Comma-separated profiles to run (default: {','.join(PROFILES)})",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"].split(",")
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+
+        setup_test_environment()
+        # Measure the database, not the caches and the sampling around it.
+        overrides = override_settings(
+            SHELTER_RESPONSE_CACHE_ENABLED=False,
+            SHELTER_PERF_ENABLED=False,
+            SHELTER_QUERY_PROFILE_ENABLED=False,
+            SHELTER_METRICS_ENABLED=False,
+        )
+        try:
+            with tempfile.TemporaryDirectory() as directory, overrides:
+                template = os.path.join(directory, "template.sqlite3")
+                self.create_template(template, options)
+                report = {
+                    "dogs": options["dogs"],
+                    "workers": options["workers"],
+                    "duration": options["duration"],
+                    "write_ratio": options["write_ratio"],
+                    "profiles": {},
+                }
+                for name in profiles:
+                    result = run_profile(
+                        template,
+                        os.path.join(directory, f"{name}.sqlite3"),
+                        PROFILES[name],
+                        workers=options["workers"],
+                        duration=options["duration"],
+                        write_ratio=options["write_ratio"],
+                        seed=options["seed"],
+                    )
+                    report["profiles"][name] = result
+                    self.write_result(name, result)
+        finally:
+            teardown_test_environment()
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def create_template(self, path: str, options) -> None:
+        use_sqlite_file(path, PROFILES["stock"].engine)
+        with override_settings(SHELTER_SQLITE_PRAGMAS={}):
+            call_command("migrate", interactive=False, verbosity=0)
+            dataset = DatasetGenerator(options["dogs"], seed=options["seed"]).generate()
+            create_benchmark_users(options["workers"])
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Dataset: {dataset}"))
+
+    def write_result(self, name: str, result: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_LABEL(name))
+        for kind, numbers in result.items():
+            self.stdout.write(
+                f"  {kind:<6} {numbers['per_second']:>8.1f} req/s  "
+                f"p50 {numbers['p50_ms'] or 0:>8.1f} ms  "
+                f"p95 {numbers['p95_ms'] or 0:>8.1f} ms  "
+                f"{numbers['errors']:>5} locked"
+            )
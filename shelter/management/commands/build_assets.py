@@ -0,0 +1,46 @@
+import json
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from shelter.assets import ShelterStaticFilesStorage, asset_report, project_asset_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Collect static files with the project's CSS/JS minified, bundled, "
+        "content-hashed and precompressed, and report their sizes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Write the size report as JSON")
+
+    def handle(self, *args, **options):
+        if not isinstance(staticfiles_storage, ShelterStaticFilesStorage):
+            raise CommandError(
+                "Static files are served from the sources; "
+                "set SHELTER_MANIFEST_STATIC=1 to build the manifest"
+            )
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+        names = project_asset_names() + list(settings.SHELTER_ASSET_BUNDLES)
+        sizes = asset_report(staticfiles_storage, names)
+        for size in sizes:
+            self.stdout.write(
+                f"{size.stored_name:<40} {size.source:>8} B -> {size.minified:>8} B  "
+                f"gzip {size.gzip:>8} B  brotli {size.brotli:>8} B"
+            )
+        before = sum(size.source for size in sizes)
+        after = sum(min(size.gzip, size.brotli) for size in sizes)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(sizes)} assets: {before} B before, {after} B served "
+                f"({100 - 100 * after / max(before, 1):.0f}% smaller)"
+            )
+        )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                json.dump([size._asdict() for size in sizes], output, indent=2)
@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shelter.exports import EXPORT_FORMATS, export_stream
+from shelter.forms import DogSearchForm
+from shelter.models import Dog
+
+
+class Command(BaseCommand):
+    help = "Stream the dog registry with breeds, caretakers and vaccinations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compress output")
+        parser.add_argument(
+            "--output", help="File to write to (default: standard output)"
+        )
+        parser.add_argument("--name", default="", help="Same as the dog list search")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        form = DogSearchForm({"name": options["name"]})
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        queryset = form.filter_queryset(Dog.objects.order_by("date_registered", "id"))
+
+        chunks = export_stream(
+            queryset,
+            options["format"],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["output"]:
+            if options["gzip"]:
+                output = open(options["output"], "wb")
+            else:
+                output = open(options["output"], "w", encoding="utf-8", newline="")
+            with output:
+                for chunk in chunks:
+                    output.write(chunk)
+        elif options["gzip"]:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
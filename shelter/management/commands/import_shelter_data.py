@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shelter.importers import IMPORT_FORMS, ShelterImporter, rejects_file
+from shelter.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream dogs, breeds or vaccinations from a CSV/JSONL file into the "
+        "database in batches. Interrupted imports resume from their checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import")
+        parser.add_argument("--kind", required=True, choices=sorted(IMPORT_FORMS))
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format (default: guessed from the file extension)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--batches-per-transaction",
+            type=int,
+            default=10,
+            help="Batches written (and checkpointed) per transaction",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Parse and validate rows in this many processes",
+        )
+        parser.add_argument(
+            "--start-method",
+            choices=multiprocessing.get_all_start_methods(),
+            help="How the --workers processes are started "
+            "(default: the platform's default)",
+        )
+        parser.add_argument(
+            "--rejects",
+            help="File receiving rejected rows with their errors "
+            "(default: <path>.rejects.jsonl)",
+        )
+        parser.add_argument(
+            "--create-breeds",
+            action="store_true",
+            help="Create unknown breeds instead of rejecting their dogs",
+        )
+        parser.add_argument(
+            "--create-vaccines",
+            action="store_true",
+            help="Create unknown vaccines instead of rejecting their vaccinations",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help='Queue the import for "manage.py run_worker" and return',
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the saved checkpoint and start from the first row",
+        )
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        if not os.path.exists(path):
+            raise CommandError(f"File {path} does not exist")
+        file_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "jsonl"
+        )
+        if options["background"]:
+            job = enqueue(
+                "shelter.import_shelter_data",
+                path=path,
+                kind=options["kind"],
+                file_format=file_format,
+                batch_size=options["batch_size"],
+                batches_per_transaction=options["batches_per_transaction"],
+                workers=options["workers"],
+                start_method=options["start_method"],
+                create_breeds=options["create_breeds"],
+                create_vaccines=options["create_vaccines"],
+                restart=options["restart"],
+                rejects=options["rejects"] or "",
+            )
+            self.stdout.write(self.style.SUCCESS(f"Queued as job {job.pk}"))
+            return
+        rejects_path = options["rejects"] or f"{path}.rejects.jsonl"
+        started = time.perf_counter()
+
+        with rejects_file(rejects_path, restart=options["restart"]) as on_reject:
+
+            def on_progress(stats):
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{stats.processed} rows ({stats.imported} imported, "
+                    f"{stats.rejected} rejected) "
+                    f"{stats.processed / elapsed if elapsed else 0:.0f} rows/s"
+                )
+
+            importer = ShelterImporter(
+                path=path,
+                kind=options["kind"],
+                file_format=file_format,
+                batch_size=options["batch_size"],
+                batches_per_transaction=options["batches_per_transaction"],
+                workers=options["workers"],
+                start_method=options["start_method"],
+                create_breeds=options["create_breeds"],
+                create_vaccines=options["create_vaccines"],
+                restart=options["restart"],
+                on_reject=on_reject,
+                on_progress=on_progress,
+            )
+            stats = importer.run()
+
+        elapsed = time.perf_counter() - started
+        if stats.resumed_from:
+            self.stdout.write(f"Resumed after row {stats.resumed_from}")
+        if stats.rejected:
+            self.stdout.write(f"Rejected rows written to {rejects_path}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {stats.imported} {options['kind']} "
+                f"({stats.rejected} rejected, {stats.skipped} skipped) "
+                f"in {elapsed:.1f}s, "
+                f"{stats.processed / elapsed if elapsed else 0:.0f} rows/s"
+            )
+        )
@@ -0,0 +1,47 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from shelter.photos import process_photos
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the resized JPEG and WebP copies of uploaded dog photos in a "
+        "pool of worker processes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Resizing processes (default: one per CPU)",
+        )
+        parser.add_argument(
+            "--batch", type=int, default=20, help="Photos claimed at a time"
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when the queue is empty (default: 5)",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the queue is empty"
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                claimed = process_photos(executor, options["batch"])
+                total += claimed
+                if claimed:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} photos"))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from shelter.models import QueryProfile
+from shelter.query_profiles import explain, store
+
+
+class Command(BaseCommand):
+    help = "List the query fingerprints with the highest total time per URL name"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--view", help="Only this URL name, e.g. shelter:dog-list")
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Show the plan of each sample SELECT, for placeholder values",
+        )
+        parser.add_argument(
+            "--reset", action="store_true", help="Delete the collected profiles"
+        )
+
+    def handle(self, *args, **options):
+        store.flush()
+        profiles = QueryProfile.objects.all()
+        if options["view"]:
+            profiles = profiles.filter(view_name=options["view"])
+
+        if options["reset"]:
+            deleted, _ = profiles.delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} profiles"))
+            return
+
+        for rank, profile in enumerate(
+            profiles.order_by("-total_ms")[: options["limit"]], start=1
+        ):
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"{rank}. {profile.view_name}: {profile.total_ms:.1f} ms total, "
+                    f"{profile.count} calls, {profile.average_ms:.2f} ms avg, "
+                    f"{profile.max_ms:.2f} ms max"
+                )
+            )
+            self.stdout.write(f"   {profile.fingerprint}")
+            if options["explain"]:
+                self.write_plan(profile)
+
+    def write_plan(self, profile: QueryProfile) -> None:
+        try:
+            plan = explain(profile)
+        except DatabaseError as error:
+            self.stdout.write(self.style.WARNING(f"   EXPLAIN failed: {error}"))
+            return
+        if not plan:
+            self.stdout.write("   (only SELECT statements are explained)")
+        for line in plan:
+            self.stdout.write(f"   | {line}")
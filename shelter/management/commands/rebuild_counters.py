@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from shelter import counters
+
+
+class Command(BaseCommand):
+    help = "Recalculate breed dog counts and shelter-wide stats from the Dog table"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            breeds = counters.rebuild_breed_counts()
+            stats = counters.rebuild_shelter_stats()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt counters for {breeds} breeds, {stats.total_dogs} dogs"
+            )
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from shelter import rollups
+
+
+class Command(BaseCommand):
+    help = "Recalculate monthly intake per breed and gender from the Dog table"
+
+    def handle(self, *args, **options):
+        rows = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} intake rollup rows"))
@@ -0,0 +1,19 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from shelter.search import SEARCH_FIELDS, get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Recreate the search index for dogs, breeds and caretakers"
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            backend.install()
+            for label in SEARCH_FIELDS:
+                indexed = backend.rebuild(apps.get_model(label))
+                self.stdout.write(f"{label}: {indexed} rows indexed")
+
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from shelter import schedule
+
+
+class Command(BaseCommand):
+    help = "Recalculate when each dog's booster vaccinations are next due"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--vaccine", type=int, action="append", help="Only this vaccine id"
+        )
+
+    def handle(self, *args, **options):
+        rows = schedule.rebuild(options["vaccine"])
+        self.stdout.write(self.style.SUCCESS(f"Scheduled {rows} booster vaccinations"))
@@ -0,0 +1,66 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from shelter.jobs import work, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (exports, imports, bulk vaccinations and "
+        "the periodic SHELTER_PERIODIC_JOBS) in a thread or process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.SHELTER_JOB_CONCURRENCY,
+            help="Jobs run at once (default: SHELTER_JOB_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run jobs in threads or in separate processes (default: thread)",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1.0,
+            help="Seconds between looks at the queue when idle (default: 1)",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once no job is due"
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        if options["pool"] == "process":
+            # Spawned, not forked, so no process shares the parent's
+            # database connections; each sets Django up on its own.
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+
+        name = worker_name()
+        self.stdout.write(
+            f"Worker {name} running {concurrency} jobs at a time "
+            f"in a {options['pool']} pool"
+        )
+        with executor:
+            started = work(
+                executor,
+                concurrency,
+                poll=options["poll"],
+                once=options["once"],
+                worker=name,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Ran {started} jobs"))
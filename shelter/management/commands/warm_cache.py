@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from shelter.models import Breed, Dog
+
+# Backends whose entries live in this command's process and die with it.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+class Command(BaseCommand):
+    help = "Render the most visited public pages once so they are served from cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--details",
+            type=int,
+            default=20,
+            help="Number of breed and dog detail pages to warm (default: 20)",
+        )
+        parser.add_argument(
+            "--host",
+            default=settings.ALLOWED_HOSTS[0]
+            if settings.ALLOWED_HOSTS
+            else "localhost",
+            help="Host header used for the requests",
+        )
+        parser.add_argument(
+            "--allow-local-cache",
+            action="store_true",
+            help="Warm a process-local cache anyway, e.g. from a test",
+        )
+
+    def get_urls(self, details: int):
+        urls = [
+            reverse("shelter:index"),
+            reverse("shelter:breed-list"),
+            reverse("shelter:dog-list"),
+            reverse("shelter:vaccine-list"),
+        ]
+        breeds = Breed.objects.order_by("-dog_count").values_list("pk", flat=True)
+        urls += [reverse("shelter:breed-detail", args=[pk]) for pk in breeds[:details]]
+        dogs = Dog.objects.order_by("-date_registered", "-id").values_list(
+            "pk", flat=True
+        )
+        urls += [reverse("shelter:dog-detail", args=[pk]) for pk in dogs[:details]]
+        return urls
+
+    def handle(self, *args, **options):
+        if not settings.SHELTER_RESPONSE_CACHE_ENABLED:
+            self.stderr.write("Response cache is disabled, nothing to warm")
+            return
+        backend = settings.CACHES["default"]["BACKEND"]
+        if backend in PROCESS_LOCAL_CACHES and not options["allow_local_cache"]:
+            raise CommandError(
+                f"{backend} is local to this process, so the web workers would "
+                "never see the warmed pages. Point CACHE_BACKEND at a shared "
+                "cache such as Redis or Memcached."
+            )
+
+        client = Client(HTTP_HOST=options["host"])
+        warmed = 0
+        for url in self.get_urls(options["details"]):
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"{response.status_code} {url} ({elapsed:.0f} ms)")
+            warmed += response.status_code == 200
+
+        self.stdout.write(self.style.SUCCESS(f"Warmed {warmed} pages"))
@@ -0,0 +1,94 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from shelter.models import Breed, ShelterStats, Vaccination
+from shelter.profiling import RequestProfile
+
+
+REQUEST_LATENCY = Histogram(
+    "shelter_request_duration_seconds",
+    "Time spent handling a request, by URL name",
+    ["view", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    "shelter_requests",
+    "Handled requests, by URL name and status code",
+    ["view", "method", "status"],
+)
+DB_QUERIES = Histogram(
+    "shelter_db_queries_per_request",
+    "SQL queries run while handling a request, by URL name",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+RESPONSE_CACHE = Counter(
+    "shelter_response_cache",
+    "Response cache lookups",
+    ["result"],
+)
+DB_CONNECTIONS = Gauge(
+    "shelter_db_connections",
+    "Database connections held open by the workers",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+
+
+class ShelterCollector:
+    """Domain totals, read from the database when /metrics is scraped."""
+
+    def collect(self):
+        totals = {
+            "dogs": ShelterStats.load().total_dogs,
+            "breeds": Breed.objects.count(),
+            "caretakers": get_user_model().objects.count(),
+            "vaccinations": Vaccination.objects.count(),
+        }
+        for name, value in totals.items():
+            yield GaugeMetricFamily(f"shelter_{name}", f"Number of {name}", value=value)
+
+
+def observe_request(
+    view_name: str, method: str, status: int, profile: RequestProfile, seconds: float
+) -> None:
+    REQUEST_LATENCY.labels(view_name, method).observe(seconds)
+    REQUESTS.labels(view_name, method, status).inc()
+    DB_QUERIES.labels(view_name).observe(profile.queries)
+
+
+def observe_connections() -> None:
+    for alias in connections:
+        DB_CONNECTIONS.labels(alias).set(int(connections[alias].connection is not None))
+
+
+def registry() -> CollectorRegistry:
+    # Under gunicorn every worker writes its samples to mmap'd files in
+    # PROMETHEUS_MULTIPROC_DIR (set by config/gunicorn.py and gunicorn_asgi.py);
+    # whichever worker serves the scrape merges them all.
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    merged = CollectorRegistry()
+    multiprocess.MultiProcessCollector(merged)
+    return merged
+
+
+def render() -> bytes:
+    return generate_latest(registry()) + generate_latest(_domain_registry)
+
+
+# Kept out of REGISTRY so that only scrapes of /metrics query the database.
+_domain_registry = CollectorRegistry(auto_describe=False)
+_domain_registry.register(ShelterCollector())
@@ -0,0 +1,138 @@
+import json
+import logging
+import random
+import time
+from typing import Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from shelter import metrics, query_profiles
+from shelter.profiling import RequestProfile, current_profile
+
+
+logger = logging.getLogger("shelter.performance")
+
+
+class PerformanceMiddleware:
+    """Times a sample of requests: SQL, template rendering and the whole view.
+
+    Sampled requests get a ``Server-Timing`` header and one JSON log line on
+    the ``shelter.performance`` logger; query shapes repeated more than
+    ``SHELTER_PERF_N_PLUS_ONE_THRESHOLD`` times are logged as likely N+1s.
+    With SHELTER_QUERY_PROFILE_ENABLED every request's queries also feed the
+    per-URL fingerprint totals in shelter.query_profiles, and with
+    SHELTER_METRICS_ENABLED its latency and query count go to the Prometheus
+    histograms in shelter.metrics. Keep it first in MIDDLEWARE so the total
+    covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def plan(self) -> Tuple[bool, bool]:
+        """Whether to sample this request, and whether to profile it at all."""
+        sampled = (
+            settings.SHELTER_PERF_ENABLED
+            and random.random() < settings.SHELTER_PERF_SAMPLE_RATE
+        )
+        # The query profile store and the metrics see every request, not just
+        # the sample.
+        profiled = (
+            sampled
+            or settings.SHELTER_QUERY_PROFILE_ENABLED
+            or settings.SHELTER_METRICS_ENABLED
+        )
+        return sampled, profiled
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        sampled, profiled = self.plan()
+        if not profiled:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        # Queries reach the profile through shelter.profiling.time_query,
+        # installed on every connection.
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        self.report(request, response, profile, started, sampled)
+        return response
+
+    async def __acall__(self, request):
+        sampled, profiled = self.plan()
+        if not profiled:
+            return await self.get_response(request)
+
+        profile = RequestProfile()
+        # The ORM's sync_to_async threads copy the context, profile included.
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        self.report(request, response, profile, started, sampled)
+        return response
+
+    def report(
+        self, request, response, profile: RequestProfile, started: float, sampled: bool
+    ) -> None:
+        total_ms = (time.perf_counter() - started) * 1000
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+        if settings.SHELTER_QUERY_PROFILE_ENABLED:
+            query_profiles.store.record(view_name, profile)
+        if settings.SHELTER_METRICS_ENABLED:
+            metrics.observe_request(
+                view_name,
+                request.method,
+                response.status_code,
+                profile,
+                total_ms / 1000,
+            )
+        if sampled:
+            if settings.SHELTER_PERF_SERVER_TIMING:
+                response["Server-Timing"] = server_timing(profile, total_ms)
+            self.log(request, response, profile, total_ms)
+
+    def log(self, request, response, profile: RequestProfile, total_ms: float) -> None:
+        match = request.resolver_match
+        repeated = profile.repeated_queries(settings.SHELTER_PERF_N_PLUS_ONE_THRESHOLD)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_queries": profile.queries,
+            "db_ms": round(profile.sql_ms, 2),
+            "template_ms": round(profile.template_ms, 2),
+        }
+        if repeated:
+            record["n_plus_one"] = [
+                {"sql": shape, "count": count} for shape, count in repeated
+            ]
+        level = logging.WARNING if repeated else logging.INFO
+        logger.log(level, json.dumps(record), extra={"performance": record})
+
+
+def server_timing(profile: RequestProfile, total_ms: float) -> str:
+    return ", ".join(
+        [
+            f'db;dur={profile.sql_ms:.1f};desc="{profile.queries} queries"',
+            f"tpl;dur={profile.template_ms:.1f}",
+            f"total;dur={total_ms:.1f}",
+        ]
+    )
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Breed = apps.get_model("shelter", "Breed")
+    Dog = apps.get_model("shelter", "Dog")
+    ShelterStats = apps.get_model("shelter", "ShelterStats")
+
+    dog_counts = (
+        Dog.objects.filter(breed=OuterRef("pk"))
+        .order_by()
+        .values("breed")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Breed.objects.update(dog_count=Coalesce(Subquery(dog_counts), Value(0)))
+
+    aggregates = {"total_dogs": Count("pk")}
+    for size in ("small", "medium", "large", "giant"):
+        aggregates[f"{size}_dogs"] = Count("pk", filter=Q(breed__dog_size=size))
+    for gender in ("female", "male"):
+        aggregates[f"{gender}_dogs"] = Count("pk", filter=Q(gender=gender))
+    ShelterStats.objects.update_or_create(
+        pk=1, defaults=Dog.objects.order_by().aggregate(**aggregates)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0005_alter_dog_gender"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShelterStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total_dogs", models.PositiveIntegerField(default=0)),
+                ("small_dogs", models.PositiveIntegerField(default=0)),
+                ("medium_dogs", models.PositiveIntegerField(default=0)),
+                ("large_dogs", models.PositiveIntegerField(default=0)),
+                ("giant_dogs", models.PositiveIntegerField(default=0)),
+                ("female_dogs", models.PositiveIntegerField(default=0)),
+                ("male_dogs", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "shelter stats",
+            },
+        ),
+        migrations.AddField(
+            model_name="breed",
+            name="dog_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
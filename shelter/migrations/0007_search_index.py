@@ -0,0 +1,28 @@
+from django.db import OperationalError, migrations
+
+from shelter.search import SEARCH_FIELDS, backend_for
+
+
+def install_search_index(apps, schema_editor):
+    backend = backend_for(schema_editor.connection)
+    try:
+        backend.install()
+    except OperationalError:
+        # SQLite without FTS5/trigram support: search falls back to scans.
+        return
+    for label in SEARCH_FIELDS:
+        backend.rebuild(apps.get_model(label))
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend_for(schema_editor.connection).uninstall()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0006_breed_dog_count_shelterstats"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0008_importcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueryProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("view_name", models.CharField(max_length=200)),
+                ("fingerprint_hash", models.CharField(max_length=40)),
+                ("fingerprint", models.TextField()),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("sample_sql", models.TextField(blank=True)),
+                ("sample_params", models.TextField(blank=True)),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-total_ms"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="queryprofile",
+            constraint=models.UniqueConstraint(
+                fields=("view_name", "fingerprint_hash"), name="unique_query_profile"
+            ),
+        ),
+    ]
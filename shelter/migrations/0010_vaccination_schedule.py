@@ -0,0 +1,66 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0009_queryprofile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="vaccine",
+            name="booster_interval_days",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Days until a booster is due. Leave empty for one-off vaccines.",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="VaccinationDue",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_vaccinated", models.DateField()),
+                ("next_due", models.DateField()),
+                (
+                    "dog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="due_vaccinations",
+                        to="shelter.dog",
+                    ),
+                ),
+                (
+                    "vaccine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="shelter.vaccine",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["next_due", "id"],
+                "indexes": [
+                    models.Index(fields=["next_due", "id"], name="vaccination_next_due")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="vaccinationdue",
+            constraint=models.UniqueConstraint(
+                fields=("dog", "vaccine"), name="unique_vaccination_due"
+            ),
+        ),
+    ]
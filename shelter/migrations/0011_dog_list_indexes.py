@@ -0,0 +1,22 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0010_vaccination_schedule"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dog",
+            index=models.Index(fields=["date_registered", "id"], name="dog_registered"),
+        ),
+        migrations.AddIndex(
+            model_name="dog",
+            index=models.Index(
+                fields=["breed", "gender", "sterilized"], name="dog_facets"
+            ),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.3 on 2026-10-18 02:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0012_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DogPhoto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=64)),
+                ("original", models.CharField(max_length=200)),
+                ("width", models.PositiveIntegerField()),
+                ("height", models.PositiveIntegerField()),
+                ("variants", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "pending"),
+                            ("processing", "processing"),
+                            ("ready", "ready"),
+                            ("failed", "failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("error", models.TextField(blank=True)),
+                ("uploaded_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "dog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="photos",
+                        to="shelter.dog",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["uploaded_at", "id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="dog",
+            name="cover_photo",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="shelter.dogphoto",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dogphoto",
+            index=models.Index(fields=["status", "claimed_at"], name="photo_queue"),
+        ),
+        migrations.AddConstraint(
+            model_name="dogphoto",
+            constraint=models.UniqueConstraint(
+                fields=("dog", "content_hash"), name="unique_dog_photo"
+            ),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 4.2.3 on 2026-10-18 02:21
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, OuterRef
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def populate_rollups(apps, schema_editor):
+    Dog = apps.get_model("shelter", "Dog")
+    IntakeRollup = apps.get_model("shelter", "IntakeRollup")
+
+    linked = Exists(Dog.caretakers.through.objects.filter(dog_id=OuterRef("pk")))
+    rows = (
+        Dog.objects.order_by()
+        .annotate(month=TruncMonth("date_registered"))
+        .values("month", "breed_id", "breed__dog_size", "gender")
+        .annotate(dogs=Count("pk"), with_caretakers=Count("pk", filter=linked))
+    )
+    IntakeRollup.objects.bulk_create(
+        (
+            IntakeRollup(
+                month=row["month"],
+                breed_id=row["breed_id"],
+                dog_size=row["breed__dog_size"],
+                gender=row["gender"],
+                dogs=row["dogs"],
+                with_caretakers=row["with_caretakers"],
+            )
+            for row in rows
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0014_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IntakeRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                (
+                    "dog_size",
+                    models.CharField(
+                        choices=[
+                            ("small", "small"),
+                            ("medium", "medium"),
+                            ("large", "large"),
+                            ("giant", "giant"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "gender",
+                    models.CharField(
+                        choices=[("female", "female"), ("male", "male")], max_length=10
+                    ),
+                ),
+                ("dogs", models.PositiveIntegerField(default=0)),
+                ("with_caretakers", models.PositiveIntegerField(default=0)),
+                (
+                    "breed",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="shelter.breed",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["month", "breed", "gender"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="intakerollup",
+            constraint=models.UniqueConstraint(
+                fields=("month", "breed", "gender"), name="unique_intake_rollup"
+            ),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
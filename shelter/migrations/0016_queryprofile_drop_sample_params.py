@@ -0,0 +1,16 @@
+# Generated by Django 4.2.3 on 2026-10-18 03:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shelter", "0015_intake_rollup"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="queryprofile",
+            name="sample_params",
+        ),
+    ]
@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.urls import reverse
+from django.utils import timezone
 
 
 class Breed(models.Model):
@@ -13,6 +15,9 @@ class Breed(models.Model):
     ]
     name = models.CharField(max_length=100, unique=True)
     dog_size = models.CharField(max_length=10, choices=DOG_SIZES, default="medium")
+    dog_count = models.PositiveIntegerField(default=0, editable=False)
+    # Also moved when one of the breed's dogs changes (shelter/stamps.py).
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
@@ -20,12 +25,29 @@ class Breed(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        # dog_count is maintained with F() updates by the Dog hooks, so a stale
+        # in-memory value must never overwrite it on a regular save.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "dog_count"
+            ]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse("shelter:breed-detail", args=[str(self.pk)])
 
 
 class Vaccine(models.Model):
     name = models.CharField(max_length=255)
+    booster_interval_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Days until a booster is due. Leave empty for one-off vaccines.",
+    )
 
     class Meta:
         ordering = ["name"]
@@ -51,9 +73,27 @@ class Dog(models.Model):
     caretakers = models.ManyToManyField(
         settings.AUTH_USER_MODEL, related_name="dogs", blank=True
     )
+    # The first ready photo, so list cards get their thumbnail with a join.
+    cover_photo = models.ForeignKey(
+        "DogPhoto",
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    # Also moved when the dog's breed, caretakers, vaccinations or photos
+    # change (shelter/stamps.py).
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["date_registered"]
+        indexes = [
+            # Keyset pagination and date range filters of the dog list.
+            models.Index(fields=["date_registered", "id"], name="dog_registered"),
+            # Covers the GROUP BY behind the dog list facet counts.
+            models.Index(fields=["breed", "gender", "sterilized"], name="dog_facets"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.breed}, {self.age})"
@@ -61,16 +101,165 @@ class Dog(models.Model):
     def get_absolute_url(self):
         return reverse("shelter:dog-detail", args=[str(self.pk)])
 
+    def save(self, *args, **kwargs):
+        # Keeps the post_save counter hooks in the same transaction as the row.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Vaccination(models.Model):
     dog = models.ForeignKey(Dog, on_delete=models.CASCADE)
     vaccine = models.ForeignKey(Vaccine, on_delete=models.CASCADE)
     vaccination_date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return f"{self.dog.name} ({self.vaccine.name}, {self.vaccination_date})"
 
 
+class DogPhoto(models.Model):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+    # Every size is rendered in each of these, see shelter/photos.py.
+    FORMATS = ("jpeg", "webp")
+    STATUSES = [
+        (PENDING, "pending"),
+        (PROCESSING, "processing"),
+        (READY, "ready"),
+        (FAILED, "failed"),
+    ]
+    dog = models.ForeignKey(Dog, on_delete=models.CASCADE, related_name="photos")
+    content_hash = models.CharField(max_length=64)
+    original = models.CharField(max_length=200)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    # Written by the process_photos worker, keyed by width:
+    # {"320": {"width": 320, "height": 240, "jpeg": name, "webp": name}}
+    variants = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["uploaded_at", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dog", "content_hash"], name="unique_dog_photo"
+            )
+        ]
+        indexes = [models.Index(fields=["status", "claimed_at"], name="photo_queue")]
+
+    def __str__(self) -> str:
+        return f"{self.dog.name}: {self.content_hash[:12]} ({self.status})"
+
+    def _with_urls(self, variant: dict) -> dict:
+        return {
+            **variant,
+            **{fmt: default_storage.url(variant[fmt]) for fmt in self.FORMATS},
+        }
+
+    def sized_variants(self) -> list:
+        variants = sorted(self.variants.values(), key=lambda variant: variant["width"])
+        return [self._with_urls(variant) for variant in variants]
+
+    @property
+    def thumbnail(self) -> dict:
+        return self._with_urls(
+            min(self.variants.values(), key=lambda variant: variant["width"])
+        )
+
+    @property
+    def srcset(self) -> dict:
+        variants = self.sized_variants()
+        return {
+            fmt: ", ".join(
+                f"{variant[fmt]} {variant['width']}w" for variant in variants
+            )
+            for fmt in self.FORMATS
+        }
+
+
+class VaccinationDue(models.Model):
+    # One row per dog and booster vaccine, kept by shelter.schedule.
+    dog = models.ForeignKey(
+        Dog, on_delete=models.CASCADE, related_name="due_vaccinations"
+    )
+    vaccine = models.ForeignKey(Vaccine, on_delete=models.CASCADE, related_name="+")
+    last_vaccinated = models.DateField()
+    next_due = models.DateField()
+
+    class Meta:
+        ordering = ["next_due", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dog", "vaccine"], name="unique_vaccination_due"
+            )
+        ]
+        indexes = [models.Index(fields=["next_due", "id"], name="vaccination_next_due")]
+
+    def __str__(self) -> str:
+        return f"{self.dog.name}: {self.vaccine.name} due {self.next_due}"
+
+
+class ShelterStats(models.Model):
+    total_dogs = models.PositiveIntegerField(default=0)
+    small_dogs = models.PositiveIntegerField(default=0)
+    medium_dogs = models.PositiveIntegerField(default=0)
+    large_dogs = models.PositiveIntegerField(default=0)
+    giant_dogs = models.PositiveIntegerField(default=0)
+    female_dogs = models.PositiveIntegerField(default=0)
+    male_dogs = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "shelter stats"
+
+    def __str__(self) -> str:
+        return f"Shelter stats ({self.total_dogs} dogs)"
+
+    @classmethod
+    def load(cls) -> "ShelterStats":
+        stats, _ = cls.objects.get_or_create(pk=1)
+        return stats
+
+    @property
+    def dogs_by_size(self) -> list:
+        return [
+            (label, getattr(self, f"{size}_dogs")) for size, label in Breed.DOG_SIZES
+        ]
+
+    @property
+    def dogs_by_gender(self) -> list:
+        return [
+            (label, getattr(self, f"{gender}_dogs"))
+            for gender, label in Dog.DOG_GENDERS
+        ]
+
+
+class IntakeRollup(models.Model):
+    # Dogs registered per month, breed and gender, kept by shelter.rollups.
+    # dog_size is the breed's, copied so size charts need no join.
+    month = models.DateField()
+    breed = models.ForeignKey(Breed, on_delete=models.CASCADE, related_name="+")
+    dog_size = models.CharField(max_length=10, choices=Breed.DOG_SIZES)
+    gender = models.CharField(max_length=10, choices=Dog.DOG_GENDERS)
+    dogs = models.PositiveIntegerField(default=0)
+    with_caretakers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["month", "breed", "gender"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "breed", "gender"], name="unique_intake_rollup"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.month:%Y-%m} {self.breed_id} {self.gender}: {self.dogs}"
+
+
 class Caretaker(AbstractUser):
     EXPERT_LEVELS = [
         ("beginner", "Beginner"),
@@ -93,3 +282,98 @@ class Caretaker(AbstractUser):
 
     def get_absolute_url(self):
         return reverse("shelter:caretaker-detail", args=[str(self.pk)])
+
+
+class ImportCheckpoint(models.Model):
+    source = models.CharField(max_length=500)
+    kind = models.CharField(max_length=20)
+    rows_done = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "kind"], name="unique_import_checkpoint"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} from {self.source}: {self.rows_done} rows"
+
+
+class QueryProfile(models.Model):
+    view_name = models.CharField(max_length=200)
+    fingerprint_hash = models.CharField(max_length=40)
+    fingerprint = models.TextField()
+    count = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    # With placeholders only; see shelter.profiling.QueryStats.
+    sample_sql = models.TextField(blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-total_ms"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["view_name", "fingerprint_hash"], name="unique_query_profile"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.view_name}: {self.fingerprint[:80]}"
+
+    @property
+    def average_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUSES = [
+        (QUEUED, "queued"),
+        (RUNNING, "running"),
+        (DONE, "done"),
+        (FAILED, "failed"),
+    ]
+    # A name registered with shelter.jobs.task, called with kwargs.
+    task = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Higher runs first.
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # Periodic jobs are enqueued once per schedule slot, by whichever worker
+    # gets there first.
+    unique_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "-priority", "run_at"], name="job_queue")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse("shelter:job-detail", args=[str(self.pk)])
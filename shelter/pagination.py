@@ -0,0 +1,207 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field, Q
+from django.db.models.query import QuerySet
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction: str, values: Iterable[Any]) -> str:
+    payload = json.dumps([direction, list(values)], cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> Tuple[str, list]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor(token)
+    if direction not in ("n", "p") or not isinstance(values, list):
+        raise InvalidCursor(token)
+    if len(values) != size:
+        raise InvalidCursor(token)
+    return direction, values
+
+
+def _value(obj: Any, field: str) -> Any:
+    if isinstance(obj, dict):
+        return obj[field]
+    for attr in field.split("__"):
+        obj = getattr(obj, attr)
+    return obj
+
+
+class CursorPage(Sequence):
+    cursor_mode = True
+
+    def __init__(
+        self,
+        object_list: list,
+        paginator: "CursorPaginator",
+        has_next: bool,
+        has_previous: bool,
+    ) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self) -> str:
+        return f"<Cursor page of {len(self.object_list)} objects>"
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self._has_next:
+            return None
+        return self.paginator.cursor_for("n", self.object_list[-1])
+
+    @property
+    def previous_cursor(self) -> Optional[str]:
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor_for("p", self.object_list[0])
+
+
+class CursorPaginator:
+    """Keyset paginator: pages are sliced with WHERE on ``ordering`` instead of
+    OFFSET, so no COUNT(*) is needed and every page costs the same."""
+
+    def __init__(
+        self, queryset: QuerySet, per_page: int, ordering: Iterable[str]
+    ) -> None:
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def _fields(self) -> List[Tuple[str, bool]]:
+        return [(field.lstrip("-"), field.startswith("-")) for field in self.ordering]
+
+    def _output_field(self, name: str) -> Field:
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        opts = self.queryset.model._meta
+        *path, last = name.split("__")
+        for part in path:
+            opts = opts.get_field(part).related_model._meta
+        return opts.get_field(last)
+
+    def _parse(self, values: list) -> list:
+        # Cursors come from the client: a value that doesn't fit its field
+        # would otherwise fail while the keyset filter is built.
+        parsed = []
+        for (field, _), value in zip(self._fields(), values):
+            if value is None:
+                raise InvalidCursor(value)
+            try:
+                parsed.append(self._output_field(field).to_python(value))
+            except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+                raise InvalidCursor(value)
+        return parsed
+
+    def cursor_for(self, direction: str, obj: Any) -> str:
+        return encode_cursor(
+            direction, [_value(obj, field) for field, _ in self._fields()]
+        )
+
+    def _after(self, values: list, backwards: bool) -> Q:
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self._fields(), values):
+            lookup = "lt" if descending != backwards else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def _query(self, token: Optional[str]) -> Tuple[QuerySet, bool, Optional[list]]:
+        direction, values = "n", None
+        if token:
+            direction, values = decode_cursor(token, len(self.ordering))
+            values = self._parse(values)
+        backwards = direction == "p"
+
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            )
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, backwards))
+        return queryset[: self.per_page + 1], backwards, values
+
+    def _page(self, rows: list, backwards: bool, values: Optional[list]) -> CursorPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if backwards:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=bool(values))
+
+    def page(self, token: Optional[str] = None) -> CursorPage:
+        queryset, backwards, values = self._query(token)
+        return self._page(list(queryset), backwards, values)
+
+    async def apage(self, token: Optional[str] = None) -> CursorPage:
+        queryset, backwards, values = self._query(token)
+        return self._page([row async for row in queryset], backwards, values)
+
+
+class CursorPaginationMixin:
+    """Switches a ListView to keyset pagination over ``cursor_ordering``.
+
+    Requests that still carry the ``page`` parameter (old links and bookmarks)
+    are served by the regular OFFSET paginator. Search results annotated with
+    ``search_rank`` are paged in rank order.
+    """
+
+    cursor_ordering: Optional[Tuple[str, ...]] = None
+    ranked_cursor_ordering = ("search_rank", "id")
+    cursor_kwarg = "cursor"
+
+    def get_cursor_ordering(self, queryset) -> Optional[Tuple[str, ...]]:
+        if self.cursor_ordering and "search_rank" in queryset.query.annotations:
+            return self.ranked_cursor_ordering
+        return self.cursor_ordering
+
+    def get_cursor_paginator(self, queryset, page_size, ordering) -> CursorPaginator:
+        return CursorPaginator(queryset, page_size, ordering)
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering(queryset)
+        if not ordering or self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = self.get_cursor_paginator(queryset, page_size, ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,326 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import time
+from concurrent.futures import Executor
+from datetime import timedelta
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import locks
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q, Subquery
+from django.http import JsonResponse
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from shelter import stamps
+from shelter.cache import bump_versions
+from shelter.models import Dog, DogPhoto
+from shelter.transactions import immediate_atomic
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Pillow format -> extension of the stored original.
+UPLOAD_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+# DogPhoto.FORMATS -> Pillow format, extension and save options.
+VARIANT_FORMATS = {
+    "jpeg": ("JPEG", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+}
+# Names written by photo_name(): photos/ab/<sha256>[.<width>].<ext>
+STORED_NAME = re.compile(
+    r"^photos/[0-9a-f]{2}/[0-9a-f]{64}(\.\d+)?\.(jpg|png|webp|gif)$"
+)
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class PhotoError(Exception):
+    def __init__(self, message: str, status: int = 400, **details) -> None:
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+    def response(self) -> JsonResponse:
+        return JsonResponse({"error": str(self), **self.details}, status=self.status)
+
+
+def photo_name(content_hash: str, extension: str, width: Optional[int] = None) -> str:
+    size = f".{width}" if width else ""
+    return f"photos/{content_hash[:2]}/{content_hash}{size}{extension}"
+
+
+def _save_once(name: str, content: File) -> None:
+    # Content-addressed: an existing file under the name is the same bytes.
+    if not default_storage.exists(name):
+        default_storage.save(name, content)
+
+
+def store_photo(dog: Dog, upload: BinaryIO) -> Tuple[DogPhoto, bool]:
+    """Store an uploaded image under its SHA-256 and queue it for resizing.
+
+    The upload is read in chunks, never as a whole. Returns the photo and
+    whether it is new; uploading the same image again is a no-op.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    upload.seek(0)
+    for chunk in iter(lambda: upload.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    if size > settings.SHELTER_PHOTO_MAX_BYTES:
+        raise PhotoError("Photo is too large", status=413)
+
+    upload.seek(0)
+    try:
+        # Only parses the header; the worker decodes the pixels.
+        with Image.open(upload) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        raise PhotoError("Not a supported image")
+    if image_format not in UPLOAD_FORMATS:
+        raise PhotoError(f"Unsupported image format {image_format}")
+
+    content_hash = digest.hexdigest()
+    original = photo_name(content_hash, UPLOAD_FORMATS[image_format])
+    upload.seek(0)
+    _save_once(original, File(upload))
+    return DogPhoto.objects.get_or_create(
+        dog=dog,
+        content_hash=content_hash,
+        defaults={"original": original, "width": width, "height": height},
+    )
+
+
+def _part_path(user_id: int, dog_id: int, upload_id: str) -> str:
+    # Keyed on the uploader and the dog too, so nobody can append to or
+    # complete another user's upload by reusing its id.
+    name = f"{user_id}-{dog_id}-{upload_id}.part"
+    return os.path.join(settings.SHELTER_PHOTO_UPLOAD_DIR, name)
+
+
+def append_chunk(
+    user_id: int, dog_id: int, upload_id: str, content_range: str, stream: BinaryIO
+) -> Tuple[int, Optional[str]]:
+    """Append one chunk of a resumable upload.
+
+    ``content_range`` is the request's "bytes start-end/total" header. A chunk
+    must start where the previous one ended; after an error the client asks
+    for the stored length by resending from it. Returns the received length
+    and, once the upload is complete, the path of the assembled file.
+    """
+    match = CONTENT_RANGE.match(content_range or "")
+    if not match:
+        raise PhotoError("Content-Range: bytes start-end/total is required")
+    start, end, total = (int(value) for value in match.groups())
+    if end < start or end >= total:
+        raise PhotoError("Invalid Content-Range")
+    if total > settings.SHELTER_PHOTO_MAX_BYTES:
+        raise PhotoError("Photo is too large", status=413)
+
+    os.makedirs(settings.SHELTER_PHOTO_UPLOAD_DIR, exist_ok=True)
+    path = _part_path(user_id, dog_id, upload_id)
+    if start and not os.path.exists(path):
+        raise PhotoError("Chunk doesn't continue the upload", 409, received=0)
+    with open(path, "ab") as part:
+        # Two requests appending the same chunk would both pass the length
+        # check below; the second one waits for a retry instead.
+        if not locks.lock(part, locks.LOCK_EX | locks.LOCK_NB):
+            raise PhotoError("Another chunk of this upload is being stored", 409)
+        try:
+            received = os.fstat(part.fileno()).st_size
+            if start != received:
+                raise PhotoError(
+                    "Chunk doesn't continue the upload", 409, received=received
+                )
+            remaining = end - start + 1
+            while remaining:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                part.write(chunk)
+                remaining -= len(chunk)
+            part.flush()
+            received = os.fstat(part.fileno()).st_size
+        finally:
+            locks.unlock(part)
+    if remaining:
+        raise PhotoError("Chunk is shorter than its Content-Range", received=received)
+    return received, path if received == total else None
+
+
+def discard_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def purge_uploads(max_age: int) -> int:
+    """Delete the parts of chunked uploads untouched for ``max_age`` seconds;
+    returns how many were deleted.
+    """
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(settings.SHELTER_PHOTO_UPLOAD_DIR))
+    except FileNotFoundError:
+        return 0
+    deleted = 0
+    for entry in entries:
+        if not entry.name.endswith(".part"):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                deleted += 1
+        except FileNotFoundError:
+            # Completed or purged meanwhile.
+            pass
+    return deleted
+
+
+def render_variants(path: str, content_hash: str, widths: List[int]) -> dict:
+    """Resize the photo stored at ``path`` to ``widths`` in every variant format.
+
+    Runs in the worker's process pool, which reads the original itself and
+    only sends back the small copies: returns
+    {"variants": DogPhoto.variants, "files": {name: bytes}}.
+    """
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        # Never upscale; a photo narrower than every width gets one copy.
+        targets = sorted({min(width, image.width) for width in widths})
+        variants, files = {}, {}
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            variant = {"width": width, "height": height}
+            for fmt, (pillow_format, extension, options) in VARIANT_FORMATS.items():
+                name = photo_name(content_hash, extension, width)
+                output = io.BytesIO()
+                resized.save(output, pillow_format, **options)
+                files[name] = output.getvalue()
+                variant[fmt] = name
+            variants[str(width)] = variant
+    return {"variants": variants, "files": files}
+
+
+def claim_photos(limit: int) -> List[DogPhoto]:
+    stale = timezone.now() - timedelta(seconds=settings.SHELTER_PHOTO_CLAIM_TIMEOUT)
+    with immediate_atomic():
+        photos = list(
+            DogPhoto.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=DogPhoto.PENDING)
+                | Q(status=DogPhoto.PROCESSING, claimed_at__lt=stale)
+            )
+            .order_by("uploaded_at", "id")[:limit]
+        )
+        DogPhoto.objects.filter(pk__in=[photo.pk for photo in photos]).update(
+            status=DogPhoto.PROCESSING, claimed_at=timezone.now()
+        )
+    return photos
+
+
+def photo_ready(photo: DogPhoto, variants: dict) -> None:
+    with transaction.atomic():
+        DogPhoto.objects.filter(pk=photo.pk).update(
+            status=DogPhoto.READY, variants=variants, error=""
+        )
+        Dog.objects.filter(pk=photo.dog_id, cover_photo__isnull=True).update(
+            cover_photo=photo.pk
+        )
+        stamps.touch_dogs([photo.dog_id])
+        bump_versions("dog")
+
+
+def process_photos(executor: Executor, limit: int = 20) -> int:
+    """Resize up to ``limit`` queued photos in ``executor`` and return how
+    many were claimed.
+    """
+    photos = claim_photos(limit)
+    futures = {}
+    for photo in photos:
+        futures[photo] = executor.submit(
+            render_variants,
+            default_storage.path(photo.original),
+            photo.content_hash,
+            settings.SHELTER_PHOTO_WIDTHS,
+        )
+    for photo, future in futures.items():
+        try:
+            result = future.result()
+        except Exception as error:
+            logger.exception("Could not resize photo %s", photo.pk)
+            DogPhoto.objects.filter(pk=photo.pk).update(
+                status=DogPhoto.FAILED, error=str(error)
+            )
+            continue
+        for name, content in result["files"].items():
+            _save_once(name, ContentFile(content))
+        photo_ready(photo, result["variants"])
+    return len(photos)
+
+
+def photo_deleted(photo: DogPhoto) -> None:
+    # The cover is set to NULL by the delete; the next ready photo takes over.
+    Dog.objects.filter(pk=photo.dog_id, cover_photo__isnull=True).update(
+        cover_photo=Subquery(
+            DogPhoto.objects.filter(dog_id=photo.dog_id, status=DogPhoto.READY).values(
+                "pk"
+            )[:1]
+        )
+    )
+    stamps.touch_dogs([photo.dog_id])
+    transaction.on_commit(lambda: delete_unused_files(photo))
+
+
+def delete_unused_files(photo: DogPhoto) -> None:
+    # Other dogs can have the same image under the same names.
+    if DogPhoto.objects.filter(content_hash=photo.content_hash).exists():
+        return
+    names = [photo.original]
+    for variant in photo.variants.values():
+        names.extend(variant[fmt] for fmt in DogPhoto.FORMATS)
+    for name in names:
+        default_storage.delete(name)
+
+
+def file_range(file: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+    file.seek(start)
+    remaining = end - start + 1
+    try:
+        while remaining:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """The (start, end) of a single "Range: bytes=" header, or None to send
+    the whole file. Raises ValueError if the range can't be satisfied.
+    """
+    match = RANGE.match(header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # "bytes=-500": the last 500 bytes.
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
@@ -0,0 +1,127 @@
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.template.backends.django import DjangoTemplates, Template
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_PLACEHOLDER = re.compile(r"%s")
+_WHITESPACE = re.compile(r"\s+")
+_CASE_LIST = re.compile(r"(WHEN \S+ = \? THEN \? )(?:WHEN \S+ = \? THEN \? )+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    # Literals, placeholders and IN/VALUES/CASE lists of any length collapse,
+    # so a query shape gets the same fingerprint whatever its parameters.
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = _VALUES_LIST.sub(r"\1", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _CASE_LIST.sub(r"\1", sql)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    # The SQL with its placeholders; parameter values are never kept, since
+    # they include session keys, usernames and other personal data.
+    sample_sql: str = ""
+
+    def add(self, duration_ms: float, sql: str) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms >= self.max_ms:
+            # Keep the slowest execution as the sample worth EXPLAINing.
+            self.max_ms = duration_ms
+            self.sample_sql = sql
+
+    def merge(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.total_ms += other.total_ms
+        if other.max_ms >= self.max_ms:
+            self.max_ms = other.max_ms
+            self.sample_sql = other.sample_sql
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    sql_ms: float = 0.0
+    template_ms: float = 0.0
+    shapes: Dict[str, QueryStats] = field(default_factory=dict)
+
+    def repeated_queries(self, threshold: int) -> List[Tuple[str, int]]:
+        repeated = [
+            (shape, stats.count)
+            for shape, stats in self.shapes.items()
+            if stats.count > threshold
+        ]
+        return sorted(repeated, key=lambda item: -item[1])
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def time_query(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` that adds every query to the current
+    request's profile.
+
+    Installed on every connection (see shelter.signals) rather than around
+    the request, because async views run their queries in sync_to_async
+    threads, whose connections aren't the event loop thread's.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        profile.queries += 1
+        profile.sql_ms += duration_ms
+        shape = fingerprint(sql)
+        if shape not in profile.shapes:
+            profile.shapes[shape] = QueryStats()
+        profile.shapes[shape].add(duration_ms, sql)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = current_profile.get()
+        if profile is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.template_ms += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend that reports render time to the request profile.
+
+    Only top-level renders are timed; includes and parent templates render
+    inside them.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,133 @@
+import hashlib
+import itertools
+import re
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from shelter.models import QueryProfile
+from shelter.profiling import QueryStats, RequestProfile
+
+
+Key = Tuple[str, str]
+
+# Django escapes literal percent signs in SQL as "%%".
+_PARAMETER = re.compile(r"%%|%s")
+
+
+class QueryProfileStore:
+    """Per-process aggregate of query fingerprints by URL name.
+
+    Requests only merge into memory; every ``SHELTER_QUERY_PROFILE_FLUSH_INTERVAL``
+    seconds the totals are added to the QueryProfile table with F() updates,
+    so every worker's numbers end up summed in the same rows. The flush runs
+    from ``request_finished``, once the response has been sent.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pending: Dict[Key, QueryStats] = {}
+        self.last_flush = time.monotonic()
+        self.due = False
+
+    def record(self, view_name: str, profile: RequestProfile) -> None:
+        with self.lock:
+            for shape, stats in profile.shapes.items():
+                key = (view_name, shape)
+                if key not in self.pending:
+                    self.pending[key] = QueryStats()
+                self.pending[key].merge(stats)
+            self.due = self.due or (
+                time.monotonic() - self.last_flush
+                >= settings.SHELTER_QUERY_PROFILE_FLUSH_INTERVAL
+                or len(self.pending) >= settings.SHELTER_QUERY_PROFILE_MAX_PENDING
+            )
+
+    def take(self) -> Dict[Key, QueryStats]:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+            self.due = False
+        return pending
+
+    def flush_if_due(self) -> int:
+        with self.lock:
+            due = self.due
+        return self.flush() if due else 0
+
+    def flush(self) -> int:
+        pending = self.take()
+        if not pending:
+            return 0
+        with transaction.atomic():
+            for (view_name, shape), stats in pending.items():
+                save_stats(view_name, shape, stats)
+        return len(pending)
+
+
+def save_stats(view_name: str, shape: str, stats: QueryStats) -> None:
+    fingerprint_hash = hashlib.sha1(shape.encode()).hexdigest()
+    rows = QueryProfile.objects.filter(
+        view_name=view_name, fingerprint_hash=fingerprint_hash
+    )
+    if not _add_to_existing(rows, stats):
+        try:
+            with transaction.atomic():
+                QueryProfile.objects.create(
+                    view_name=view_name,
+                    fingerprint_hash=fingerprint_hash,
+                    fingerprint=shape,
+                    count=stats.count,
+                    total_ms=stats.total_ms,
+                    max_ms=stats.max_ms,
+                    sample_sql=stats.sample_sql,
+                )
+        except IntegrityError:
+            # Another worker created the row first.
+            _add_to_existing(rows, stats)
+
+
+def _add_to_existing(rows, stats: QueryStats) -> bool:
+    updated = rows.update(
+        count=F("count") + stats.count,
+        total_ms=F("total_ms") + stats.total_ms,
+        max_ms=Greatest(F("max_ms"), stats.max_ms),
+        last_seen=timezone.now(),
+    )
+    if updated:
+        rows.filter(max_ms__lte=stats.max_ms).update(sample_sql=stats.sample_sql)
+    return bool(updated)
+
+
+def explain(profile: QueryProfile, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+    """The plan of the profile's sample SELECT.
+
+    No parameter values are stored, so this is PostgreSQL's generic plan
+    (version 16 and later) and elsewhere the plan for NULL placeholders.
+    """
+    sql = profile.sample_sql
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return []
+    connection = connections[using]
+    if connection.vendor == "postgresql" and connection.pg_version >= 160000:
+        numbers = itertools.count(1)
+        sql = _PARAMETER.sub(
+            lambda match: "%" if match.group() == "%%" else f"${next(numbers)}", sql
+        )
+        query, params = f"EXPLAIN (GENERIC_PLAN) {sql}", None
+    else:
+        placeholders = sum(match.group() == "%s" for match in _PARAMETER.finditer(sql))
+        prefix = connection.ops.explain_query_prefix()
+        query, params = f"{prefix} {sql}", [None] * placeholders
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+store = QueryProfileStore()
@@ -0,0 +1,197 @@
+import datetime
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+from shelter.facets import without_caretakers
+from shelter.models import Breed, Dog, IntakeRollup
+
+
+# (month, breed_id, gender) of a dog; the month is the first day of the
+# month it was registered in.
+IntakeKey = Tuple[datetime.date, int, str]
+
+# Keys per query when refreshing, to stay far below SQLite's expression
+# depth limit after large imports.
+REFRESH_BATCH = 100
+
+
+def month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def next_month(month: datetime.date) -> datetime.date:
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def dog_key(date_registered: datetime.date, breed_id: int, gender: str) -> IntakeKey:
+    return month_start(date_registered), breed_id, gender
+
+
+def instance_key(dog: Dog) -> IntakeKey:
+    # date_registered may still be a string on a dog created from form data.
+    field = Dog._meta.get_field("date_registered")
+    return dog_key(field.to_python(dog.date_registered), dog.breed_id, dog.gender)
+
+
+def _group_rows(dogs: QuerySet) -> QuerySet:
+    return (
+        dogs.order_by()
+        .annotate(month=TruncMonth("date_registered"))
+        .values("month", "breed_id", "breed__dog_size", "gender")
+        .annotate(
+            dogs=Count("pk"),
+            with_caretakers=Count("pk", filter=~without_caretakers()),
+        )
+    )
+
+
+def _rollup(row: dict) -> IntakeRollup:
+    return IntakeRollup(
+        month=row["month"],
+        breed_id=row["breed_id"],
+        dog_size=row["breed__dog_size"],
+        gender=row["gender"],
+        dogs=row["dogs"],
+        with_caretakers=row["with_caretakers"],
+    )
+
+
+def _refresh_batch(keys: List[IntakeKey]) -> None:
+    groups = Q()
+    for month, breed_id, gender in keys:
+        groups |= Q(
+            breed_id=breed_id,
+            gender=gender,
+            date_registered__gte=month,
+            date_registered__lt=next_month(month),
+        )
+    rows = [_rollup(row) for row in _group_rows(Dog.objects.filter(groups))]
+    empty = set(keys) - {(row.month, row.breed_id, row.gender) for row in rows}
+
+    with transaction.atomic():
+        if empty:
+            stale = Q()
+            for month, breed_id, gender in empty:
+                stale |= Q(month=month, breed_id=breed_id, gender=gender)
+            IntakeRollup.objects.filter(stale).delete()
+        IntakeRollup.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["month", "breed", "gender"],
+            update_fields=["dog_size", "dogs", "with_caretakers"],
+        )
+
+
+def refresh(keys: Iterable[Optional[IntakeKey]]) -> None:
+    """Recount the rollup rows of the given groups from their dogs.
+
+    Called with the groups of the dogs that were just written or whose
+    caretakers changed, so each change recounts only a month of one breed
+    and gender.
+    """
+    keys = sorted({key for key in keys if key is not None})
+    for start in range(0, len(keys), REFRESH_BATCH):
+        _refresh_batch(keys[start : start + REFRESH_BATCH])
+
+
+def caretakers_changed(dog_ids: Iterable[int]) -> None:
+    """Recount caretaker coverage of the groups of ``dog_ids`` in a single
+    UPDATE; caretaker changes never move a dog to another group.
+    """
+    dog_ids = set(dog_ids)
+    if not dog_ids:
+        return
+    group = Dog.objects.annotate(month=TruncMonth("date_registered")).filter(
+        month=OuterRef("month"),
+        breed_id=OuterRef("breed_id"),
+        gender=OuterRef("gender"),
+    )
+    covered = (
+        group.filter(~without_caretakers())
+        .order_by()
+        .values("breed_id")
+        .annotate(dogs=Count("pk"))
+        .values("dogs")
+    )
+    IntakeRollup.objects.filter(Exists(group.filter(pk__in=dog_ids))).update(
+        with_caretakers=Coalesce(Subquery(covered), Value(0))
+    )
+
+
+def breed_size_changed(breed_id: int, old_size: str, new_size: str) -> None:
+    if old_size != new_size:
+        IntakeRollup.objects.filter(breed_id=breed_id).update(dog_size=new_size)
+
+
+def rebuild(batch_size: int = 2000) -> int:
+    """Recreate every rollup row from the Dog table."""
+    with transaction.atomic():
+        IntakeRollup.objects.all().delete()
+        rows = IntakeRollup.objects.bulk_create(
+            (_rollup(row) for row in _group_rows(Dog.objects.all())),
+            batch_size=batch_size,
+        )
+    return len(rows)
+
+
+def dashboard(months: int, today: datetime.date) -> Dict[str, object]:
+    """Chart data for the ``months`` months up to ``today``, from a single
+    range scan of the rollup rows, however many dogs were registered.
+    """
+    series = [month_start(today)]
+    while len(series) < months:
+        series.insert(0, month_start(series[0] - datetime.timedelta(days=1)))
+
+    totals = {month: {"dogs": 0, "with_caretakers": 0} for month in series}
+    by_size, by_gender, by_breed = defaultdict(int), defaultdict(int), defaultdict(int)
+    breed_totals = defaultdict(int)
+    rows = IntakeRollup.objects.filter(month__gte=series[0], month__lte=series[-1])
+    for month, breed, dog_size, gender, dogs, with_caretakers in rows.values_list(
+        "month", "breed__name", "dog_size", "gender", "dogs", "with_caretakers"
+    ):
+        totals[month]["dogs"] += dogs
+        totals[month]["with_caretakers"] += with_caretakers
+        by_size[month, dog_size] += dogs
+        by_gender[month, gender] += dogs
+        by_breed[month, breed] += dogs
+        breed_totals[breed] += dogs
+
+    def table(counts: Dict[tuple, int], labels: List[str]) -> List[dict]:
+        return [
+            {
+                "month": month,
+                "total": totals[month]["dogs"],
+                "counts": [counts[month, label] for label in labels],
+            }
+            for month in series
+        ]
+
+    sizes = [size for size, _ in Breed.DOG_SIZES]
+    genders = [gender for gender, _ in Dog.DOG_GENDERS]
+    breeds = sorted(breed_totals, key=lambda name: (-breed_totals[name], name))
+    coverage = []
+    for month in series:
+        dogs, with_caretakers = totals[month]["dogs"], totals[month]["with_caretakers"]
+        coverage.append(
+            {
+                "month": month,
+                "dogs": dogs,
+                "with_caretakers": with_caretakers,
+                "percent": round(100 * with_caretakers / dogs) if dogs else None,
+            }
+        )
+    return {
+        "months": series,
+        "peak": max([total["dogs"] for total in totals.values()] + [1]),
+        "sizes": sizes,
+        "by_size": table(by_size, sizes),
+        "genders": genders,
+        "by_gender": table(by_gender, genders),
+        "breeds": breeds,
+        "by_breed": table(by_breed, breeds),
+        "coverage": coverage,
+    }
@@ -0,0 +1,94 @@
+import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Max
+
+from shelter.models import Vaccination, VaccinationDue, Vaccine
+
+
+Pair = Tuple[int, int]
+
+
+def next_due(
+    last_vaccinated: datetime.date, interval_days: Optional[int]
+) -> Optional[datetime.date]:
+    if not interval_days:
+        return None
+    return last_vaccinated + datetime.timedelta(days=interval_days)
+
+
+def _due_rows(vaccinations, intervals: Dict[int, int]) -> Dict[Pair, VaccinationDue]:
+    latest = (
+        vaccinations.filter(vaccine_id__in=intervals)
+        .values("dog_id", "vaccine_id")
+        .annotate(last_vaccinated=Max("vaccination_date"))
+        .order_by()
+    )
+    return {
+        (row["dog_id"], row["vaccine_id"]): VaccinationDue(
+            dog_id=row["dog_id"],
+            vaccine_id=row["vaccine_id"],
+            last_vaccinated=row["last_vaccinated"],
+            next_due=next_due(row["last_vaccinated"], intervals[row["vaccine_id"]]),
+        )
+        for row in latest
+    }
+
+
+def _boosters(vaccine_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    vaccines = Vaccine.objects.filter(booster_interval_days__isnull=False)
+    if vaccine_ids is not None:
+        vaccines = vaccines.filter(pk__in=vaccine_ids)
+    return dict(vaccines.values_list("id", "booster_interval_days"))
+
+
+def refresh(dog_ids: Iterable[int], vaccine_ids: Iterable[int]) -> None:
+    """Recompute the due rows of every given dog for every given vaccine.
+
+    Called with the dogs and vaccines of the vaccinations that were just
+    written, so each save or delete touches only its own few rows.
+    """
+    dog_ids, vaccine_ids = set(dog_ids), set(vaccine_ids)
+    if not dog_ids or not vaccine_ids:
+        return
+    intervals = _boosters(vaccine_ids)
+    rows = _due_rows(Vaccination.objects.filter(dog_id__in=dog_ids), intervals)
+    existing = VaccinationDue.objects.filter(
+        dog_id__in=dog_ids, vaccine_id__in=vaccine_ids
+    ).values_list("pk", "dog_id", "vaccine_id")
+    stale = [
+        pk for pk, dog_id, vaccine_id in existing if (dog_id, vaccine_id) not in rows
+    ]
+    with transaction.atomic():
+        if stale:
+            VaccinationDue.objects.filter(pk__in=stale).delete()
+        VaccinationDue.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=["dog", "vaccine"],
+            update_fields=["last_vaccinated", "next_due"],
+        )
+
+
+def rebuild(vaccine_ids: Optional[Iterable[int]] = None, batch_size: int = 2000) -> int:
+    """Recreate the due rows from the vaccinations, for all or some vaccines."""
+    intervals = _boosters(vaccine_ids)
+    vaccinations = Vaccination.objects.all()
+    existing = VaccinationDue.objects.all()
+    if vaccine_ids is not None:
+        vaccinations = vaccinations.filter(vaccine_id__in=vaccine_ids)
+        existing = existing.filter(vaccine_id__in=vaccine_ids)
+    with transaction.atomic():
+        existing.delete()
+        rows = _due_rows(vaccinations, intervals)
+        VaccinationDue.objects.bulk_create(rows.values(), batch_size=batch_size)
+    return len(rows)
+
+
+def dashboard(today: datetime.date, upcoming_days: int):
+    # Overdue and upcoming boosters come from one range scan of the
+    # (next_due, id) index.
+    return VaccinationDue.objects.filter(
+        next_due__lte=today + datetime.timedelta(days=upcoming_days)
+    ).select_related("dog", "dog__breed", "vaccine")
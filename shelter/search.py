@@ -0,0 +1,304 @@
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Expression, F, FloatField, IntegerField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+from django.utils.module_loading import import_string
+
+
+SEARCH_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "shelter.dog": ("name",),
+    "shelter.breed": ("name",),
+    "shelter.caretaker": ("username", "first_name", "last_name"),
+}
+
+# Trigram indexes can't narrow down terms shorter than one trigram.
+MIN_TRIGRAM_LENGTH = 3
+
+
+def normalize(text: Optional[str]) -> str:
+    # NFKC + casefold folds Latin and Cyrillic alike ("Бровко" == "бровко"),
+    # which SQLite's ASCII-only LOWER()/LIKE can't do on its own.
+    return unicodedata.normalize("NFKC", text or "").casefold().strip()
+
+
+def search_fields(model) -> Tuple[str, ...]:
+    return SEARCH_FIELDS.get(model._meta.label_lower, ())
+
+
+class BaseSearchBackend:
+    """Backends match rows with a condition the database evaluates, so
+    searches filter whole querysets without fetching their ids first.
+    """
+
+    def __init__(self, connection) -> None:
+        self.connection = connection
+
+    def install(self) -> None:
+        pass
+
+    def uninstall(self) -> None:
+        pass
+
+    def matches(self, model, term: str) -> Q:
+        condition = Q()
+        for field in search_fields(model):
+            condition |= Q(**{f"{field}__icontains": term})
+        return condition
+
+    def rank(self, model, term: str) -> Expression:
+        # Lower is better; ties are broken by primary key.
+        return Value(0, output_field=IntegerField())
+
+    def ranked_ids(self, model, term: str, limit: int) -> List[int]:
+        queryset = model._default_manager.using(self.connection.alias)
+        return list(
+            queryset.filter(self.matches(model, term))
+            .annotate(search_rank=self.rank(model, term))
+            .order_by("search_rank", "pk")
+            .values_list("pk", flat=True)[:limit]
+        )
+
+    def update(self, instance) -> None:
+        pass
+
+    def update_many(self, model, instances) -> None:
+        pass
+
+    def remove(self, instance) -> None:
+        pass
+
+    def rebuild(self, model) -> int:
+        return 0
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    pass
+
+
+class PostgresTrigramSearchBackend(BaseSearchBackend):
+    def _index_name(self, model, field: str) -> str:
+        return f"{model._meta.db_table}_{field}_trgm"
+
+    def install(self) -> None:
+        from django.apps import apps
+
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for label, fields in SEARCH_FIELDS.items():
+                model = apps.get_model(label)
+                for field in fields:
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS "
+                        f"{self._index_name(model, field)} ON "
+                        f"{model._meta.db_table} USING gin ({field} gin_trgm_ops)"
+                    )
+
+    def uninstall(self) -> None:
+        from django.apps import apps
+
+        with self.connection.cursor() as cursor:
+            for label, fields in SEARCH_FIELDS.items():
+                model = apps.get_model(label)
+                for field in fields:
+                    cursor.execute(
+                        f"DROP INDEX IF EXISTS {self._index_name(model, field)}"
+                    )
+
+    def matches(self, model, term: str) -> Q:
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+
+        if len(term) < MIN_TRIGRAM_LENGTH:
+            return super().matches(model, term)
+        condition = Q()
+        for field in search_fields(model):
+            condition |= Q(TrigramWordSimilar(F(field), Value(term)))
+        return condition
+
+    def rank(self, model, term: str) -> Expression:
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        similarities = [
+            TrigramWordSimilarity(term, field) for field in search_fields(model)
+        ]
+        if len(similarities) == 1:
+            return -similarities[0]
+        return -Greatest(*similarities)
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """FTS5 shadow tables (``<db_table>_search``) with the trigram tokenizer,
+    one per searchable model, keyed by the row's primary key."""
+
+    def _table(self, model) -> str:
+        return f"{model._meta.db_table}_search"
+
+    def _body(self, values) -> str:
+        return normalize(" ".join(value for value in values if value))
+
+    def is_installed(self, model) -> bool:
+        key = (self.connection.settings_dict["NAME"], self._table(model))
+        if key not in _installed_tables:
+            with self.connection.cursor() as cursor:
+                tables = self.connection.introspection.table_names(cursor)
+            _installed_tables[key] = key[1] in tables
+        return _installed_tables[key]
+
+    def install(self) -> None:
+        from django.apps import apps
+
+        with self.connection.cursor() as cursor:
+            _installed_tables.clear()
+            for label in SEARCH_FIELDS:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS "
+                    f"{self._table(apps.get_model(label))} "
+                    f"USING fts5(body, tokenize='trigram')"
+                )
+
+    def uninstall(self) -> None:
+        from django.apps import apps
+
+        with self.connection.cursor() as cursor:
+            _installed_tables.clear()
+            for label in SEARCH_FIELDS:
+                cursor.execute(
+                    f"DROP TABLE IF EXISTS {self._table(apps.get_model(label))}"
+                )
+
+    def _query(self, model, term: str) -> Tuple[str, str, list]:
+        # (WHERE clause over the shadow table, rank column, params).
+        table = self._table(model)
+        term = normalize(term)
+        if len(term) >= MIN_TRIGRAM_LENGTH:
+            phrase = '"' + term.replace('"', '""') + '"'
+            return f"{table} MATCH %s", "rank", [phrase]
+        pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return "body LIKE %s ESCAPE '\\'", "length(body)", [f"%{pattern}%"]
+
+    def matches(self, model, term: str) -> Q:
+        if not self.is_installed(model):
+            # SQLite built without FTS5: fall back to a plain scan.
+            return super().matches(model, term)
+        where, _, params = self._query(model, term)
+        return Q(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {self._table(model)} WHERE {where}", params
+            )
+        )
+
+    def rank(self, model, term: str) -> Expression:
+        if not self.is_installed(model):
+            return super().rank(model, term)
+        where, rank, params = self._query(model, term)
+        quote = self.connection.ops.quote_name
+        pk = f"{quote(model._meta.db_table)}.{quote(model._meta.pk.column)}"
+        return RawSQL(
+            f"SELECT {rank} FROM {self._table(model)} WHERE {where} AND rowid = {pk}",
+            params,
+            output_field=FloatField(),
+        )
+
+    def update(self, instance) -> None:
+        self.update_many(type(instance), [instance])
+
+    def update_many(self, model, instances) -> None:
+        if not self.is_installed(model):
+            return
+        fields = search_fields(model)
+        table = self._table(model)
+        rows = [
+            (obj.pk, self._body(getattr(obj, field) for field in fields))
+            for obj in instances
+        ]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {table} WHERE rowid = %s", [(pk,) for pk, _ in rows]
+            )
+            cursor.executemany(
+                f"INSERT INTO {table} (rowid, body) VALUES (%s, %s)", rows
+            )
+
+    def remove(self, instance) -> None:
+        if not self.is_installed(type(instance)):
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self._table(type(instance))} WHERE rowid = %s",
+                [instance.pk],
+            )
+
+    def rebuild(self, model) -> int:
+        if not self.is_installed(model):
+            return 0
+        fields = search_fields(model)
+        table = self._table(model)
+        rows = (
+            model._default_manager.using(self.connection.alias)
+            .order_by()
+            .values_list("pk", *fields)
+        )
+        indexed = 0
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table}")
+            batch = []
+            for pk, *values in rows.iterator(chunk_size=2000):
+                batch.append((pk, self._body(values)))
+                if len(batch) == 2000:
+                    cursor.executemany(
+                        f"INSERT INTO {table} (rowid, body) VALUES (%s, %s)", batch
+                    )
+                    indexed += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(
+                    f"INSERT INTO {table} (rowid, body) VALUES (%s, %s)", batch
+                )
+                indexed += len(batch)
+        return indexed
+
+
+_installed_tables: Dict[Tuple[str, str], bool] = {}
+
+VENDOR_BACKENDS = {
+    "postgresql": PostgresTrigramSearchBackend,
+    "sqlite": SQLiteFTSSearchBackend,
+}
+
+
+def backend_for(connection) -> BaseSearchBackend:
+    path = getattr(settings, "SHELTER_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)(connection)
+    backend_class = VENDOR_BACKENDS.get(connection.vendor, IContainsSearchBackend)
+    return backend_class(connection)
+
+
+def get_search_backend(using: str = DEFAULT_DB_ALIAS) -> BaseSearchBackend:
+    return backend_for(connections[using])
+
+
+def search_ids(model, term: str, limit: Optional[int] = None) -> List[int]:
+    # The best ``limit`` matches, for callers that want a ranked top N.
+    limit = limit or getattr(settings, "SHELTER_SEARCH_LIMIT", 500)
+    return get_search_backend().ranked_ids(model, term, limit)
+
+
+def search_matches(model, term: str) -> Q:
+    # Every match, as a condition on ``model`` for filter().
+    return get_search_backend().matches(model, term)
+
+
+def search(queryset: QuerySet, term: str) -> QuerySet:
+    # Filters ``queryset`` to all matches and annotates ``search_rank``
+    # (lower is better).
+    backend = get_search_backend()
+    return queryset.filter(backend.matches(queryset.model, term)).annotate(
+        search_rank=backend.rank(queryset.model, term)
+    )
@@ -0,0 +1,353 @@
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from shelter import (
+    counters,
+    db_router,
+    metrics,
+    photos,
+    query_profiles,
+    rollups,
+    schedule,
+    stamps,
+)
+from shelter.cache import bump_versions
+from shelter.models import Breed, Dog, DogPhoto, Job, Vaccination, Vaccine
+from shelter.profiling import time_query
+from shelter.search import get_search_backend
+
+
+# Sent by bulk writers (bulk_create bypasses post_save) with the created
+# ``instances``; must be sent inside the transaction that created them.
+bulk_created = Signal()
+
+# Sent by shelter.caretaking, which writes the dog/caretaker links directly
+# and so bypasses m2m_changed, with the affected ``dog_ids`` and
+# ``caretaker_ids``.
+caretakers_changed = Signal()
+
+
+def _stored_dog_key(dog: Dog):
+    if dog._state.adding or dog.pk is None:
+        return None
+    return (
+        Dog.objects.filter(pk=dog.pk)
+        .values_list("breed_id", "gender", "date_registered")
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Dog)
+def remember_dog_counter_key(sender, instance, raw=False, **kwargs):
+    stored = None if raw else _stored_dog_key(instance)
+    instance._counter_key = stored and stored[:2]
+    instance._intake_key = stored and rollups.dog_key(stored[2], *stored[:2])
+
+
+@receiver(post_save, sender=Dog)
+def update_counters_on_dog_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_key = None if created else getattr(instance, "_counter_key", None)
+    counters.dog_changed(old_key, (instance.breed_id, instance.gender))
+
+
+@receiver(post_delete, sender=Dog)
+def update_counters_on_dog_delete(sender, instance, **kwargs):
+    counters.dog_changed((instance.breed_id, instance.gender), None)
+
+
+@receiver(post_save, sender=Dog)
+def update_intake_rollups_on_dog_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_key = None if created else getattr(instance, "_intake_key", None)
+    new_key = rollups.instance_key(instance)
+    if old_key != new_key:
+        rollups.refresh([old_key, new_key])
+
+
+@receiver(post_delete, sender=Dog)
+def update_intake_rollups_on_dog_delete(sender, instance, **kwargs):
+    rollups.refresh([rollups.instance_key(instance)])
+
+
+@receiver(pre_save, sender=Breed)
+def remember_breed_size(sender, instance, raw=False, **kwargs):
+    instance._stored_dog_size = None
+    if not raw and not instance._state.adding:
+        instance._stored_dog_size = (
+            Breed.objects.filter(pk=instance.pk)
+            .values_list("dog_size", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Breed)
+def update_counters_on_breed_size_change(sender, instance, created, **kwargs):
+    old_size = getattr(instance, "_stored_dog_size", None)
+    if not created and old_size:
+        counters.breed_size_changed(instance.pk, old_size, instance.dog_size)
+        rollups.breed_size_changed(instance.pk, old_size, instance.dog_size)
+
+
+@receiver(pre_save, sender=Vaccination)
+def remember_vaccination_schedule_key(sender, instance, raw=False, **kwargs):
+    instance._schedule_key = None
+    if not raw and not instance._state.adding:
+        instance._schedule_key = (
+            Vaccination.objects.filter(pk=instance.pk)
+            .values_list("dog_id", "vaccine_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Vaccination)
+def update_schedule_on_vaccination_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_dog_id, old_vaccine_id = getattr(instance, "_schedule_key", None) or (
+        instance.dog_id,
+        instance.vaccine_id,
+    )
+    schedule.refresh(
+        {old_dog_id, instance.dog_id}, {old_vaccine_id, instance.vaccine_id}
+    )
+
+
+@receiver(post_delete, sender=Vaccination)
+def update_schedule_on_vaccination_delete(sender, instance, **kwargs):
+    schedule.refresh([instance.dog_id], [instance.vaccine_id])
+
+
+@receiver(pre_save, sender=Vaccine)
+def remember_booster_interval(sender, instance, raw=False, **kwargs):
+    instance._stored_booster_interval = None
+    if not raw and not instance._state.adding:
+        instance._stored_booster_interval = (
+            Vaccine.objects.filter(pk=instance.pk)
+            .values_list("booster_interval_days", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Vaccine)
+def update_schedule_on_booster_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if instance._stored_booster_interval != instance.booster_interval_days:
+        schedule.rebuild([instance.pk])
+
+
+@receiver(post_save, sender=Dog)
+def touch_breeds_on_dog_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_key = None if created else getattr(instance, "_counter_key", None)
+    stamps.touch_breeds([instance.breed_id, old_key and old_key[0]])
+
+
+@receiver(post_delete, sender=Dog)
+def touch_breed_on_dog_delete(sender, instance, **kwargs):
+    stamps.touch_breeds([instance.breed_id])
+
+
+@receiver(post_save, sender=Breed)
+def touch_dogs_on_breed_save(sender, instance, created, raw=False, **kwargs):
+    # Dog cards show the breed name.
+    if not raw and not created:
+        stamps.touch(Dog, breed=instance)
+
+
+@receiver(post_save, sender=Vaccination)
+def touch_dogs_on_vaccination_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_key = getattr(instance, "_schedule_key", None)
+    stamps.touch_dogs([instance.dog_id, old_key and old_key[0]])
+
+
+@receiver(post_delete, sender=Vaccination)
+def touch_dog_on_vaccination_delete(sender, instance, **kwargs):
+    stamps.touch_dogs([instance.dog_id])
+
+
+@receiver(post_save, sender=Vaccine)
+def touch_dogs_on_vaccine_save(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        stamps.touch(Dog, vaccines=instance)
+
+
+@receiver(post_delete, sender=DogPhoto)
+def replace_deleted_photo(sender, instance, **kwargs):
+    photos.photo_deleted(instance)
+
+
+def _caretakers_changed(dog_ids) -> None:
+    # Caretaker coverage is counted in the dogs' intake rollups.
+    dog_ids = set(dog_ids)
+    stamps.touch_dogs(dog_ids)
+    rollups.caretakers_changed(dog_ids)
+
+
+@receiver(m2m_changed, sender=Dog.caretakers.through)
+def update_dogs_on_caretakers_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            _caretakers_changed([instance.pk])
+    elif action == "pre_clear":
+        instance._cleared_dog_ids = list(instance.dogs.values_list("pk", flat=True))
+    elif action == "post_clear":
+        _caretakers_changed(instance._cleared_dog_ids)
+    elif action in ("post_add", "post_remove"):
+        _caretakers_changed(pk_set)
+
+
+@receiver(caretakers_changed)
+def update_dogs_on_caretakers_changed(sender, dog_ids, **kwargs):
+    _caretakers_changed(dog_ids)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_dogs_on_caretaker_save(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw or created or update_fields == frozenset(["last_login"]):
+        return
+    stamps.touch(Dog, caretakers=instance)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def touch_dogs_on_caretaker_delete(sender, instance, **kwargs):
+    # The link rows go with the user without an m2m_changed signal.
+    stamps.touch(Dog, caretakers=instance)
+    instance._caretaker_dog_ids = list(instance.dogs.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def update_intake_rollups_on_caretaker_delete(sender, instance, **kwargs):
+    rollups.caretakers_changed(getattr(instance, "_caretaker_dog_ids", []))
+
+
+@receiver(post_save, sender=Dog)
+@receiver(post_save, sender=Breed)
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().update(instance)
+
+
+@receiver(post_delete, sender=Dog)
+@receiver(post_delete, sender=Breed)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
+
+
+CACHE_VERSIONS = {
+    Breed: "breed",
+    Dog: "dog",
+    # Photos are only shown on dog pages.
+    DogPhoto: "dog",
+    Vaccine: "vaccine",
+    Vaccination: "vaccination",
+}
+
+
+def bump_cache_version(sender, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields == frozenset(["last_login"]):
+        return
+    if sender in CACHE_VERSIONS:
+        bump_versions(CACHE_VERSIONS[sender])
+    else:
+        bump_versions("caretaker")
+
+
+# Connected per model: a post_delete receiver without a sender would keep
+# Django from fast-deleting the rows of every other model.
+for model in [*CACHE_VERSIONS, settings.AUTH_USER_MODEL]:
+    post_save.connect(bump_cache_version, sender=model)
+    post_delete.connect(bump_cache_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Dog.caretakers.through)
+def bump_caretakers_cache_version(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_versions("caretaker")
+
+
+@receiver(caretakers_changed)
+def bump_cache_version_on_caretakers_changed(sender, **kwargs):
+    bump_versions("caretaker")
+
+
+@receiver(bulk_created)
+def update_after_bulk_create(sender, instances, **kwargs):
+    if sender is Dog:
+        counters.dogs_created(instances)
+        stamps.touch_breeds(dog.breed_id for dog in instances)
+        rollups.refresh(rollups.instance_key(dog) for dog in instances)
+    if sender is Vaccination:
+        stamps.touch_dogs(vaccination.dog_id for vaccination in instances)
+        schedule.refresh(
+            {vaccination.dog_id for vaccination in instances},
+            {vaccination.vaccine_id for vaccination in instances},
+        )
+    get_search_backend().update_many(sender, instances)
+    if sender in CACHE_VERSIONS:
+        bump_versions(CACHE_VERSIONS[sender])
+
+
+@receiver(request_finished)
+def update_connection_metrics(sender, **kwargs):
+    # Connected after Django's close_old_connections, so expired connections
+    # are already closed when they are counted.
+    if settings.SHELTER_METRICS_ENABLED:
+        metrics.observe_connections()
+
+
+@receiver(request_finished)
+def flush_query_profiles(sender, **kwargs):
+    # Sent once the response is out, so no visitor waits for the writes.
+    query_profiles.store.flush_if_due()
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    # Every configured database, so replicas are counted too. A reconnect
+    # reuses the wrapper along with its execute_wrappers.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    # Run on the raw connection so the PRAGMAs stay out of query logs.
+    if connection.vendor == "sqlite":
+        for name, value in settings.SHELTER_SQLITE_PRAGMAS.items():
+            connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(m2m_changed, sender=Dog.caretakers.through)
+@receiver(bulk_created)
+@receiver(caretakers_changed)
+def keep_reads_on_primary_after_write(sender, **kwargs):
+    db_router.record_write()
+
+
+# The models requests write and then read back, such as a job's status page
+# right after it is enqueued. Session saves don't need read-your-writes.
+for model in [*CACHE_VERSIONS, Job, settings.AUTH_USER_MODEL]:
+    post_save.connect(keep_reads_on_primary_after_write, sender=model)
+    post_delete.connect(keep_reads_on_primary_after_write, sender=model)
@@ -0,0 +1,16 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """The SQLite backend with opt-in immediate transactions.
+
+    A deferred BEGIN takes the write lock at the first write, so two
+    transactions that both read first deadlock on the upgrade and one fails
+    with "database is locked" without waiting for busy_timeout. BEGIN
+    IMMEDIATE takes the lock up front and waits for it instead.
+    """
+
+    begin_immediate = False
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE" if self.begin_immediate else "BEGIN")
@@ -0,0 +1,28 @@
+from typing import Iterable, Type
+
+from django.db.models import Model
+from django.utils import timezone
+
+from shelter.models import Breed, Dog
+
+
+# updated_at is auto_now for a row's own saves. The hooks in signals.py also
+# move it when something shown with the row changes: a dog's breed,
+# caretakers and vaccinations (and the names on them), and the dogs of a
+# breed. Fragment cache keys are built from these stamps.
+
+
+def touch(model: Type[Model], **filters) -> int:
+    return model._default_manager.filter(**filters).update(updated_at=timezone.now())
+
+
+def touch_dogs(dog_ids: Iterable[int]) -> None:
+    dog_ids = {dog_id for dog_id in dog_ids if dog_id is not None}
+    if dog_ids:
+        touch(Dog, pk__in=dog_ids)
+
+
+def touch_breeds(breed_ids: Iterable[int]) -> None:
+    breed_ids = {breed_id for breed_id in breed_ids if breed_id is not None}
+    if breed_ids:
+        touch(Breed, pk__in=breed_ids)
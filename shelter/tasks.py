@@ -0,0 +1,116 @@
+import datetime
+import tempfile
+import uuid
+from typing import List
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from shelter import counters, photos, rollups, schedule
+from shelter.exports import EXPORT_FORMATS, export_stream
+from shelter.forms import DogSearchForm
+from shelter.importers import ShelterImporter, rejects_file
+from shelter.jobs import task
+from shelter.models import Dog, Job, Vaccination
+from shelter.signals import bulk_created
+
+
+# Work that "manage.py run_worker" runs for shelter.jobs.enqueue().
+
+
+@task("shelter.export_dogs")
+def export_dogs(export_format: str = "csv", compress: bool = False, query: str = ""):
+    # query is the dog list's query string, so exports match its filters.
+    queryset = Dog.objects.order_by("date_registered", "id")
+    form = DogSearchForm(QueryDict(query))
+    if form.is_valid():
+        queryset = form.filter_queryset(queryset)
+
+    filename = f"dogs.{export_format}" + (".gz" if compress else "")
+    with tempfile.TemporaryFile() as output:
+        for chunk in export_stream(queryset, export_format, compress=compress):
+            output.write(chunk if compress else chunk.encode())
+        name = default_storage.save(
+            f"exports/{uuid.uuid4().hex}/{filename}", File(output)
+        )
+    return {
+        "file": name,
+        "filename": filename,
+        "content_type": (
+            "application/gzip" if compress else EXPORT_FORMATS[export_format]
+        ),
+    }
+
+
+@task("shelter.import_shelter_data")
+def import_shelter_data(path: str, kind: str, rejects: str = "", **options):
+    # Imports checkpoint as they go, so a retried job resumes.
+    rejects = rejects or f"{path}.rejects.jsonl"
+    with rejects_file(rejects, restart=options.get("restart", False)) as on_reject:
+        stats = ShelterImporter(
+            path=path, kind=kind, on_reject=on_reject, **options
+        ).run()
+    return {
+        "imported": stats.imported,
+        "rejected": stats.rejected,
+        "skipped": stats.skipped,
+        "rejects": rejects,
+    }
+
+
+@task("shelter.vaccinate_dogs")
+def vaccinate_dogs(dog_ids: List[int], vaccine_id: int, vaccination_date: str):
+    date = datetime.date.fromisoformat(vaccination_date)
+    with transaction.atomic():
+        # Dogs vaccinated by an earlier attempt aren't vaccinated twice.
+        done = set(
+            Vaccination.objects.filter(
+                dog_id__in=dog_ids, vaccine_id=vaccine_id, vaccination_date=date
+            ).values_list("dog_id", flat=True)
+        )
+        dog_ids = Dog.objects.filter(pk__in=dog_ids).exclude(pk__in=done)
+        created = Vaccination.objects.bulk_create(
+            Vaccination(dog_id=dog_id, vaccine_id=vaccine_id, vaccination_date=date)
+            for dog_id in dog_ids.values_list("pk", flat=True)
+        )
+        bulk_created.send(sender=Vaccination, instances=created)
+    return {"created": len(created)}
+
+
+@task("shelter.rebuild_counters")
+def rebuild_counters():
+    return {"total_dogs": counters.rebuild().total_dogs}
+
+
+@task("shelter.rebuild_vaccination_schedule")
+def rebuild_vaccination_schedule():
+    return {"rows": schedule.rebuild()}
+
+
+@task("shelter.rebuild_intake_rollups")
+def rebuild_intake_rollups():
+    return {"rows": rollups.rebuild()}
+
+
+@task("shelter.purge_jobs")
+def purge_jobs(days: int = 30):
+    finished = Job.objects.filter(
+        status__in=[Job.DONE, Job.FAILED],
+        finished_at__lt=timezone.now() - datetime.timedelta(days=days),
+    )
+    for name in finished.filter(task="shelter.export_dogs").values_list(
+        "result__file", flat=True
+    ):
+        if name:
+            default_storage.delete(name)
+    deleted, _ = finished.delete()
+    return {"deleted": deleted}
+
+
+@task("shelter.purge_photo_uploads")
+def purge_photo_uploads(max_age: int = 24 * 60 * 60):
+    # Chunked uploads that were abandoned part way.
+    return {"deleted": photos.purge_uploads(max_age)}
@@ -0,0 +1,27 @@
+import os
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from shelter.assets import ShelterStaticFilesStorage
+
+register = template.Library()
+
+TAGS = {
+    ".css": '<link rel="stylesheet" href="{}">',
+    ".js": '<script src="{}"></script>',
+}
+
+
+@register.simple_tag
+def asset_bundle(name):
+    # Until build_assets has written the bundle, link its sources one by one.
+    if settings.DEBUG or not isinstance(staticfiles_storage, ShelterStaticFilesStorage):
+        names = settings.SHELTER_ASSET_BUNDLES[name]
+    else:
+        names = [name]
+    tag = TAGS[os.path.splitext(name)[1]]
+    return format_html_join("\n", tag, ((static(path),) for path in names))
@@ -0,0 +1,104 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+FRAGMENT_KEY = "shelter:fragment:{name}:{vary}"
+BATCH = "_shelter_fragment_batch"
+
+
+def fragment_key(name: str, vary_on: list) -> str:
+    vary = hashlib.md5(":".join(str(value) for value in vary_on).encode()).hexdigest()
+    return FRAGMENT_KEY.format(name=name, vary=vary)
+
+
+class FragmentBatch:
+    def __init__(self) -> None:
+        self.collecting = True
+        self.keys = []
+        self.hits = {}
+        self.rendered = {}
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, vary_on) -> None:
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context) -> str:
+        if not settings.SHELTER_FRAGMENT_CACHE_ENABLED:
+            return self.nodelist.render(context)
+        key = fragment_key(
+            self.name.resolve(context),
+            [value.resolve(context) for value in self.vary_on],
+        )
+        batch = context.get(BATCH)
+        if batch is None:
+            content = cache.get(key)
+            if content is None:
+                content = self.nodelist.render(context)
+                cache.set(key, content, settings.SHELTER_FRAGMENT_CACHE_TIMEOUT)
+            return mark_safe(content)
+
+        if batch.collecting:
+            batch.keys.append(key)
+            return ""
+        if key in batch.hits:
+            return mark_safe(batch.hits[key])
+        content = batch.rendered[key] = self.nodelist.render(context)
+        return content
+
+
+class FragmentBatchNode(template.Node):
+    def __init__(self, nodelist) -> None:
+        self.nodelist = nodelist
+
+    def render(self, context) -> str:
+        if not settings.SHELTER_FRAGMENT_CACHE_ENABLED:
+            return self.nodelist.render(context)
+        batch = FragmentBatch()
+        with context.push(**{BATCH: batch}):
+            # The first pass only resolves the keys of the fragments inside.
+            self.nodelist.render(context)
+            batch.collecting = False
+            batch.hits = cache.get_many(batch.keys) if batch.keys else {}
+            output = self.nodelist.render(context)
+        if batch.rendered:
+            cache.set_many(batch.rendered, settings.SHELTER_FRAGMENT_CACHE_TIMEOUT)
+        return output
+
+
+@register.tag
+def fragment(parser, token):
+    """Cache the enclosed block under a name and the values it varies on::
+
+        {% fragment "dog-card" dog.pk dog.updated_at %}...{% endfragment %}
+
+    Vary on updated_at stamps rather than expiring: a changed row gets a new
+    key and the old fragment ages out of the cache.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a name")
+    nodelist = parser.parse(("endfragment",))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
+
+
+@register.tag
+def fragment_batch(parser, token):
+    """Look up every {% fragment %} inside with one get_many and store the
+    ones that had to be rendered with one set_many.
+    """
+    nodelist = parser.parse(("endfragment_batch",))
+    parser.delete_first_token()
+    return FragmentBatchNode(nodelist)
@@ -0,0 +1,109 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from shelter.api import DOGS, ResourceView
+from shelter.models import Breed, Dog, Vaccination, Vaccine
+
+
+DOG_API_URL = reverse("shelter:api-dog-list")
+
+
+class ApiTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.vaccine = Vaccine.objects.create(name="Rabies")
+        self.dogs = []
+        for number in range(5):
+            dog = Dog.objects.create(
+                name=f"Dog {number}",
+                date_registered=f"2023-06-2{number}",
+                gender="male",
+                breed=self.breed,
+            )
+            Vaccination.objects.create(
+                dog=dog, vaccine=self.vaccine, vaccination_date="2023-07-01"
+            )
+            self.dogs.append(dog)
+
+    def test_sparse_fieldsets(self) -> None:
+        response = self.client.get(DOG_API_URL, {"fields": "name,breed_name"})
+
+        self.assertEqual(
+            response.json()["results"][0],
+            {"id": self.dogs[0].pk, "name": "Dog 0", "breed_name": "Pekiness"},
+        )
+
+    def test_unknown_field_is_rejected(self) -> None:
+        response = self.client.get(DOG_API_URL, {"fields": "name,owner"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("owner", response.json()["error"])
+
+    def test_include_vaccinations_uses_constant_queries(self) -> None:
+        with self.assertNumQueries(2):
+            response = self.client.get(DOG_API_URL, {"include": "vaccinations"})
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertEqual(
+            results[0]["vaccinations"],
+            [
+                {
+                    "id": self.dogs[0].vaccination_set.get().pk,
+                    "vaccine": self.vaccine.pk,
+                    "vaccine_name": "Rabies",
+                    "vaccination_date": "2023-07-01",
+                }
+            ],
+        )
+
+    def test_batch_lookup_keeps_requested_order(self) -> None:
+        ids = f"{self.dogs[3].pk},{self.dogs[1].pk},999"
+
+        with self.assertNumQueries(1):
+            response = self.client.get(DOG_API_URL, {"ids": ids, "fields": "name"})
+
+        self.assertEqual(
+            [dog["name"] for dog in response.json()["results"]], ["Dog 3", "Dog 1"]
+        )
+        self.assertEqual(response.json()["missing"], [999])
+
+    def test_cursor_pagination(self) -> None:
+        names = []
+        params = {"limit": 2, "fields": "name"}
+        url = DOG_API_URL
+        while url:
+            payload = self.client.get(url, params).json()
+            names += [dog["name"] for dog in payload["results"]]
+            url, params = payload["next"], None
+
+        self.assertEqual(names, [f"Dog {number}" for number in range(5)])
+
+    def test_invalid_cursor(self) -> None:
+        response = self.client.get(DOG_API_URL, {"cursor": "nonsense"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail(self) -> None:
+        url = reverse("shelter:api-breed-detail", args=[self.breed.pk])
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            response.json(),
+            {
+                "id": self.breed.pk,
+                "name": "Pekiness",
+                "dog_size": "small",
+                "dog_count": 5,
+            },
+        )
+
+    def test_detail_not_found(self) -> None:
+        response = self.client.get(reverse("shelter:api-vaccine-detail", args=[999]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_resource_views_must_build_a_payload(self) -> None:
+        with self.assertRaises(TypeError):
+            ResourceView(resource=DOGS)
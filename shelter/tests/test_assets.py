@@ -0,0 +1,79 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from shelter.assets import minify
+
+
+SHELTER_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "shelter.assets.ShelterStaticFilesStorage"},
+}
+
+
+def render_bundle(name: str) -> str:
+    template = Template("{% load assets %}{% asset_bundle name %}")
+    return template.render(Context({"name": name}))
+
+
+class AssetPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        output = os.path.join(cls.static_root, "report.json")
+        with override_settings(STATIC_ROOT=cls.static_root, STORAGES=SHELTER_STORAGES):
+            call_command("build_assets", output=output, stdout=StringIO())
+            cls.bundle_tag = render_bundle("css/shelter.css")
+        with open(output) as report:
+            cls.report = {size["name"]: size for size in json.load(report)}
+
+    def read(self, name: str) -> str:
+        with open(os.path.join(self.static_root, name)) as asset:
+            return asset.read()
+
+    def test_builds_hashed_minified_and_compressed_assets(self) -> None:
+        report = self.report
+
+        bundle = report["css/shelter.css"]
+        self.assertRegex(bundle["stored_name"], r"^css/shelter\.[0-9a-f]{12}\.css$")
+        self.assertLess(bundle["minified"], bundle["source"])
+        self.assertLess(bundle["gzip"], bundle["minified"])
+        for extension in (".gz", ".br"):
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(self.static_root, bundle["stored_name"] + extension)
+                )
+            )
+        # References inside the bundle point at hashed files too.
+        self.assertRegex(
+            self.read(bundle["stored_name"]),
+            r'url\("\.\./dogs_cage\.[0-9a-f]{12}\.jpg"\)',
+        )
+        script = report["js/autocomplete.js"]
+        self.assertLess(script["minified"], script["source"])
+
+    def test_bundle_tag_links_the_built_bundle(self) -> None:
+        self.assertRegex(
+            self.bundle_tag,
+            r'^<link rel="stylesheet" href="/static/css/shelter\.[0-9a-f]{12}\.css">$',
+        )
+
+    def test_bundle_tag_links_sources_without_a_build(self) -> None:
+        self.assertEqual(
+            render_bundle("css/shelter.css"),
+            '<link rel="stylesheet" href="/static/css/styles.css">',
+        )
+
+    def test_minify(self) -> None:
+        self.assertEqual(
+            minify("a.css", "a {\n  color: red; /* x */\n}\n"), "a{color:red}"
+        )
+        self.assertEqual(minify("a.js", "// x\nconst a = 1;\n"), "const a=1;")
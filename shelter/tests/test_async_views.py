@@ -0,0 +1,189 @@
+import os
+import shutil
+import tempfile
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.http import Http404
+from django.test import (
+    AsyncRequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+
+from shelter.assets import ASGIStaticFiles
+from shelter.async_views import (
+    AsyncBreedDetailView,
+    AsyncBreedListView,
+    AsyncDogDetailView,
+    AsyncDogListView,
+)
+from shelter.models import Breed, Dog, Vaccination, Vaccine
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self) -> None:
+        self.factory = AsyncRequestFactory()
+        self.user = get_user_model().objects.create_user(
+            "volunteer", password="Password1234@"
+        )
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        vaccine = Vaccine.objects.create(name="Rabies")
+        self.dogs = [
+            Dog.objects.create(
+                name=f"Dog {number}",
+                date_registered=f"2023-06-{number + 10}",
+                gender="male",
+                breed=self.breed,
+            )
+            for number in range(12)
+        ]
+        self.dog = self.dogs[0]
+        self.dog.caretakers.add(self.user)
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=vaccine, vaccination_date="2023-07-01"
+        )
+
+    def request(self, path: str, user=None, method: str = "get"):
+        request = getattr(self.factory, method)(path)
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_dog_detail(self) -> None:
+        view = async_to_sync(AsyncDogDetailView.as_view())
+
+        with self.assertNumQueries(4):
+            response = view(self.request("/dogs/", self.user), pk=self.dog.pk)
+
+        self.assertContains(response, "Delete me from caretakers")
+        self.assertContains(response, "Rabies. Vaccinated at July 1, 2023")
+        self.assertContains(response, "(volunteer)")
+
+    async def test_dog_detail_not_found(self) -> None:
+        with self.assertRaises(Http404):
+            await AsyncDogDetailView.as_view()(self.request("/dogs/"), pk=999)
+
+    async def test_toggle_caretaker(self) -> None:
+        view = AsyncDogDetailView.as_view()
+        request = self.request("/dogs/", self.user, method="post")
+
+        await view(request, pk=self.dog.pk)
+        self.assertFalse(await self.dog.caretakers.filter(pk=self.user.pk).aexists())
+
+        await view(request, pk=self.dog.pk)
+        self.assertTrue(await self.dog.caretakers.filter(pk=self.user.pk).aexists())
+
+    async def test_toggle_requires_login(self) -> None:
+        view = AsyncDogDetailView.as_view()
+
+        response = await view(self.request("/dogs/", method="post"), pk=self.dog.pk)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(await self.dog.caretakers.filter(pk=self.user.pk).aexists())
+
+    async def test_dog_list_is_cursor_paginated(self) -> None:
+        view = AsyncDogListView.as_view()
+
+        response = await view(self.request("/dogs/"))
+
+        self.assertContains(response, "Dog 9")
+        self.assertNotContains(response, "Dog 10")
+        self.assertContains(response, "cursor=")
+
+    async def test_dog_list_legacy_page(self) -> None:
+        view = AsyncDogListView.as_view()
+
+        response = await view(self.request("/dogs/?page=2"))
+
+        self.assertContains(response, "Dog 11")
+        self.assertContains(response, "2 of 2")
+
+    async def test_dog_list_search(self) -> None:
+        view = AsyncDogListView.as_view()
+
+        response = await view(self.request("/dogs/?name=dog 11"))
+
+        self.assertContains(response, "Dog 11")
+        self.assertNotContains(response, "Dog 3")
+
+    async def test_breed_views(self) -> None:
+        response = await AsyncBreedListView.as_view()(self.request("/breeds/"))
+        self.assertContains(response, "Pekiness")
+
+        response = await AsyncBreedDetailView.as_view()(
+            self.request("/breeds/"), pk=self.breed.pk
+        )
+        self.assertContains(response, "12 dogs of this breed")
+
+    @override_settings(SHELTER_RESPONSE_CACHE_ENABLED=True)
+    def test_anonymous_responses_are_cached(self) -> None:
+        cache.clear()
+        view = async_to_sync(AsyncBreedListView.as_view())
+        view(self.request("/breeds/"))
+
+        with self.assertNumQueries(0):
+            response = view(self.request("/breeds/"))
+
+        self.assertContains(response, "Pekiness")
+
+
+WHITENOISE = "whitenoise.middleware.WhiteNoiseMiddleware"
+
+
+class ASGIStackTests(SimpleTestCase):
+    def test_asgi_handler_builds_an_async_chain(self) -> None:
+        # The middleware config/settings.py keeps under config/asgi.py.
+        middleware = [name for name in settings.MIDDLEWARE if name != WHITENOISE]
+
+        # Under DEBUG, Django logs every middleware it has to adapt to the
+        # handler's mode.
+        with override_settings(DEBUG=True, MIDDLEWARE=middleware):
+            with self.assertNoLogs("django.request", "DEBUG"):
+                ASGIHandler()
+        with override_settings(DEBUG=True, MIDDLEWARE=[WHITENOISE, *middleware]):
+            with self.assertLogs("django.request", "DEBUG"):
+                ASGIHandler()
+
+    async def test_static_files_are_served_in_front_of_django(self) -> None:
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        os.makedirs(os.path.join(static_root, "css"))
+        with open(os.path.join(static_root, "css", "site.css"), "wb") as file:
+            file.write(b"body { color: red; }")
+
+        async def django_application(scope, receive, send):
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        with override_settings(STATIC_ROOT=static_root, STATIC_URL="/static/"):
+            application = ASGIStaticFiles(django_application)
+
+        async def get(path: str):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": path,
+                "root_path": "",
+                "headers": [(b"accept-encoding", b"identity")],
+            }
+            await application(scope, None, send)
+            body = b"".join(message.get("body", b"") for message in messages[1:])
+            return messages[0], body
+
+        start, body = await get("/static/css/site.css")
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b'text/css; charset="utf-8"'), start["headers"])
+        self.assertEqual(body, b"body { color: red; }")
+
+        start, _ = await get("/dogs/")
+        self.assertEqual(start["status"], 404)
@@ -0,0 +1,93 @@
+from django.db.models import Sum
+from django.test import Client, TestCase
+
+from shelter.benchmarks.dataset import DatasetGenerator
+from shelter.benchmarks.harness import Harness, percentile
+from shelter.benchmarks.reports import compare_reports, regressions
+from shelter.models import Breed, Caretaker, Dog, ShelterStats
+from shelter.search import search_ids
+
+
+class DatasetGeneratorTests(TestCase):
+    def test_generates_consistent_dataset(self) -> None:
+        counts = DatasetGenerator(120, seed=1).generate()
+
+        self.assertEqual(Dog.objects.count(), 120)
+        self.assertEqual(Breed.objects.count(), counts["breeds"])
+        self.assertEqual(Caretaker.objects.count(), counts["caretakers"])
+        self.assertEqual(
+            Dog.caretakers.through.objects.count(), counts["caretaker_assignments"]
+        )
+        self.assertEqual(ShelterStats.load().total_dogs, 120)
+        self.assertEqual(Breed.objects.aggregate(total=Sum("dog_count"))["total"], 120)
+        self.assertTrue(search_ids(Breed, "retriever"))
+
+    def test_seed_makes_datasets_repeatable(self) -> None:
+        first = DatasetGenerator(50, seed=3).generate()
+        names = list(Dog.objects.order_by("id").values_list("name", "breed__name"))
+        Dog.objects.all().delete()
+        Breed.objects.all().delete()
+        Caretaker.objects.all().delete()
+
+        second = DatasetGenerator(50, seed=3).generate()
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            list(Dog.objects.order_by("id").values_list("name", "breed__name")), names
+        )
+
+
+class HarnessTests(TestCase):
+    def test_measures_routes(self) -> None:
+        DatasetGenerator(20).generate()
+        client = Client()
+        client.force_login(Caretaker.objects.create_superuser("admin", password="x"))
+
+        results = Harness(client, repeat=2, warmup=0).run(only="api-breed")
+
+        self.assertEqual(
+            set(results), {"shelter:api-breed-list", "shelter:api-breed-detail"}
+        )
+        for result in results.values():
+            self.assertEqual(result["status"], 200)
+            self.assertEqual(result["queries"], 1)
+            self.assertGreater(result["p95_ms"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+
+    def test_anonymous_run_leaves_out_login_redirects(self) -> None:
+        DatasetGenerator(20).generate()
+
+        results = Harness(Client(), repeat=2, warmup=0).run(anonymous=True)
+
+        self.assertIn("anon:shelter:dog-list", results)
+        self.assertNotIn("anon:shelter:breed-create", results)
+        self.assertFalse(any("admin:" in name for name in results))
+        for result in results.values():
+            self.assertNotEqual(result["status"], 302)
+
+    def test_percentile(self) -> None:
+        samples = list(range(1, 21))
+
+        self.assertEqual(percentile(samples, 0.5), 10)
+        self.assertEqual(percentile(samples, 0.95), 19)
+        self.assertEqual(percentile([7.0], 0.95), 7.0)
+
+
+class ReportTests(TestCase):
+    def report(self, p50: float, queries: int) -> dict:
+        route = {"p50_ms": p50, "p95_ms": p50, "queries": queries, "peak_memory_kb": 10}
+        return {"sizes": {"100": {"routes": {"shelter:index": route}}}}
+
+    def test_regressions(self) -> None:
+        changes = compare_reports(self.report(10, 3), self.report(11, 4))
+
+        found = {change.metric for change in regressions(changes, threshold=0.2)}
+
+        self.assertEqual(found, {"queries"})
+
+    def test_slowdown_above_threshold(self) -> None:
+        changes = compare_reports(self.report(10, 3), self.report(13, 3))
+
+        found = {change.metric for change in regressions(changes, threshold=0.2)}
+
+        self.assertEqual(found, {"p50_ms", "p95_ms"})
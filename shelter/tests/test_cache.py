@@ -0,0 +1,135 @@
+import threading
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models.deletion import Collector
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shelter.cache import cached_response, model_versions
+from shelter.models import Breed, Dog, Vaccine
+
+
+@override_settings(SHELTER_RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=self.breed
+        )
+
+    def test_second_request_is_served_from_cache(self) -> None:
+        self.client.get(reverse("shelter:dog-list"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("shelter:dog-list"))
+
+        self.assertContains(response, "Brovko")
+
+    def test_query_string_is_part_of_key(self) -> None:
+        self.client.get(reverse("shelter:dog-list"))
+
+        response = self.client.get(reverse("shelter:dog-list"), {"name": "xyz"})
+
+        self.assertNotContains(response, "Brovko")
+
+    def test_model_change_invalidates_page(self) -> None:
+        self.client.get(reverse("shelter:dog-list"))
+        Dog.objects.create(
+            name="Fluffy",
+            date_registered="2023-06-21",
+            gender="female",
+            breed=self.breed,
+        )
+
+        response = self.client.get(reverse("shelter:dog-list"))
+
+        self.assertContains(response, "Fluffy")
+
+    def test_unrelated_model_change_keeps_page(self) -> None:
+        versions = model_versions(["dog", "breed"])
+        Vaccine.objects.create(name="Rabies")
+
+        self.assertEqual(model_versions(["dog", "breed"]), versions)
+
+    def test_version_receivers_leave_other_models_fast_deletable(self) -> None:
+        links = Dog.caretakers.through.objects.all()
+
+        self.assertTrue(Collector(using="default").can_fast_delete(links))
+        versions = model_versions(["dog", "caretaker"])
+        get_user_model().objects.create_user("volunteer", password="Password1234@")
+        self.assertEqual(model_versions(["dog"]), {"dog": versions["dog"]})
+        self.assertNotEqual(
+            model_versions(["caretaker"]), {"caretaker": versions["caretaker"]}
+        )
+
+    def test_caretaker_change_invalidates_dog_detail(self) -> None:
+        url = reverse("shelter:dog-detail", kwargs={"pk": self.dog.pk})
+        self.client.get(url)
+        caretaker = get_user_model().objects.create_user(
+            "volunteer", first_name="Oksana", password="Password1234@"
+        )
+        self.dog.caretakers.add(caretaker)
+
+        self.assertContains(self.client.get(url), "Oksana")
+
+    def test_caretaker_change_invalidates_dog_list_filter(self) -> None:
+        url = reverse("shelter:dog-list") + "?no_caretakers=on"
+        self.assertContains(self.client.get(url), "Brovko")
+        caretaker = get_user_model().objects.create_user(
+            "volunteer", password="Password1234@"
+        )
+        self.dog.caretakers.add(caretaker)
+
+        self.assertNotContains(self.client.get(url), "Brovko")
+
+    def test_authenticated_users_are_not_served_from_cache(self) -> None:
+        self.client.get(reverse("shelter:dog-list"))
+        user = get_user_model().objects.create_user("test", password="Password1234@")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("shelter:dog-list"))
+
+        self.assertContains(response, "User: test")
+
+    def test_concurrent_misses_render_once(self) -> None:
+        renders = []
+        started = threading.Event()
+
+        def render():
+            renders.append(1)
+            started.set()
+            threading.Event().wait(0.2)
+            return HttpResponse("page")
+
+        first = threading.Thread(target=cached_response, args=("key", render, 60))
+        first.start()
+        started.wait()
+        response = cached_response("key", render, 60)
+        first.join()
+
+        self.assertEqual(len(renders), 1)
+        self.assertEqual(response.content, b"page")
+
+    def test_warm_cache_command(self) -> None:
+        out = StringIO()
+        with self.settings(ALLOWED_HOSTS=["testserver"]):
+            call_command(
+                "warm_cache",
+                "--host",
+                "testserver",
+                "--allow-local-cache",
+                stdout=out,
+            )
+
+        self.assertIn("Warmed 6 pages", out.getvalue())
+        with self.assertNumQueries(0):
+            self.client.get(reverse("shelter:index"))
+
+    def test_warm_cache_refuses_a_process_local_cache(self) -> None:
+        with self.assertRaisesMessage(CommandError, "shared cache"):
+            call_command("warm_cache", stdout=StringIO())
@@ -2,6 +2,9 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
+from shelter.caretaking import assign_caretakers
+from shelter.models import Breed, Dog
+
 
 CARETAKER_LIST_URL = reverse("shelter:caretaker-list")
 
@@ -276,3 +279,120 @@ class PrivatecaretakerTests(TestCase):
         )
 
         self.assertRedirects(response, reverse("shelter:caretaker-list"))
+
+
+class CaretakerAutocompleteTests(TestCase):
+    url = reverse("shelter:caretaker-autocomplete")
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user("admin", "password1234@")
+        self.client.force_login(self.user)
+        for number in range(25):
+            get_user_model().objects.create_user(f"keeper{number:02}", "password")
+
+    def test_login_required(self) -> None:
+        self.client.logout()
+
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_results_are_paged(self) -> None:
+        first = self.client.get(self.url).json()
+        second = self.client.get(self.url, {"page": 2}).json()
+
+        self.assertEqual(len(first["results"]), 20)
+        self.assertTrue(first["more"])
+        self.assertEqual(len(second["results"]), 6)
+        self.assertFalse(second["more"])
+
+    def test_search_by_username(self) -> None:
+        response = self.client.get(self.url, {"q": "keeper07"})
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 1)
+        self.assertIn("keeper07", results[0]["text"])
+
+    def test_invalid_page(self) -> None:
+        response = self.client.get(self.url, {"page": "last"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class CaretakerWorkloadTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user("admin", "password1234@")
+        self.client.force_login(self.user)
+        small = Breed.objects.create(name="Pekiness", dog_size="small")
+        giant = Breed.objects.create(name="Alabai", dog_size="giant")
+        self.dogs = [
+            Dog.objects.create(
+                name=f"Dog {number}",
+                date_registered="2023-06-20",
+                gender="male",
+                breed=giant if number % 3 == 0 else small,
+            )
+            for number in range(25)
+        ]
+        self.busy = get_user_model().objects.create_user(
+            "busy", "password", expert_level="expert"
+        )
+        self.beginner = get_user_model().objects.create_user("beginner", "password")
+        assign_caretakers([dog.pk for dog in self.dogs], [self.busy.pk])
+        assign_caretakers([dog.pk for dog in self.dogs[:3]], [self.beginner.pk])
+
+    def test_list_shows_workload_and_sorts_by_it(self) -> None:
+        response = self.client.get(CARETAKER_LIST_URL, {"sort": "giant"})
+        caretakers = response.context["caretaker_list"]
+
+        self.assertEqual(
+            [(c.username, c.dog_count, c.small_dogs, c.giant_dogs) for c in caretakers],
+            [("busy", 25, 16, 9), ("beginner", 3, 2, 1), ("admin", 0, 0, 0)],
+        )
+        self.assertContains(response, "giant: 9")
+
+    def test_sorted_list_pages_by_cursor(self) -> None:
+        for number in range(15):
+            get_user_model().objects.create_user(f"keeper{number:02}", "password")
+
+        first = self.client.get(CARETAKER_LIST_URL, {"sort": "dogs"})
+        second = self.client.get(
+            CARETAKER_LIST_URL,
+            {"sort": "dogs", "cursor": first.context["page_obj"].next_cursor},
+        )
+
+        usernames = [
+            caretaker.username
+            for page in (first, second)
+            for caretaker in page.context["caretaker_list"]
+        ]
+        self.assertEqual(usernames[:3], ["busy", "beginner", "admin"])
+        self.assertEqual(len(usernames), 18)
+        self.assertEqual(len(set(usernames)), 18)
+
+    def test_detail_pages_dogs_in_constant_queries(self) -> None:
+        url = reverse("shelter:caretaker-detail", kwargs={"pk": self.busy.pk})
+
+        # Session, user, the caretaker with their counts and a page of dogs
+        # with their breeds.
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context["dog_list"]), 20)
+        self.assertContains(response, "Looks after <strong>25</strong> dogs")
+
+        response = self.client.get(
+            url, {"cursor": response.context["page_obj"].next_cursor}
+        )
+        self.assertEqual(len(response.context["dog_list"]), 5)
+        self.assertEqual(self.client.get(url, {"cursor": "bad"}).status_code, 404)
+
+    def test_over_capacity(self) -> None:
+        url = reverse("shelter:caretaker-over-capacity")
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(
+            [
+                (caretaker.username, caretaker.capacity, caretaker.overload)
+                for caretaker in response.context["caretaker_list"]
+            ],
+            [("busy", 10, 15), ("beginner", 2, 1)],
+        )
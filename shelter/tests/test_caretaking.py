@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shelter.cache import model_versions
+from shelter.caretaking import assign_caretakers, remove_caretakers, toggle_caretaker
+from shelter.models import Breed, Dog
+
+
+class CaretakingTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dogs = [
+            Dog.objects.create(
+                name=f"Dog {number}",
+                date_registered="2023-06-20",
+                gender="male",
+                breed=self.breed,
+            )
+            for number in range(3)
+        ]
+        self.caretakers = [
+            get_user_model().objects.create_user(f"keeper{number}", "password1234@")
+            for number in range(2)
+        ]
+
+    def links(self) -> set:
+        return set(Dog.caretakers.through.objects.values_list("dog_id", "caretaker_id"))
+
+    def test_toggle_flips_membership_without_loading_caretakers(self) -> None:
+        dog, caretaker = self.dogs[0], self.caretakers[0]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(toggle_caretaker(dog.pk, caretaker.pk))
+        statements = [
+            query["sql"].split()[0]
+            for query in queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        # The UPDATEs move the dog's updated_at stamp and recount caretaker
+        # coverage in its intake rollup.
+        self.assertEqual(statements, ["SELECT", "INSERT", "UPDATE", "UPDATE"])
+        self.assertEqual(self.links(), {(dog.pk, caretaker.pk)})
+
+        self.assertFalse(toggle_caretaker(dog.pk, caretaker.pk))
+        self.assertEqual(self.links(), set())
+
+    def test_explicit_assign_is_idempotent(self) -> None:
+        dog, caretaker = self.dogs[0], self.caretakers[0]
+
+        toggle_caretaker(dog.pk, caretaker.pk, assign=True)
+        toggle_caretaker(dog.pk, caretaker.pk, assign=True)
+
+        self.assertEqual(self.links(), {(dog.pk, caretaker.pk)})
+
+    def test_bulk_assign_and_remove(self) -> None:
+        dog_ids = [dog.pk for dog in self.dogs]
+        caretaker_ids = [caretaker.pk for caretaker in self.caretakers]
+        toggle_caretaker(dog_ids[0], caretaker_ids[0])
+
+        with self.assertNumQueries(3):
+            assign_caretakers(dog_ids, caretaker_ids)
+        self.assertEqual(len(self.links()), 6)
+
+        with self.assertNumQueries(3):
+            removed = remove_caretakers(dog_ids[:2], caretaker_ids)
+        self.assertEqual(removed, 4)
+        self.assertEqual(
+            self.links(),
+            {(dog_ids[2], caretaker_ids[0]), (dog_ids[2], caretaker_ids[1])},
+        )
+
+    def test_changes_bump_the_caretaker_cache_version(self) -> None:
+        before = model_versions(["caretaker"])["caretaker"]
+
+        assign_caretakers([self.dogs[0].pk], [self.caretakers[0].pk])
+
+        self.assertGreater(model_versions(["caretaker"])["caretaker"], before)
+
+    def test_detail_page_posts_the_intended_action(self) -> None:
+        dog, caretaker = self.dogs[0], self.caretakers[0]
+        self.client.force_login(caretaker)
+        url = reverse("shelter:dog-detail", kwargs={"pk": dog.pk})
+
+        self.client.post(url, {"action": "add"})
+        self.client.post(url, {"action": "add"})
+        self.assertEqual(self.links(), {(dog.pk, caretaker.pk)})
+
+        response = self.client.post(url, {"action": "remove"})
+        self.assertRedirects(response, url)
+        self.assertEqual(self.links(), set())
+
+    def test_bulk_endpoint_requires_permission(self) -> None:
+        user = self.caretakers[0]
+        self.client.force_login(user)
+        data = {
+            "dogs": [dog.pk for dog in self.dogs],
+            "caretakers": [user.pk],
+            "operation": "assign",
+        }
+        url = reverse("shelter:dog-caretakers")
+
+        self.assertEqual(self.client.post(url, data).status_code, 403)
+
+        user.user_permissions.add(Permission.objects.get(codename="change_dog"))
+        response = self.client.post(url, data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["dogs"], data["dogs"])
+        self.assertEqual(len(self.links()), 3)
+
+    def test_admin_action(self) -> None:
+        admin = get_user_model().objects.create_superuser("admin", password="x")
+        self.client.force_login(admin)
+        url = reverse("admin:shelter_dog_changelist")
+        selected = [dog.pk for dog in self.dogs[:2]]
+
+        response = self.client.post(
+            url, {"action": "change_caretakers", "_selected_action": selected}
+        )
+        self.assertContains(response, "Assign or remove caretakers")
+
+        response = self.client.post(
+            url,
+            {
+                "action": "change_caretakers",
+                "_selected_action": selected,
+                "caretakers": [self.caretakers[1].pk],
+                "operation": "assign",
+                "apply": "Apply",
+            },
+        )
+        self.assertRedirects(response, url)
+        self.assertEqual(
+            self.links(), {(dog_id, self.caretakers[1].pk) for dog_id in selected}
+        )
@@ -0,0 +1,93 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from shelter.models import Breed, Dog, ShelterStats
+
+
+class CountersTests(TestCase):
+    def setUp(self) -> None:
+        self.small = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.giant = Breed.objects.create(name="Alabai", dog_size="giant")
+        self.dog = Dog.objects.create(
+            name="Brovko",
+            date_registered="2023-06-20",
+            gender="male",
+            breed=self.small,
+        )
+
+    def assertCounts(self, small: int, giant: int, **stats) -> None:
+        self.small.refresh_from_db()
+        self.giant.refresh_from_db()
+        self.assertEqual(self.small.dog_count, small)
+        self.assertEqual(self.giant.dog_count, giant)
+        shelter_stats = ShelterStats.load()
+        for field, value in stats.items():
+            self.assertEqual(getattr(shelter_stats, field), value, field)
+
+    def test_counters_follow_dog_create(self) -> None:
+        Dog.objects.create(
+            name="Fluffy",
+            date_registered="2023-06-21",
+            gender="female",
+            breed=self.giant,
+        )
+
+        self.assertCounts(
+            1, 1, total_dogs=2, small_dogs=1, giant_dogs=1, male_dogs=1, female_dogs=1
+        )
+
+    def test_counters_follow_breed_and_gender_change(self) -> None:
+        self.dog.breed = self.giant
+        self.dog.gender = "female"
+        self.dog.save()
+
+        self.assertCounts(
+            0, 1, total_dogs=1, small_dogs=0, giant_dogs=1, male_dogs=0, female_dogs=1
+        )
+
+    def test_counters_follow_dog_delete(self) -> None:
+        self.dog.delete()
+
+        self.assertCounts(0, 0, total_dogs=0, small_dogs=0, male_dogs=0)
+
+    def test_breed_size_change_moves_size_counter(self) -> None:
+        self.small.dog_size = "large"
+        self.small.save()
+
+        self.assertCounts(1, 0, total_dogs=1, small_dogs=0, large_dogs=1)
+
+    def test_stale_breed_save_keeps_dog_count(self) -> None:
+        stale = Breed.objects.get(pk=self.giant.pk)
+        Dog.objects.create(
+            name="Fluffy",
+            date_registered="2023-06-21",
+            gender="female",
+            breed=self.giant,
+        )
+        stale.name = "Central Asian Shepherd"
+        stale.save()
+
+        self.assertCounts(1, 1, total_dogs=2)
+
+    def test_rebuild_counters_command(self) -> None:
+        Dog.objects.filter(pk=self.dog.pk).update(breed=self.giant)
+        ShelterStats.objects.all().delete()
+
+        call_command("rebuild_counters", stdout=StringIO())
+
+        self.assertCounts(0, 1, total_dogs=1, giant_dogs=1, small_dogs=0, male_dogs=1)
+
+    def test_breed_list_does_not_load_dogs(self) -> None:
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("shelter:breed-list"))
+
+        self.assertContains(response, "<td>1</td>", html=True)
+
+    def test_index_reads_shelter_stats(self) -> None:
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("shelter:index"))
+
+        self.assertEqual(response.context["number_of_dogs"], 1)
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.db import OperationalError, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from shelter.cache import acached_response
+from shelter.db_router import (
+    STICKY_COOKIE,
+    ReplicaHealth,
+    ReplicaRoutingMiddleware,
+    RoutingState,
+    current_routing,
+    health,
+)
+from shelter.models import Breed, Dog
+
+
+def add_sqlite_database(alias: str, name: str) -> None:
+    connections.settings[alias] = {**connections.settings["default"], "NAME": name}
+
+
+@override_settings(
+    SHELTER_REPLICAS=["replica"],
+    SHELTER_REPLICA_STICKY_SECONDS=15,
+    SHELTER_REPLICA_HEALTH_INTERVAL=30,
+)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self) -> None:
+        # A second SQLite file stands in for the replica; its contents don't
+        # matter, only where the reads are routed.
+        directory = tempfile.mkdtemp()
+        replica_file = os.path.join(directory, "replica.sqlite3")
+        sqlite3.connect(replica_file).close()
+        add_sqlite_database("replica", replica_file)
+        add_sqlite_database("missing", os.path.join(directory, "no", "such.sqlite3"))
+        health.reset()
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+
+    def tearDown(self) -> None:
+        for alias in ("replica", "missing"):
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        health.reset()
+
+    def route(self, method: str = "get", cookies=None, write=False):
+        routed = {}
+
+        def view(request):
+            if write:
+                Breed.objects.create(name="Alabai", dog_size="giant")
+            routed["read"] = router.db_for_read(Dog)
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)(reverse("shelter:dog-list"))
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = type("Match", (), {"namespace": "shelter"})()
+        middleware = ReplicaRoutingMiddleware(view)
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware.get_response = get_response
+        response = middleware(request)
+        return routed["read"], response
+
+    def test_shelter_page_reads_go_to_the_replica(self) -> None:
+        read, response = self.route()
+
+        self.assertEqual(read, "replica")
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_reads_outside_requests_use_the_primary(self) -> None:
+        self.assertEqual(router.db_for_read(Dog), "default")
+        self.assertEqual(router.db_for_write(Dog), "default")
+
+    def test_writes_stick_the_client_to_the_primary(self) -> None:
+        read, response = self.route("post")
+
+        self.assertEqual(read, "default")
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 15)
+
+        read, _ = self.route(cookies={STICKY_COOKIE: "1"})
+        self.assertEqual(read, "default")
+
+    def test_reads_after_a_write_in_the_same_request_use_the_primary(self) -> None:
+        read, response = self.route(write=True)
+
+        self.assertEqual(read, "default")
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    @override_settings(SHELTER_REPLICAS=["missing"])
+    def test_falls_back_to_the_primary_without_a_healthy_replica(self) -> None:
+        with self.assertLogs("shelter.db_router", "WARNING"):
+            read, _ = self.route()
+
+        self.assertEqual(read, "default")
+
+    @override_settings(SHELTER_REPLICAS=["missing", "replica"])
+    def test_unhealthy_replicas_are_skipped(self) -> None:
+        with self.assertLogs("shelter.db_router", "WARNING"):
+            reads = {self.route()[0] for _ in range(5)}
+
+        self.assertEqual(reads, {"replica"})
+
+    def test_full_request_through_the_replica(self) -> None:
+        # The replica file has no tables: a page read from it fails, which
+        # shows that the breed page really queried the replica.
+        with self.assertRaisesMessage(OperationalError, "no such table"):
+            self.client.get(reverse("shelter:breed-detail", args=[self.breed.pk]))
+
+        response = self.client.get(
+            reverse("shelter:breed-detail", args=[self.breed.pk]),
+            HTTP_COOKIE=f"{STICKY_COOKIE}=1",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_one_thread_probes_a_replica_at_a_time(self) -> None:
+        replicas = ReplicaHealth()
+        probing, release = threading.Event(), threading.Event()
+
+        def slow_check(alias):
+            probing.set()
+            release.wait(5)
+            return True
+
+        with mock.patch("shelter.db_router.check_replica", side_effect=slow_check):
+            prober = threading.Thread(target=replicas.is_healthy, args=["replica"])
+            prober.start()
+            probing.wait(5)
+            # Meanwhile the others use the last known state.
+            self.assertFalse(replicas.is_healthy("replica"))
+            release.set()
+            prober.join()
+            self.assertTrue(replicas.is_healthy("replica"))
+
+    def test_middleware_runs_async(self) -> None:
+        routed = {}
+
+        async def get_response(request):
+            routed["state"] = current_routing.get()
+            routed["state"].wrote = True
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        request = RequestFactory().get(reverse("shelter:dog-list"))
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = asyncio.run(middleware(request))
+        self.assertIsNotNone(routed["state"])
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    async def test_async_cache_miss_renders_from_the_primary(self) -> None:
+        await cache.aclear()
+        routed = []
+
+        async def render():
+            routed.append(await sync_to_async(router.db_for_read)(Dog))
+            return HttpResponse()
+
+        token = current_routing.set(RoutingState(replica_reads=True))
+        try:
+            await acached_response("replica-miss", render, 60)
+        finally:
+            current_routing.reset(token)
+
+        self.assertEqual(routed, ["default"])
@@ -0,0 +1,87 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from shelter.exports import dog_records
+from shelter.models import Breed, Dog, Vaccination, Vaccine
+
+
+EXPORT_URL = reverse("shelter:dog-export")
+
+
+class DogExportTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "volunteer", password="Password1234@"
+        )
+        self.client.force_login(self.user)
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        vaccine = Vaccine.objects.create(name="Rabies")
+        for number in range(5):
+            dog = Dog.objects.create(
+                name=f"Dog {number}",
+                date_registered=f"2023-06-2{number}",
+                gender="male",
+                breed=breed,
+            )
+            dog.caretakers.add(self.user)
+            Vaccination.objects.create(
+                dog=dog, vaccine=vaccine, vaccination_date="2023-07-01"
+            )
+        Dog.objects.create(
+            name="Fluffy", date_registered="2023-06-30", gender="female", breed=breed
+        )
+
+    def test_export_requires_login(self) -> None:
+        self.client.logout()
+
+        self.assertEqual(self.client.get(EXPORT_URL).status_code, 302)
+
+    def test_related_data_is_prefetched_per_chunk(self) -> None:
+        # one dogs+breeds query and two prefetches per chunk of two dogs
+        with self.assertNumQueries(7):
+            records = list(dog_records(Dog.objects.order_by("id"), chunk_size=2))
+
+        self.assertEqual(len(records), 6)
+        self.assertEqual(records[0]["caretakers"], ["volunteer"])
+        self.assertEqual(records[0]["vaccinations"][0]["vaccine"], "Rabies")
+
+    def test_csv_export(self) -> None:
+        response = self.client.get(EXPORT_URL, {"format": "csv"})
+        rows = list(
+            csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["breed"], "Pekiness")
+        self.assertEqual(rows[0]["vaccinations"], "Rabies@2023-07-01")
+
+    def test_gzip_jsonl_export_accepts_list_filters(self) -> None:
+        response = self.client.get(
+            EXPORT_URL, {"format": "jsonl", "compress": "gzip", "name": "fluffy"}
+        )
+        content = gzip.decompress(b"".join(response.streaming_content))
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        records = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([record["name"] for record in records], ["Fluffy"])
+
+    def test_unknown_format_is_rejected(self) -> None:
+        self.assertEqual(
+            self.client.get(EXPORT_URL, {"format": "xml"}).status_code, 400
+        )
+
+    def test_export_dogs_command(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dogs.jsonl.gz")
+            call_command("export_dogs", "--format", "jsonl", "--gzip", "--output", path)
+            with gzip.open(path, "rt") as export:
+                self.assertEqual(len(export.readlines()), 6)
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from shelter.forms import DogSearchForm
+from shelter.models import Breed, Dog
+
+
+DOG_LIST_URL = reverse("shelter:dog-list")
+
+
+class DogFacetTests(TestCase):
+    def setUp(self) -> None:
+        self.pekiness = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.alabai = Breed.objects.create(name="Alabai", dog_size="giant")
+        for name, breed, gender, sterilized in [
+            ("Brovko", self.pekiness, "male", True),
+            ("Fluffy", self.pekiness, "female", False),
+            ("Sirko", self.alabai, "male", False),
+            ("Bim", self.alabai, "male", True),
+        ]:
+            Dog.objects.create(
+                name=name,
+                breed=breed,
+                gender=gender,
+                sterilized=sterilized,
+                date_registered="2023-06-20",
+            )
+        caretaker = get_user_model().objects.create_user("keeper", "password1234@")
+        Dog.objects.get(name="Bim").caretakers.add(caretaker)
+
+    def form(self, data: dict) -> DogSearchForm:
+        form = DogSearchForm(data)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form
+
+    def labels(self, form: DogSearchForm, field: str) -> list:
+        return [label for _, label in form.fields[field].choices]
+
+    def test_counts_come_from_one_query(self) -> None:
+        form = self.form({"gender": ["male"]})
+
+        with self.assertNumQueries(1):
+            form.add_facet_counts(Dog.objects.all())
+
+        self.assertEqual(self.labels(form, "breed"), ["Alabai (2)", "Pekiness (1)"])
+        # A facet's own selection doesn't narrow its counts.
+        self.assertEqual(self.labels(form, "gender"), ["female (1)", "male (3)"])
+        self.assertEqual(
+            self.labels(form, "dog_size"),
+            ["small (1)", "medium (0)", "large (0)", "giant (2)"],
+        )
+        self.assertEqual(self.labels(form, "sterilized"), ["yes (2)", "no (1)"])
+        self.assertEqual(form.fields["no_caretakers"].label, "Without caretakers (2)")
+
+    def test_filters(self) -> None:
+        cases = [
+            ({"dog_size": ["giant"]}, {"Sirko", "Bim"}),
+            ({"breed": [self.pekiness.pk], "gender": ["female"]}, {"Fluffy"}),
+            ({"sterilized": ["True"]}, {"Brovko", "Bim"}),
+            ({"no_caretakers": "on", "dog_size": ["giant"]}, {"Sirko"}),
+            ({"registered_after": "2023-07-01"}, set()),
+        ]
+        for data, names in cases:
+            with self.subTest(data=data):
+                dogs = self.form(data).filter_queryset(Dog.objects.all())
+                self.assertEqual({dog.name for dog in dogs}, names)
+
+    def test_name_search_narrows_the_counts(self) -> None:
+        form = self.form({"name": "Sirko"})
+
+        form.add_facet_counts(Dog.objects.all())
+
+        self.assertEqual(self.labels(form, "breed"), ["Alabai (1)"])
+
+    def test_dog_list_shows_filtered_dogs_and_counts(self) -> None:
+        response = self.client.get(DOG_LIST_URL, {"dog_size": "small"})
+
+        self.assertEqual(
+            {dog.name for dog in response.context["dog_list"]}, {"Brovko", "Fluffy"}
+        )
+        self.assertContains(response, "Pekiness (2)")
+        self.assertContains(response, "giant (2)")
+
+    def test_export_applies_the_facets(self) -> None:
+        self.client.force_login(get_user_model().objects.get(username="keeper"))
+
+        response = self.client.get(
+            reverse("shelter:dog-export"), {"format": "csv", "gender": "female"}
+        )
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("Fluffy", content)
+        self.assertNotIn("Brovko", content)
@@ -1,7 +1,10 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 
-from shelter.forms import CaretakerCreationForm, CaretakerUpdateForm
+from shelter.forms import CaretakerCreationForm, CaretakerUpdateForm, DogForm
+from shelter.models import Breed
 
 
 class CaretakerFormsTest(TestCase):
@@ -31,3 +34,45 @@ class CaretakerFormsTest(TestCase):
         form = CaretakerUpdateForm(data=form_data)
         self.assertTrue(form.is_valid())
         self.assertEqual(form.cleaned_data, form_data)
+
+
+class DogFormCaretakersTest(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.caretakers = [
+            get_user_model().objects.create_user(f"keeper{number}", "password1234@")
+            for number in range(5)
+        ]
+
+    def test_only_selected_caretakers_are_rendered(self) -> None:
+        form = DogForm(initial={"caretakers": [self.caretakers[1]]})
+
+        html = str(form["caretakers"])
+
+        self.assertIn("keeper1", html)
+        self.assertNotIn("keeper0", html)
+        self.assertIn("data-autocomplete-url", html)
+
+    def test_validation_loads_only_submitted_caretakers(self) -> None:
+        form = DogForm(
+            data={
+                "name": "Brovko",
+                "date_registered": "2023-06-20",
+                "gender": "male",
+                "breed": self.breed.pk,
+                "caretakers": [self.caretakers[0].pk, self.caretakers[3].pk],
+            }
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(form.is_valid())
+
+        caretaker_queries = [
+            query["sql"] for query in queries if "shelter_caretaker" in query["sql"]
+        ]
+        self.assertEqual(len(caretaker_queries), 1)
+        self.assertIn(" IN (", caretaker_queries[0])
+        self.assertEqual(
+            list(form.cleaned_data["caretakers"]),
+            [self.caretakers[0], self.caretakers[3]],
+        )
@@ -0,0 +1,110 @@
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shelter.caretaking import assign_caretakers
+from shelter.models import Breed, Dog, Vaccination, Vaccine
+
+
+class UpdatedAtTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=self.breed
+        )
+        self.caretaker = get_user_model().objects.create_user("keeper", "password1")
+
+    def assertTouched(self, instance, change) -> None:
+        before = type(instance).objects.get(pk=instance.pk).updated_at
+        change()
+        after = type(instance).objects.get(pk=instance.pk).updated_at
+        self.assertGreater(after, before)
+
+    def test_dog_moves_with_its_caretakers(self) -> None:
+        changes = [
+            lambda: self.dog.caretakers.add(self.caretaker),
+            lambda: self.caretaker.dogs.clear(),
+            lambda: self.caretaker.dogs.add(self.dog),
+            lambda: assign_caretakers([self.dog.pk], [self.caretaker.pk]),
+            lambda: get_user_model().objects.filter(pk=self.caretaker.pk).get().save(),
+            lambda: self.caretaker.delete(),
+        ]
+        for change in changes:
+            self.assertTouched(self.dog, change)
+
+    def test_dog_moves_with_its_vaccinations(self) -> None:
+        vaccine = Vaccine.objects.create(name="Rabies")
+        self.assertTouched(
+            self.dog,
+            lambda: Vaccination.objects.create(
+                dog=self.dog, vaccine=vaccine, vaccination_date="2023-06-20"
+            ),
+        )
+        vaccine.name = "Rabies (3 years)"
+        self.assertTouched(self.dog, vaccine.save)
+        self.assertTouched(self.dog, lambda: Vaccination.objects.all().delete())
+
+    def test_dogs_move_with_their_breed(self) -> None:
+        self.breed.name = "Pekingese"
+        self.assertTouched(self.dog, self.breed.save)
+
+    def test_breed_moves_with_its_dogs(self) -> None:
+        self.dog.name = "Sirko"
+        self.assertTouched(self.breed, self.dog.save)
+        self.assertTouched(self.breed, self.dog.delete)
+
+
+@override_settings(SHELTER_FRAGMENT_CACHE_ENABLED=True)
+class FragmentCacheTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dogs = [
+            Dog.objects.create(
+                name=name, date_registered="2023-06-20", gender="male", breed=breed
+            )
+            for name in ("Brovko", "Sirko", "Bim")
+        ]
+
+    def test_dog_list_fetches_all_cards_at_once(self) -> None:
+        self.client.get(reverse("shelter:dog-list"))
+        self.dogs[1].name = "Rex"
+        self.dogs[1].save()
+
+        with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+                response = self.client.get(reverse("shelter:dog-list"))
+
+        self.assertEqual(get_many.call_count, 1)
+        self.assertEqual(len(get_many.call_args.args[0]), 3)
+        # Only the renamed dog's card was rendered and stored again.
+        self.assertEqual(len(set_many.call_args.args[0]), 1)
+        self.assertContains(response, "Rex")
+        self.assertContains(response, "Brovko")
+
+    @skipIf(
+        settings.SHELTER_ASYNC_VIEWS,
+        "the async dog page fetches every section concurrently up front",
+    )
+    def test_dog_page_skips_unchanged_sections(self) -> None:
+        url = reverse("shelter:dog-detail", args=[self.dogs[0].pk])
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, "This dog doesn't have caretakers now")
+
+        self.dogs[0].caretakers.add(
+            get_user_model().objects.create_user(
+                "keeper", "password1", first_name="Olha"
+            )
+        )
+        self.assertContains(self.client.get(url), "Olha (keeper)")
@@ -0,0 +1,184 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from shelter.importers import ShelterImporter, clean_rows, rejects_file
+from shelter.models import (
+    Breed,
+    Dog,
+    ImportCheckpoint,
+    ShelterStats,
+    Vaccination,
+    Vaccine,
+)
+from shelter.search import search_ids
+
+
+DOGS_CSV = """name,age,date_registered,sterilized,gender,breed
+Brovko,7 months,2023-06-20,true,male,Pekiness
+Fluffy,,2023-06-21,false,female,pekiness
+Sirko,2 years,not a date,false,male,Pekiness
+Rex,1 year,2023-06-22,false,male,Unknown breed
+Laika,3 years,2023-06-23,yes,female,Husky
+"""
+
+
+class ImportShelterDataTests(TestCase):
+    def setUp(self) -> None:
+        self.pekiness = Breed.objects.create(name="Pekiness", dog_size="small")
+        Breed.objects.create(name="Husky", dog_size="large")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def test_dog_rows_are_validated_with_dog_form_rules(self) -> None:
+        rows = [(1, {"name": "Brovko", "date_registered": "x", "gender": "cat"})]
+
+        ((number, _, cleaned, errors),) = clean_rows("dogs", rows)
+
+        self.assertIsNone(cleaned)
+        self.assertEqual(set(errors), {"date_registered", "gender"})
+
+    def test_import_dogs_csv(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV)
+        out = StringIO()
+
+        call_command(
+            "import_shelter_data",
+            path,
+            "--kind",
+            "dogs",
+            "--batch-size",
+            "2",
+            stdout=out,
+        )
+
+        self.assertEqual(
+            sorted(Dog.objects.values_list("name", flat=True)),
+            ["Brovko", "Fluffy", "Laika"],
+        )
+        self.assertTrue(Dog.objects.get(name="Laika").sterilized)
+        self.assertEqual(Dog.objects.get(name="Fluffy").breed, self.pekiness)
+        self.assertIn("Imported 3 dogs (2 rejected", out.getvalue())
+
+        with open(f"{path}.rejects.jsonl") as rejects:
+            rejected = [json.loads(line) for line in rejects]
+        self.assertEqual([row["row"] for row in rejected], [3, 4])
+        self.assertIn("breed", rejected[1]["errors"])
+
+    def test_imported_dogs_update_counters_and_search(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV)
+
+        ShelterImporter(path=path, kind="dogs").run()
+
+        self.pekiness.refresh_from_db()
+        self.assertEqual(self.pekiness.dog_count, 2)
+        self.assertEqual(ShelterStats.load().total_dogs, 3)
+        self.assertEqual(search_ids(Dog, "laika"), [Dog.objects.get(name="Laika").pk])
+
+    def test_import_resumes_from_checkpoint(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV)
+        ImportCheckpoint.objects.create(source=path, kind="dogs", rows_done=2)
+
+        stats = ShelterImporter(path=path, kind="dogs").run()
+
+        self.assertEqual(stats.resumed_from, 2)
+        self.assertEqual(list(Dog.objects.values_list("name", flat=True)), ["Laika"])
+        self.assertEqual(ImportCheckpoint.objects.get(source=path).rows_done, 5)
+
+    def test_resumed_import_does_not_repeat_rejects(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV)
+        rejects = f"{path}.rejects.jsonl"
+        # Interrupted after rejecting Sirko, before the checkpoint moved on.
+        with rejects_file(rejects) as on_reject:
+            on_reject(3, {"name": "Sirko"}, {"date_registered": ["Enter a date."]})
+
+        call_command("import_shelter_data", path, kind="dogs", stdout=StringIO())
+
+        with open(rejects) as output:
+            self.assertEqual([json.loads(line)["row"] for line in output], [3, 4])
+
+        call_command(
+            "import_shelter_data", path, kind="dogs", restart=True, stdout=StringIO()
+        )
+
+        with open(rejects) as output:
+            self.assertEqual([json.loads(line)["row"] for line in output], [3, 4])
+
+    def test_create_breeds_option(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV + "Bim,1 year,2023-06-24,false,male, \n")
+
+        stats = ShelterImporter(path=path, kind="dogs", create_breeds=True).run()
+
+        self.assertTrue(Dog.objects.filter(breed__name="Unknown breed").exists())
+        self.assertFalse(Breed.objects.filter(name="").exists())
+        self.assertEqual(stats.rejected, 2)
+
+    def test_import_breeds_and_vaccinations_jsonl(self) -> None:
+        breeds = self.write(
+            "breeds.jsonl",
+            '{"name": "Alabai", "dog_size": "giant"}\n'
+            '{"name": "husky", "dog_size": "large"}\n'
+            "not json\n",
+        )
+        stats = ShelterImporter(path=breeds, kind="breeds", file_format="jsonl").run()
+        self.assertEqual((stats.imported, stats.skipped, stats.rejected), (1, 1, 1))
+
+        dog = Dog.objects.create(
+            name="Brovko",
+            date_registered="2023-06-20",
+            gender="male",
+            breed=self.pekiness,
+        )
+        vaccinations = self.write(
+            "vaccinations.jsonl",
+            json.dumps(
+                {"dog": dog.pk, "vaccine": "Rabies", "vaccination_date": "2023-07-01"}
+            )
+            + "\n"
+            + json.dumps(
+                {"dog": 999, "vaccine": "Rabies", "vaccination_date": "2023-07-01"}
+            )
+            + "\n",
+        )
+        stats = ShelterImporter(
+            path=vaccinations, kind="vaccinations", file_format="jsonl"
+        ).run()
+        self.assertEqual((stats.imported, stats.rejected), (0, 2))
+        self.assertFalse(Vaccine.objects.exists())
+
+        stats = ShelterImporter(
+            path=vaccinations,
+            kind="vaccinations",
+            file_format="jsonl",
+            create_vaccines=True,
+            restart=True,
+        ).run()
+
+        self.assertEqual((stats.imported, stats.rejected), (1, 1))
+        self.assertEqual(Vaccination.objects.get().vaccine.name, "Rabies")
+
+    def test_parsing_in_process_pool(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV)
+
+        stats = ShelterImporter(path=path, kind="dogs", batch_size=1, workers=2).run()
+
+        self.assertEqual((stats.imported, stats.rejected), (3, 2))
+
+    def test_parsing_in_spawned_processes(self) -> None:
+        path = self.write("dogs.csv", DOGS_CSV)
+
+        stats = ShelterImporter(
+            path=path, kind="dogs", workers=2, start_method="spawn"
+        ).run()
+
+        self.assertEqual((stats.imported, stats.rejected), (3, 2))
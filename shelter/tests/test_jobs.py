@@ -0,0 +1,265 @@
+import datetime
+import shutil
+import tempfile
+from concurrent.futures import Executor, Future
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from shelter.jobs import (
+    claim_jobs,
+    cron_matches,
+    enqueue,
+    enqueue_periodic,
+    fail_timed_out,
+    heartbeat,
+    next_run,
+    run_job,
+    task,
+    work,
+)
+from shelter.models import Breed, Dog, Job, Vaccination, Vaccine
+
+
+CALLS = []
+
+
+@task("tests.record")
+def record(value=None):
+    CALLS.append(value)
+    return {"value": value}
+
+
+@task("tests.fail")
+def fail():
+    raise RuntimeError("boom")
+
+
+class InlineExecutor(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def at(value: str) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.fromisoformat(value))
+
+
+class JobQueueTests(TestCase):
+    def setUp(self) -> None:
+        CALLS.clear()
+
+    def test_enqueue_rejects_unknown_tasks(self) -> None:
+        with self.assertRaises(ValueError):
+            enqueue("tests.missing")
+
+    def test_claims_due_jobs_by_priority_once(self) -> None:
+        low = enqueue("tests.record", value="low")
+        high = enqueue("tests.record", value="high", priority=10)
+        enqueue("tests.record", run_at=timezone.now() + datetime.timedelta(hours=1))
+
+        for skip_locked in (False, True):
+            with self.subTest(skip_locked=skip_locked):
+                Job.objects.update(status=Job.QUEUED, attempts=0)
+                with mock.patch.object(
+                    connection.features,
+                    "has_select_for_update_skip_locked",
+                    skip_locked,
+                ):
+                    self.assertEqual(claim_jobs(1, "a"), [high.pk])
+                    self.assertEqual(claim_jobs(5, "b"), [low.pk])
+                    self.assertEqual(claim_jobs(5, "c"), [])
+                claimed = Job.objects.get(pk=high.pk)
+                self.assertEqual((claimed.status, claimed.worker), (Job.RUNNING, "a"))
+                self.assertEqual(claimed.attempts, 1)
+
+    @override_settings(SHELTER_JOB_TIMEOUT=60)
+    def test_takes_over_jobs_of_dead_workers(self) -> None:
+        job = enqueue("tests.record")
+        claim_jobs(1, "dead")
+        Job.objects.update(claimed_at=timezone.now() - datetime.timedelta(minutes=2))
+
+        self.assertEqual(claim_jobs(1, "alive"), [job.pk])
+        self.assertEqual(Job.objects.get().attempts, 2)
+
+    @override_settings(SHELTER_JOB_TIMEOUT=60)
+    def test_heartbeats_keep_long_jobs_claimed(self) -> None:
+        job = enqueue("tests.record")
+        claim_jobs(1, "busy")
+        Job.objects.update(claimed_at=timezone.now() - datetime.timedelta(minutes=2))
+
+        self.assertEqual(heartbeat([job.pk], "other"), 0)
+        self.assertEqual(heartbeat([job.pk], "busy"), 1)
+        self.assertEqual(claim_jobs(1, "alive"), [])
+        self.assertEqual(run_job(job.pk), Job.DONE)
+
+    @override_settings(SHELTER_JOB_TIMEOUT=60)
+    def test_timed_out_jobs_without_attempts_left_fail(self) -> None:
+        job = enqueue("tests.record", max_attempts=1)
+        claim_jobs(1, "dead")
+        Job.objects.update(claimed_at=timezone.now() - datetime.timedelta(minutes=2))
+
+        self.assertEqual(claim_jobs(1, "alive"), [])
+        self.assertEqual(fail_timed_out(timezone.now()), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(CALLS, [])
+
+    def test_run_job_records_the_result(self) -> None:
+        job = enqueue("tests.record", value=3)
+        claim_jobs(1, "worker")
+
+        self.assertEqual(run_job(job.pk), Job.DONE)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {"value": 3})
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(CALLS, [3])
+
+    @override_settings(SHELTER_JOB_RETRY_DELAY=10, SHELTER_JOB_MAX_RETRY_DELAY=15)
+    def test_failed_jobs_back_off_until_out_of_attempts(self) -> None:
+        job = enqueue("tests.fail", max_attempts=3)
+        delays = []
+        for attempt in range(3):
+            Job.objects.update(run_at=timezone.now())
+            claim_jobs(1, "worker")
+            started = timezone.now()
+            with self.assertLogs("shelter.jobs", "ERROR"):
+                status = run_job(job.pk)
+            job.refresh_from_db()
+            if status == Job.QUEUED:
+                delays.append(round((job.run_at - started).total_seconds()))
+
+        self.assertEqual(delays, [10, 15])
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("RuntimeError: boom", job.error)
+
+    def test_work_runs_due_jobs(self) -> None:
+        for value in range(3):
+            enqueue("tests.record", value=value)
+
+        self.assertEqual(work(InlineExecutor(), concurrency=2, once=True), 3)
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+
+class PeriodicJobTests(TestCase):
+    def test_cron_matches(self) -> None:
+        self.assertTrue(cron_matches("*/15 3 * * *", at("2023-07-03T03:45")))
+        self.assertFalse(cron_matches("*/15 3 * * *", at("2023-07-03T03:46")))
+        # 2023-07-02 is a Sunday; 0 and 7 both mean Sunday.
+        self.assertTrue(cron_matches("0 9 * * 7", at("2023-07-02T09:00")))
+        self.assertTrue(cron_matches("0 9 * * 1-5", at("2023-07-03T09:00")))
+        # Day of month or day of week.
+        self.assertTrue(cron_matches("0 0 1 * 1", at("2023-07-03T00:00")))
+        with self.assertRaises(ValueError):
+            cron_matches("61 * * * *", at("2023-07-03T00:00"))
+
+    def test_next_run(self) -> None:
+        self.assertEqual(
+            next_run("30 3 * * *", at("2023-07-03T03:30")), at("2023-07-04T03:30")
+        )
+
+    @override_settings(
+        SHELTER_PERIODIC_JOBS={
+            "record": {"task": "tests.record", "cron": "*/5 * * * *", "priority": 5}
+        }
+    )
+    def test_enqueues_each_due_minute_once(self) -> None:
+        self.assertEqual(
+            enqueue_periodic(at("2023-07-03T10:01"), at("2023-07-03T10:12")), 2
+        )
+        # Another worker looking at the same minutes.
+        self.assertEqual(
+            enqueue_periodic(at("2023-07-03T10:00"), at("2023-07-03T10:12")), 0
+        )
+        self.assertEqual(
+            list(Job.objects.order_by("run_at").values_list("unique_key", "priority")),
+            [("record@2023-07-03T10:05", 5), ("record@2023-07-03T10:10", 5)],
+        )
+
+
+class JobViewTests(TestCase):
+    def setUp(self) -> None:
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = get_user_model().objects.create_user("keeper", "password1")
+        self.client.force_login(self.user)
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dogs = [
+            Dog.objects.create(
+                name=name, date_registered="2023-06-20", gender="male", breed=breed
+            )
+            for name in ("Brovko", "Sirko")
+        ]
+
+    def test_export_is_queued_and_downloaded(self) -> None:
+        response = self.client.post(
+            reverse("shelter:dog-export") + "?format=csv&name=brovko",
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], Job.QUEUED)
+
+        work(InlineExecutor(), concurrency=1, once=True)
+        status = self.client.get(
+            response["Location"], HTTP_ACCEPT="application/json"
+        ).json()
+        self.assertEqual(status["status"], Job.DONE)
+
+        download = self.client.get(status["download"])
+        self.assertEqual(download["Content-Type"], "text/csv")
+        content = b"".join(download.streaming_content).decode()
+        self.assertIn("Brovko", content)
+        self.assertNotIn("Sirko", content)
+
+        other = get_user_model().objects.create_user("other", "password1")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(status["download"]).status_code, 404)
+
+    def test_bulk_vaccination_is_queued(self) -> None:
+        vaccine = Vaccine.objects.create(name="Rabies")
+        data = {
+            "dogs": [dog.pk for dog in self.dogs],
+            "vaccine": vaccine.pk,
+            "vaccination_date": "2023-07-01",
+        }
+        url = reverse("shelter:vaccination-bulk-create")
+        self.assertEqual(self.client.post(url, data).status_code, 403)
+
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="add_vaccination")
+        )
+        response = self.client.post(url, data, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Vaccination.objects.exists())
+
+        self.client.post(url, data, HTTP_ACCEPT="application/json")
+        work(InlineExecutor(), concurrency=2, once=True)
+        self.assertEqual(Vaccination.objects.count(), 2)
+        self.assertEqual(
+            Job.objects.filter(task="shelter.vaccinate_dogs")
+            .order_by("id")
+            .values_list("result", flat=True)[1],
+            {"created": 0},
+        )
+
+    def test_status_page(self) -> None:
+        enqueue("tests.record", value=1)
+        enqueue("tests.fail")
+        self.assertEqual(self.client.get(reverse("shelter:job-list")).status_code, 403)
+
+        self.user.user_permissions.add(Permission.objects.get(codename="view_job"))
+        response = self.client.get(reverse("shelter:job-list"))
+        self.assertContains(response, "queued: 2")
+        self.assertContains(response, "shelter.rebuild_counters")
+        self.assertContains(response, "tests.fail")
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from shelter.models import Breed, Dog
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@override_settings(SHELTER_METRICS_ENABLED=True, SHELTER_METRICS_TOKEN="secret")
+class MetricsTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        Dog.objects.create(
+            name="Rex", breed=self.breed, gender="male", date_registered="2023-06-01"
+        )
+
+    def test_requests_are_measured_per_url_name(self) -> None:
+        labels = {"view": "shelter:breed-list", "method": "GET"}
+        requests = sample("shelter_requests_total", status="200", **labels)
+        latency = sample("shelter_request_duration_seconds_count", **labels)
+        queries = sample("shelter_db_queries_per_request_sum", view=labels["view"])
+
+        self.client.get(reverse("shelter:breed-list"))
+
+        self.assertEqual(
+            sample("shelter_requests_total", status="200", **labels), requests + 1
+        )
+        self.assertEqual(
+            sample("shelter_request_duration_seconds_count", **labels), latency + 1
+        )
+        self.assertGreater(
+            sample("shelter_db_queries_per_request_sum", view=labels["view"]), queries
+        )
+
+    def test_endpoint_exposes_domain_gauges(self) -> None:
+        get_user_model().objects.create_user(username="keeper", password="x")
+
+        response = self.client.get(
+            reverse("shelter:metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("shelter_dogs 1.0", body)
+        self.assertIn("shelter_breeds 1.0", body)
+        self.assertIn("shelter_caretakers 1.0", body)
+        self.assertIn("shelter_vaccinations 0.0", body)
+        self.assertIn("# TYPE shelter_request_duration_seconds histogram", body)
+
+    def test_token_is_required(self) -> None:
+        url = reverse("shelter:metrics")
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SHELTER_METRICS_TOKEN="")
+    def test_endpoint_is_closed_without_a_token(self) -> None:
+        self.assertEqual(self.client.get(reverse("shelter:metrics")).status_code, 403)
+
+    @override_settings(SHELTER_RESPONSE_CACHE_ENABLED=True)
+    def test_response_cache_hits_and_misses_are_counted(self) -> None:
+        cache.clear()
+        misses = sample("shelter_response_cache_total", result="miss")
+        hits = sample("shelter_response_cache_total", result="hit")
+
+        self.client.get(reverse("shelter:breed-list"))
+        self.client.get(reverse("shelter:breed-list"))
+
+        self.assertEqual(
+            sample("shelter_response_cache_total", result="miss"), misses + 1
+        )
+        self.assertEqual(sample("shelter_response_cache_total", result="hit"), hits + 1)
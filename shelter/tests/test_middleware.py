@@ -0,0 +1,94 @@
+import json
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from shelter.middleware import PerformanceMiddleware
+from shelter.models import Breed, Dog
+from shelter.profiling import fingerprint
+
+
+@override_settings(
+    SHELTER_PERF_ENABLED=True,
+    SHELTER_PERF_SAMPLE_RATE=1.0,
+    SHELTER_PERF_N_PLUS_ONE_THRESHOLD=3,
+    SHELTER_PERF_SERVER_TIMING=True,
+)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+
+    def test_server_timing_and_log_line(self) -> None:
+        with self.assertLogs("shelter.performance", "INFO") as logs:
+            response = self.client.get(reverse("shelter:breed-list"))
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "shelter:breed-list")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["db_queries"], 0)
+        self.assertGreater(record["template_ms"], 0)
+        self.assertNotIn("n_plus_one", record)
+
+    def test_repeated_query_shapes_are_flagged(self) -> None:
+        def view(request):
+            for number in range(5):
+                Dog.objects.filter(pk=number).exists()
+            return HttpResponse()
+
+        middleware = PerformanceMiddleware(view)
+
+        with self.assertLogs("shelter.performance", "WARNING") as logs:
+            middleware(RequestFactory().get("/"))
+
+        record = logs.records[0].performance
+        self.assertEqual(record["db_queries"], 5)
+        self.assertEqual(len(record["n_plus_one"]), 1)
+        self.assertEqual(record["n_plus_one"][0]["count"], 5)
+
+    async def test_async_views_are_profiled_on_the_event_loop(self) -> None:
+        async def view(request):
+            # The ORM runs these in sync_to_async threads.
+            for number in range(5):
+                await Dog.objects.filter(pk=number).aexists()
+            return HttpResponse()
+
+        middleware = PerformanceMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        with self.assertLogs("shelter.performance", "WARNING") as logs:
+            response = await middleware(RequestFactory().get("/"))
+
+        self.assertTrue(response.has_header("Server-Timing"))
+        self.assertEqual(logs.records[0].performance["db_queries"], 5)
+
+    @override_settings(SHELTER_PERF_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_pass_through(self) -> None:
+        response = self.client.get(reverse("shelter:breed-list"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class FingerprintTests(TestCase):
+    def test_literals_and_lists_collapse(self) -> None:
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM dog  WHERE name = 'Rex' AND id IN (%s, %s, %s) LIMIT 21"
+            ),
+            "SELECT * FROM dog WHERE name = ? AND id IN (...) LIMIT ?",
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+            fingerprint("INSERT INTO t (a, b) VALUES (%s, %s)"),
+        )
+        self.assertEqual(
+            fingerprint(
+                'SELECT CASE WHEN "id" = %s THEN %s WHEN "id" = %s THEN %s END'
+            ),
+            'SELECT CASE WHEN "id" = ? THEN ? END',
+        )
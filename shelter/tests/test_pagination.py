@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from shelter.models import Breed, Dog
+from shelter.pagination import CursorPaginator, decode_cursor, encode_cursor
+
+
+DOG_LIST_URL = reverse("shelter:dog-list")
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        for dog_id in range(25):
+            Dog.objects.create(
+                name=f"Dog {dog_id}" if dog_id % 2 else f"Puppy {dog_id}",
+                date_registered=f"2023-06-{dog_id % 5 + 1:02d}",
+                gender="male",
+                breed=self.breed,
+            )
+        self.ordered = list(Dog.objects.order_by("date_registered", "id"))
+
+    def test_cursor_round_trip(self) -> None:
+        token = encode_cursor("n", ["2023-06-01", 7])
+
+        self.assertEqual(decode_cursor(token, 2), ("n", ["2023-06-01", 7]))
+
+    def test_pages_walk_forward_and_back(self) -> None:
+        first = self.client.get(DOG_LIST_URL)
+        page = first.context["page_obj"]
+        self.assertEqual(list(first.context["dog_list"]), self.ordered[:10])
+        self.assertFalse(page.has_previous())
+
+        second = self.client.get(DOG_LIST_URL, {"cursor": page.next_cursor})
+        self.assertEqual(list(second.context["dog_list"]), self.ordered[10:20])
+
+        third = self.client.get(
+            DOG_LIST_URL, {"cursor": second.context["page_obj"].next_cursor}
+        )
+        self.assertEqual(list(third.context["dog_list"]), self.ordered[20:])
+        self.assertFalse(third.context["page_obj"].has_next())
+
+        back = self.client.get(
+            DOG_LIST_URL, {"cursor": third.context["page_obj"].previous_cursor}
+        )
+        self.assertEqual(list(back.context["dog_list"]), self.ordered[10:20])
+        self.assertTrue(back.context["page_obj"].has_previous())
+
+    def test_cursor_pages_keep_name_filter(self) -> None:
+        puppies = [dog for dog in self.ordered if dog.name.startswith("Puppy")]
+        first = self.client.get(DOG_LIST_URL, {"name": "puppy"})
+        next_cursor = first.context["page_obj"].next_cursor
+
+        self.assertContains(first, f"name=puppy&amp;cursor={next_cursor}")
+        second = self.client.get(DOG_LIST_URL, {"name": "puppy", "cursor": next_cursor})
+        found = list(first.context["dog_list"]) + list(second.context["dog_list"])
+        self.assertEqual(len(found), len(puppies))
+        self.assertEqual(set(found), set(puppies))
+
+    def test_cursor_page_runs_no_count_query(self) -> None:
+        page = CursorPaginator(Dog.objects.all(), 10, ("date_registered", "id")).page()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(page.has_next())
+
+    def test_invalid_cursor_returns_404(self) -> None:
+        response = self.client.get(DOG_LIST_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_values_are_rejected(self) -> None:
+        caretaker = get_user_model().objects.create_user("keeper", "password1")
+        self.client.force_login(caretaker)
+        for cursor in (
+            encode_cursor("n", ["zzz", 1]),
+            encode_cursor("n", ["2023-06-01", "one"]),
+            encode_cursor("p", [None, 1]),
+            encode_cursor("n", [["2023-06-01"], 1]),
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(
+                    self.client.get(DOG_LIST_URL, {"cursor": cursor}).status_code, 404
+                )
+                response = self.client.get(
+                    reverse("shelter:api-dog-list"), {"cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 400)
+                response = self.client.get(
+                    caretaker.get_absolute_url(), {"cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 404)
+
+    def test_page_parameter_keeps_offset_pagination(self) -> None:
+        response = self.client.get(DOG_LIST_URL, {"page": 3})
+
+        self.assertEqual(list(response.context["dog_list"]), self.ordered[20:])
+        self.assertEqual(response.context["paginator"].num_pages, 3)
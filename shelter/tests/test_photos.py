@@ -0,0 +1,233 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files import locks
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from shelter.models import Breed, Dog, DogPhoto
+from shelter.photos import parse_range, render_variants
+from shelter.tasks import purge_photo_uploads
+
+
+def image_bytes(width: int, height: int, color: str = "red") -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(output, "JPEG")
+    return output.getvalue()
+
+
+class PhotoTests(TestCase):
+    def setUp(self) -> None:
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(
+            MEDIA_ROOT=media_root,
+            SHELTER_PHOTO_UPLOAD_DIR=os.path.join(media_root, "uploads"),
+            SHELTER_PHOTO_WIDTHS=[320, 800, 1600],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=breed
+        )
+        self.client.force_login(
+            get_user_model().objects.create_user("keeper", "password1")
+        )
+        self.image = image_bytes(1000, 500)
+        self.content_hash = hashlib.sha256(self.image).hexdigest()
+
+    def upload(self, content: bytes, name: str = "brovko.jpg"):
+        return self.client.post(
+            reverse("shelter:dog-photo-upload", args=[self.dog.pk]),
+            {"photo": SimpleUploadedFile(name, content, "image/jpeg")},
+            HTTP_ACCEPT="application/json",
+        )
+
+    def process(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "process_photos", "--once", "--workers", "1", stdout=StringIO()
+            )
+
+    def test_upload_is_stored_under_its_hash_once(self) -> None:
+        response = self.upload(self.image)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["photos"][0]["status"], DogPhoto.PENDING)
+
+        photo = DogPhoto.objects.get()
+        name = f"photos/{self.content_hash[:2]}/{self.content_hash}.jpg"
+        self.assertEqual(photo.original, name)
+        self.assertEqual((photo.width, photo.height), (1000, 500))
+        self.assertTrue(default_storage.exists(name))
+
+        self.assertEqual(self.upload(self.image, "again.jpg").status_code, 200)
+        self.assertEqual(DogPhoto.objects.count(), 1)
+
+    def test_rejects_files_that_are_not_images(self) -> None:
+        response = self.upload(b"not an image")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DogPhoto.objects.exists())
+
+    def test_worker_renders_variants_and_sets_the_cover(self) -> None:
+        self.upload(self.image)
+        self.process()
+
+        photo = DogPhoto.objects.get()
+        self.assertEqual(photo.status, DogPhoto.READY)
+        # Never upscaled past the 1000px original.
+        self.assertEqual(sorted(photo.variants, key=int), ["320", "800", "1000"])
+        self.assertEqual(photo.variants["320"]["height"], 160)
+        for variant in photo.variants.values():
+            for fmt in DogPhoto.FORMATS:
+                self.assertTrue(default_storage.exists(variant[fmt]))
+        self.assertEqual(Dog.objects.get().cover_photo, photo)
+
+        srcset = photo.srcset
+        self.assertIn(".800.webp 800w", srcset["webp"])
+        self.assertIn(".1000.jpg 1000w", srcset["jpeg"])
+        self.assertContains(
+            self.client.get(self.dog.get_absolute_url()), srcset["webp"]
+        )
+
+        dog_list = self.client.get(reverse("shelter:dog-list")).content.decode()
+        self.assertIn(photo.thumbnail["webp"], dog_list)
+        self.assertNotIn(".800.", dog_list)
+        self.assertNotIn(photo.original, dog_list)
+
+    def test_deleting_the_cover_moves_it_and_removes_unused_files(self) -> None:
+        self.upload(self.image)
+        self.upload(image_bytes(400, 400, "blue"), "second.jpg")
+        self.process()
+        first, second = DogPhoto.objects.all()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertEqual(Dog.objects.get().cover_photo, second)
+        self.assertFalse(default_storage.exists(first.original))
+        self.assertFalse(default_storage.exists(first.variants["320"]["webp"]))
+        self.assertTrue(default_storage.exists(second.original))
+
+    def test_chunked_upload_resumes_from_the_received_length(self) -> None:
+        url = reverse("shelter:dog-photo-chunk", args=[self.dog.pk, uuid.uuid4()])
+        total = len(self.image)
+        middle = total // 2
+
+        def put(start: int, end: int):
+            return self.client.put(
+                url,
+                self.image[start : end + 1],
+                content_type="application/octet-stream",
+                HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{total}",
+            )
+
+        response = put(0, middle - 1)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {"received": middle})
+
+        response = put(middle + 10, total - 1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["received"], middle)
+
+        # The same upload id of another user is another upload.
+        self.client.force_login(
+            get_user_model().objects.create_user("other", "password1")
+        )
+        response = put(middle, total - 1)
+        self.assertEqual((response.status_code, response.json()["received"]), (409, 0))
+        self.client.force_login(get_user_model().objects.get(username="keeper"))
+
+        response = put(middle, total - 1)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["hash"], self.content_hash)
+        self.assertEqual(
+            os.listdir(os.path.join(default_storage.location, "uploads")), []
+        )
+
+    def test_chunks_of_an_upload_are_stored_one_at_a_time(self) -> None:
+        upload_id = uuid.uuid4()
+        keeper = get_user_model().objects.get(username="keeper")
+        uploads = os.path.join(default_storage.location, "uploads")
+        os.makedirs(uploads)
+        path = os.path.join(uploads, f"{keeper.pk}-{self.dog.pk}-{upload_id}.part")
+
+        with open(path, "ab") as part:
+            locks.lock(part, locks.LOCK_EX)
+            response = self.client.put(
+                reverse("shelter:dog-photo-chunk", args=[self.dog.pk, upload_id]),
+                self.image,
+                content_type="application/octet-stream",
+                HTTP_CONTENT_RANGE=f"bytes 0-{len(self.image) - 1}/{len(self.image)}",
+            )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(os.path.getsize(path), 0)
+
+    def test_stale_upload_parts_are_purged(self) -> None:
+        uploads = os.path.join(default_storage.location, "uploads")
+        os.makedirs(uploads)
+        for name, age in (("old.part", 2 * 86400), ("new.part", 60)):
+            path = os.path.join(uploads, name)
+            open(path, "wb").close()
+            os.utime(path, (time.time() - age, time.time() - age))
+
+        self.assertEqual(purge_photo_uploads(), {"deleted": 1})
+        self.assertEqual(os.listdir(uploads), ["new.part"])
+
+    def test_serves_photos_with_ranges_and_long_lived_caching(self) -> None:
+        self.upload(self.image)
+        url = default_storage.url(DogPhoto.objects.get().original)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.image)
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        response = self.client.get(url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.image[10:20])
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.image)}")
+
+        response = self.client.get(url, HTTP_RANGE=f"bytes={len(self.image)}-")
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(
+            self.client.get("/media/photos/../settings.py").status_code, 404
+        )
+
+    def test_parse_range(self) -> None:
+        self.assertIsNone(parse_range(None, 100))
+        self.assertEqual(parse_range("bytes=0-", 100), (0, 99))
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=50-500", 100), (50, 99))
+        with self.assertRaises(ValueError):
+            parse_range("bytes=100-", 100)
+
+    def test_render_variants_keeps_small_photos_at_their_size(self) -> None:
+        path = os.path.join(default_storage.location, "small.jpg")
+        with open(path, "wb") as file:
+            file.write(image_bytes(200, 100))
+
+        result = render_variants(path, "ab" * 32, [320, 800])
+        self.assertEqual(list(result["variants"]), ["200"])
+        self.assertEqual(len(result["files"]), 2)
@@ -0,0 +1,81 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shelter.models import Breed, QueryProfile
+from shelter.query_profiles import store
+from shelter.signals import flush_query_profiles
+
+
+@override_settings(
+    SHELTER_PERF_ENABLED=False,
+    SHELTER_QUERY_PROFILE_ENABLED=True,
+    SHELTER_QUERY_PROFILE_FLUSH_INTERVAL=3600,
+)
+class QueryProfileTests(TestCase):
+    def setUp(self) -> None:
+        store.take()
+        Breed.objects.create(name="Pekiness", dog_size="small")
+
+    def test_queries_are_aggregated_per_url_name(self) -> None:
+        self.client.get(reverse("shelter:breed-list"))
+        self.client.get(reverse("shelter:breed-list") + "?cursor=")
+        self.assertFalse(QueryProfile.objects.exists())
+
+        store.flush()
+
+        profile = QueryProfile.objects.get(
+            view_name="shelter:breed-list", fingerprint__contains="shelter_breed"
+        )
+        self.assertEqual(profile.count, 2)
+        self.assertGreater(profile.total_ms, 0)
+        self.assertGreaterEqual(profile.total_ms, profile.max_ms)
+
+        self.client.get(reverse("shelter:breed-list"))
+        store.flush()
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.count, 3)
+
+    @override_settings(SHELTER_QUERY_PROFILE_FLUSH_INTERVAL=0)
+    def test_flushes_periodically_after_the_response(self) -> None:
+        with mock.patch.object(store, "flush_if_due"):
+            self.client.get(reverse("shelter:breed-list"))
+        # Recording a request never writes; it only marks the store as due.
+        self.assertFalse(QueryProfile.objects.exists())
+
+        flush_query_profiles(sender=None)
+
+        self.assertTrue(
+            QueryProfile.objects.filter(view_name="shelter:breed-list").exists()
+        )
+        self.assertEqual(store.flush_if_due(), 0)
+
+    def test_keeps_no_parameter_values(self) -> None:
+        user = get_user_model().objects.create_user("pekiness-keeper")
+        self.client.force_login(user)
+        session_key = self.client.session.session_key
+
+        self.client.get(reverse("shelter:breed-list"))
+        store.flush()
+
+        samples = QueryProfile.objects.values_list("sample_sql", flat=True)
+        self.assertTrue(any("django_session" in sql for sql in samples))
+        for sql in samples:
+            self.assertNotIn(session_key, sql)
+            self.assertNotIn(user.username, sql)
+
+    def test_query_report_explains_samples(self) -> None:
+        self.client.get(reverse("shelter:breed-list"))
+        output = StringIO()
+
+        call_command(
+            "query_report", "--view", "shelter:breed-list", "--explain", stdout=output
+        )
+
+        self.assertIn("1. shelter:breed-list", output.getvalue())
+        self.assertIn("| ", output.getvalue())
@@ -0,0 +1,121 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from shelter import rollups
+from shelter.caretaking import assign_caretakers
+from shelter.models import Breed, Dog, IntakeRollup
+from shelter.signals import bulk_created
+
+
+JUNE = datetime.date(2023, 6, 1)
+JULY = datetime.date(2023, 7, 1)
+
+
+class IntakeRollupTests(TestCase):
+    def setUp(self) -> None:
+        self.small = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.giant = Breed.objects.create(name="Alabai", dog_size="giant")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=self.small
+        )
+
+    def assertRollups(self, *expected) -> None:
+        self.assertEqual(
+            list(
+                IntakeRollup.objects.values_list(
+                    "month", "breed", "dog_size", "gender", "dogs", "with_caretakers"
+                )
+            ),
+            list(expected),
+        )
+
+    def test_rollups_follow_dog_writes(self) -> None:
+        Dog.objects.create(
+            name="Sirko", date_registered="2023-06-02", gender="male", breed=self.small
+        )
+        self.assertRollups((JUNE, self.small.pk, "small", "male", 2, 0))
+
+        self.dog.date_registered = "2023-07-01"
+        self.dog.breed = self.giant
+        self.dog.save()
+        self.assertRollups(
+            (JUNE, self.small.pk, "small", "male", 1, 0),
+            (JULY, self.giant.pk, "giant", "male", 1, 0),
+        )
+
+        self.dog.delete()
+        self.assertRollups((JUNE, self.small.pk, "small", "male", 1, 0))
+
+    def test_rollups_follow_caretakers_and_breed_size(self) -> None:
+        keeper = get_user_model().objects.create_user("keeper", "password1")
+        self.dog.caretakers.add(keeper)
+        self.assertRollups((JUNE, self.small.pk, "small", "male", 1, 1))
+
+        keeper.dogs.clear()
+        self.assertRollups((JUNE, self.small.pk, "small", "male", 1, 0))
+
+        assign_caretakers([self.dog.pk], [keeper.pk])
+        self.assertRollups((JUNE, self.small.pk, "small", "male", 1, 1))
+
+        self.small.dog_size = "medium"
+        self.small.save()
+        keeper.delete()
+        self.assertRollups((JUNE, self.small.pk, "medium", "male", 1, 0))
+
+    def test_bulk_created_dogs_are_counted(self) -> None:
+        created = Dog.objects.bulk_create(
+            Dog(
+                name=f"Dog {n}", date_registered=JULY, gender="female", breed=self.giant
+            )
+            for n in range(3)
+        )
+        bulk_created.send(sender=Dog, instances=created)
+
+        self.assertRollups(
+            (JUNE, self.small.pk, "small", "male", 1, 0),
+            (JULY, self.giant.pk, "giant", "female", 3, 0),
+        )
+
+    def test_rebuild_command(self) -> None:
+        IntakeRollup.objects.update(dogs=10)
+        IntakeRollup.objects.create(
+            month=JULY, breed=self.giant, dog_size="giant", gender="female", dogs=4
+        )
+
+        call_command("rebuild_intake_rollups", stdout=StringIO())
+
+        self.assertRollups((JUNE, self.small.pk, "small", "male", 1, 0))
+
+
+class DashboardViewTests(TestCase):
+    def test_dashboard_reads_the_rollups(self) -> None:
+        today = timezone.localdate()
+        last_month = rollups.month_start(today) - datetime.timedelta(days=1)
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        keeper = get_user_model().objects.create_user("keeper", "password1")
+        for day, gender in ((today, "male"), (today, "female"), (last_month, "male")):
+            dog = Dog.objects.create(
+                name="Brovko", date_registered=day, gender=gender, breed=breed
+            )
+        dog.caretakers.add(keeper)
+        # Outside the window.
+        Dog.objects.create(
+            name="Sirko", date_registered="2000-01-01", gender="male", breed=breed
+        )
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("shelter:dashboard") + "?months=2")
+        intake = response.context["intake"]
+        self.assertEqual(
+            [row["counts"] for row in intake["by_gender"]], [[0, 1], [1, 1]]
+        )
+        self.assertEqual([row["total"] for row in intake["by_size"]], [1, 2])
+        self.assertEqual(intake["breeds"], ["Pekiness"])
+        self.assertEqual([month["percent"] for month in intake["coverage"]], [100, 0])
+        self.assertContains(response, "Caretaker coverage")
@@ -0,0 +1,138 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from shelter import schedule
+from shelter.models import Breed, Dog, Vaccination, VaccinationDue, Vaccine
+
+
+class ScheduleTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=self.breed
+        )
+        self.rabies = Vaccine.objects.create(name="Rabies", booster_interval_days=365)
+        self.once = Vaccine.objects.create(name="Once")
+
+    def due(self) -> list:
+        return list(
+            VaccinationDue.objects.values_list(
+                "dog_id", "vaccine_id", "last_vaccinated", "next_due"
+            )
+        )
+
+    def test_saving_a_vaccination_schedules_the_booster(self) -> None:
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=self.rabies, vaccination_date="2023-06-20"
+        )
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=self.once, vaccination_date="2023-06-20"
+        )
+
+        self.assertEqual(
+            self.due(),
+            [
+                (
+                    self.dog.pk,
+                    self.rabies.pk,
+                    datetime.date(2023, 6, 20),
+                    datetime.date(2024, 6, 19),
+                )
+            ],
+        )
+
+    def test_latest_vaccination_wins_and_delete_falls_back(self) -> None:
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=self.rabies, vaccination_date="2023-01-10"
+        )
+        latest = Vaccination.objects.create(
+            dog=self.dog, vaccine=self.rabies, vaccination_date="2023-06-20"
+        )
+        self.assertEqual(self.due()[0][2], datetime.date(2023, 6, 20))
+
+        latest.delete()
+        self.assertEqual(self.due()[0][2], datetime.date(2023, 1, 10))
+
+        Vaccination.objects.all().delete()
+        self.assertEqual(self.due(), [])
+
+    def test_moving_a_vaccination_to_another_vaccine(self) -> None:
+        vaccination = Vaccination.objects.create(
+            dog=self.dog, vaccine=self.rabies, vaccination_date="2023-06-20"
+        )
+
+        vaccination.vaccine = self.once
+        vaccination.save()
+
+        self.assertEqual(self.due(), [])
+
+    def test_changing_the_interval_reschedules(self) -> None:
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=self.once, vaccination_date="2023-06-20"
+        )
+
+        self.once.booster_interval_days = 30
+        self.once.save()
+        self.assertEqual(self.due()[0][3], datetime.date(2023, 7, 20))
+
+        self.once.booster_interval_days = None
+        self.once.save()
+        self.assertEqual(self.due(), [])
+
+    def test_rebuild_command(self) -> None:
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=self.rabies, vaccination_date="2023-06-20"
+        )
+        expected = self.due()
+        VaccinationDue.objects.all().delete()
+
+        call_command("rebuild_vaccination_schedule", stdout=StringIO())
+
+        self.assertEqual(self.due(), expected)
+
+
+class VaccinationDueViewTests(TestCase):
+    url = reverse("shelter:vaccination-due")
+
+    def setUp(self) -> None:
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        vaccine = Vaccine.objects.create(name="Rabies", booster_interval_days=365)
+        today = timezone.localdate()
+        for name, days_ago in [("Overdue", 400), ("Soon", 350), ("Later", 100)]:
+            dog = Dog.objects.create(
+                name=name, date_registered="2023-06-20", gender="male", breed=breed
+            )
+            Vaccination.objects.create(
+                dog=dog,
+                vaccine=vaccine,
+                vaccination_date=today - datetime.timedelta(days=days_ago),
+            )
+        self.user = get_user_model().objects.create_user("test", "password1234@")
+
+    def test_login_required(self) -> None:
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_lists_overdue_then_upcoming(self) -> None:
+        self.client.force_login(self.user)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+
+        names = [due.dog.name for due in response.context["due_list"]]
+        self.assertEqual(names, ["Overdue", "Soon"])
+        self.assertContains(response, "(overdue)", count=1)
+
+    def test_dashboard_uses_the_next_due_index(self) -> None:
+        plan = str(
+            schedule.dashboard(timezone.localdate(), 30)
+            .order_by("next_due", "id")
+            .explain()
+        )
+
+        self.assertIn("vaccination_next_due", plan)
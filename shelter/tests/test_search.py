@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shelter.models import Breed, Dog
+from shelter.search import normalize, search, search_ids
+
+
+class SearchTests(TestCase):
+    def setUp(self) -> None:
+        self.breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.husky = Breed.objects.create(name="Husky", dog_size="large")
+        self.brovko = Dog.objects.create(
+            name="Бровко", date_registered="2023-06-20", gender="male", breed=self.breed
+        )
+        self.fluffy = Dog.objects.create(
+            name="Fluffy",
+            date_registered="2023-06-21",
+            gender="female",
+            breed=self.husky,
+        )
+
+    def test_normalize_folds_cyrillic_and_latin(self) -> None:
+        self.assertEqual(normalize(" БРОВКО "), "бровко")
+        self.assertEqual(normalize("FLUFFY"), "fluffy")
+
+    def test_cyrillic_search_is_case_insensitive(self) -> None:
+        self.assertEqual(search_ids(Dog, "бРОВ"), [self.brovko.pk])
+
+    def test_short_terms_match_substrings(self) -> None:
+        self.assertEqual(search_ids(Dog, "uf"), [self.fluffy.pk])
+
+    def test_exact_match_ranks_first(self) -> None:
+        fluffington = Dog.objects.create(
+            name="Fluffington the Second",
+            date_registered="2023-06-22",
+            gender="male",
+            breed=self.breed,
+        )
+
+        self.assertEqual(search_ids(Dog, "fluffy"), [self.fluffy.pk])
+        ranked = list(search(Dog.objects.all(), "fluff").order_by("search_rank"))
+        self.assertEqual(ranked, [self.fluffy, fluffington])
+
+    def test_index_follows_rename_and_delete(self) -> None:
+        self.fluffy.name = "Sirko"
+        self.fluffy.save()
+
+        self.assertEqual(search_ids(Dog, "fluffy"), [])
+        self.assertEqual(search_ids(Dog, "sirko"), [self.fluffy.pk])
+
+        self.fluffy.delete()
+        self.assertEqual(search_ids(Dog, "sirko"), [])
+
+    def test_caretakers_are_searched_by_username_and_name(self) -> None:
+        caretaker = get_user_model().objects.create_user(
+            username="volunteer7", first_name="Оксана", password="Password1234@"
+        )
+
+        self.assertEqual(search_ids(get_user_model(), "оксана"), [caretaker.pk])
+        self.assertEqual(search_ids(get_user_model(), "VOLUNTEER"), [caretaker.pk])
+
+    def test_dog_list_routes_search_through_index(self) -> None:
+        response = self.client.get(reverse("shelter:dog-list"), {"name": "БРОВКО"})
+
+        self.assertEqual(list(response.context["dog_list"]), [self.brovko])
+
+    def test_dog_admin_searches_names_and_breeds(self) -> None:
+        admin = get_user_model().objects.create_superuser(
+            username="admin", password="Password1234@"
+        )
+        self.client.force_login(admin)
+        url = reverse("admin:shelter_dog_changelist")
+
+        response = self.client.get(url, {"q": "husk"})
+
+        self.assertEqual(list(response.context["cl"].result_list), [self.fluffy])
+
+    @override_settings(SHELTER_SEARCH_LIMIT=2)
+    def test_lists_and_admin_get_every_match(self) -> None:
+        for number in range(3):
+            Dog.objects.create(
+                name=f"Fluffy {number}",
+                date_registered="2023-06-22",
+                gender="male",
+                breed=self.breed,
+            )
+
+        self.assertEqual(len(search_ids(Dog, "fluffy")), 2)
+        self.assertEqual(search(Dog.objects.all(), "fluffy").count(), 4)
+        response = self.client.get(reverse("shelter:dog-list"), {"name": "fluffy"})
+        self.assertEqual(len(response.context["dog_list"]), 4)
+
+        admin = get_user_model().objects.create_superuser(
+            username="admin", password="Password1234@"
+        )
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("admin:shelter_dog_changelist"), {"q": "fluffy"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 4)
@@ -0,0 +1,104 @@
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shelter.benchmarks.concurrency import summarize
+from shelter.models import Breed, Dog
+from shelter.sqlite_backend.base import DatabaseWrapper
+from shelter.transactions import immediate_atomic, supports_immediate
+
+
+def begins(queries: CaptureQueriesContext) -> list:
+    return [query["sql"] for query in queries if query["sql"].startswith("BEGIN")]
+
+
+@skipUnless(supports_immediate(), "needs the shelter SQLite backend")
+class SQLiteProfileTests(TestCase):
+    def pragma(self, cursor, name: str):
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+    def test_new_connections_are_tuned(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), "shelter.sqlite3")
+        wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": path})
+        try:
+            with wrapper.cursor() as cursor:
+                self.assertEqual(self.pragma(cursor, "journal_mode"), "wal")
+                self.assertEqual(self.pragma(cursor, "synchronous"), 1)
+                self.assertEqual(self.pragma(cursor, "cache_size"), -64000)
+                self.assertEqual(self.pragma(cursor, "busy_timeout"), 5000)
+                self.assertEqual(self.pragma(cursor, "temp_store"), 2)
+        finally:
+            wrapper.close()
+
+
+@skipUnless(supports_immediate(), "needs the shelter SQLite backend")
+class ImmediateTransactionTests(TransactionTestCase):
+    def setUp(self) -> None:
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=breed
+        )
+        self.user = get_user_model().objects.create_user("keeper", "password1234@")
+
+    def test_immediate_atomic_takes_the_write_lock_up_front(self) -> None:
+        with CaptureQueriesContext(connection) as queries:
+            with immediate_atomic():
+                with immediate_atomic():
+                    pass
+            with transaction.atomic():
+                pass
+
+        self.assertEqual(begins(queries), ["BEGIN IMMEDIATE", "BEGIN"])
+
+    def test_write_views_run_in_one_immediate_transaction(self) -> None:
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(
+                reverse("shelter:dog-detail", args=[self.dog.pk]), {"action": "add"}
+            )
+            self.client.get(reverse("shelter:dog-detail", args=[self.dog.pk]))
+
+        self.assertEqual(begins(queries), ["BEGIN IMMEDIATE"])
+        self.assertTrue(self.dog.caretakers.filter(pk=self.user.pk).exists())
+
+    def test_failed_write_rolls_back(self) -> None:
+        with self.assertRaises(ValueError):
+            with immediate_atomic():
+                Breed.objects.create(name="Alabai", dog_size="giant")
+                raise ValueError
+
+        self.assertFalse(Breed.objects.filter(name="Alabai").exists())
+
+
+class ConcurrencyBenchmarkTests(TestCase):
+    def test_summarize(self) -> None:
+        samples = [
+            {"read": {"timings": [1.0, 3.0], "errors": 0}},
+            {
+                "read": {"timings": [2.0], "errors": 1},
+                "write": {"timings": [5.0], "errors": 2},
+            },
+        ]
+
+        summary = summarize(samples, duration=2)
+
+        self.assertEqual(
+            summary["read"],
+            {
+                "requests": 3,
+                "per_second": 1.5,
+                "p50_ms": 2.0,
+                "p95_ms": 3.0,
+                "errors": 1,
+            },
+        )
+        self.assertEqual(summary["write"]["errors"], 2)
+        self.assertEqual(summary["write"]["per_second"], 0.5)
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from shelter.models import Breed, Dog, Vaccination, Vaccine
+from shelter.timeline import vaccination_timeline
+
+
+class VaccinationTimelineTests(TestCase):
+    def setUp(self) -> None:
+        breed = Breed.objects.create(name="Pekiness", dog_size="small")
+        self.dog = Dog.objects.create(
+            name="Brovko", date_registered="2023-06-20", gender="male", breed=breed
+        )
+        self.rabies = Vaccine.objects.create(name="Rabies")
+        self.flue = Vaccine.objects.create(name="Flue")
+        for date in ["2023-09-01", "2023-07-01", "2023-08-01"]:
+            Vaccination.objects.create(
+                dog=self.dog, vaccine=self.rabies, vaccination_date=date
+            )
+        Vaccination.objects.create(
+            dog=self.dog, vaccine=self.flue, vaccination_date="2023-07-15"
+        )
+        self.url = reverse("shelter:dog-detail", kwargs={"pk": self.dog.pk})
+
+    def test_timeline_groups_by_vaccine_and_sorts_by_date(self) -> None:
+        with self.assertNumQueries(1):
+            timeline = vaccination_timeline(self.dog.pk)
+
+        self.assertEqual(
+            [history.vaccine for history in timeline], [self.flue, self.rabies]
+        )
+        self.assertEqual(
+            [str(v.vaccination_date) for v in timeline[1].vaccinations],
+            ["2023-07-01", "2023-08-01", "2023-09-01"],
+        )
+
+    def test_detail_query_count_does_not_grow_with_history(self) -> None:
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+        for day in range(1, 20):
+            Vaccination.objects.create(
+                dog=self.dog, vaccine=self.flue, vaccination_date=f"2023-10-{day:02d}"
+            )
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "Vaccinated at", count=23)
+
+    def test_caretaker_button_uses_prefetched_caretakers(self) -> None:
+        user = get_user_model().objects.create_user("test", password="password1234@")
+        self.dog.caretakers.add(user)
+        self.client.force_login(user)
+
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.context["is_caretaker"])
+        self.assertContains(response, "Delete me from caretakers")
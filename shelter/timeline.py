@@ -0,0 +1,35 @@
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable, List, NamedTuple
+
+from django.db.models.query import QuerySet
+
+from shelter.models import Vaccination, Vaccine
+
+
+class VaccineHistory(NamedTuple):
+    vaccine: Vaccine
+    vaccinations: List[Vaccination]
+
+
+def _timeline_queryset(dog_id: int) -> QuerySet:
+    return (
+        Vaccination.objects.filter(dog_id=dog_id)
+        .select_related("vaccine")
+        .order_by("vaccine__name", "vaccine_id", "vaccination_date", "id")
+    )
+
+
+def _group(vaccinations: Iterable[Vaccination]) -> List[VaccineHistory]:
+    return [
+        VaccineHistory(vaccine, list(group))
+        for vaccine, group in groupby(vaccinations, key=attrgetter("vaccine"))
+    ]
+
+
+def vaccination_timeline(dog_id: int) -> List[VaccineHistory]:
+    return _group(_timeline_queryset(dog_id))
+
+
+async def avaccination_timeline(dog_id: int) -> List[VaccineHistory]:
+    return _group([vaccination async for vaccination in _timeline_queryset(dog_id)])
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from shelter.db_router import SAFE_METHODS
+
+
+def supports_immediate(using: str = DEFAULT_DB_ALIAS) -> bool:
+    return hasattr(connections[using], "begin_immediate")
+
+
+@contextmanager
+def immediate_atomic(using: str = DEFAULT_DB_ALIAS):
+    """transaction.atomic() that takes SQLite's write lock when it begins.
+
+    Only the outermost block on shelter.sqlite_backend is affected; nested
+    blocks and other databases get a plain atomic().
+    """
+    connection = connections[using]
+    if connection.in_atomic_block or not supports_immediate(using):
+        with transaction.atomic(using=using):
+            yield
+        return
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            connection.begin_immediate = False
+            yield
+    finally:
+        connection.begin_immediate = False
+
+
+class WriteTransactionMixin:
+    """Run the unsafe requests of a view in one immediate transaction.
+
+    Requests that already run in a transaction are left alone.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method in SAFE_METHODS
+            or not supports_immediate()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        with immediate_atomic():
+            return super().dispatch(request, *args, **kwargs)
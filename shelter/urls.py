@@ -1,33 +1,65 @@
+from django.conf import settings
 from django.urls import path
 
+from shelter.api import (
+    BREEDS,
+    DOGS,
+    VACCINATIONS,
+    VACCINES,
+    ResourceDetailView,
+    ResourceListView,
+)
 from shelter.views import (
     BreedCreateView,
     BreedDeleteView,
     BreedDetailView,
     BreedListView,
     BreedUpdateView,
+    CaretakerAutocompleteView,
     CaretakerCreateView,
     CaretakerDeleteView,
     CaretakerDetailView,
     CaretakerListView,
+    CaretakerOverCapacityView,
     CaretakerUpdateView,
+    DogCaretakersView,
+    DashboardView,
     DogCreateView,
     DogDeleteView,
     DogDetailView,
+    DogExportView,
     DogListView,
+    DogPhotoChunkView,
+    DogPhotoUploadView,
     DogUpdateView,
     IndexView,
+    JobDetailView,
+    JobDownloadView,
+    JobListView,
+    MetricsView,
+    PhotoFileView,
     VaccineCreateView,
     VaccineDeleteView,
     VaccineUpdateView,
     VaccineListView,
+    VaccinationBulkCreateView,
     VaccinationCreateView,
     VaccinationDeleteView,
+    VaccinationDueView,
     VaccinationUpdateView,
 )
 
+if settings.SHELTER_ASYNC_VIEWS:
+    from shelter.async_views import (
+        AsyncBreedDetailView as BreedDetailView,
+        AsyncBreedListView as BreedListView,
+        AsyncDogDetailView as DogDetailView,
+        AsyncDogListView as DogListView,
+    )
+
 urlpatterns = [
     path("", IndexView.as_view(), name="index"),
+    path("dashboard/", DashboardView.as_view(), name="dashboard"),
     path("breeds/", BreedListView.as_view(), name="breed-list"),
     path("breeds/<int:pk>/", BreedDetailView.as_view(), name="breed-detail"),
     path("breeds/<int:pk>/update/", BreedUpdateView.as_view(), name="breed-update"),
@@ -44,13 +76,34 @@ urlpatterns = [
     path("dogs/", DogListView.as_view(), name="dog-list"),
     path("dogs/<int:pk>/", DogDetailView.as_view(), name="dog-detail"),
     path("dogs/create/", DogCreateView.as_view(), name="dog-create"),
+    path("dogs/export/", DogExportView.as_view(), name="dog-export"),
+    path("dogs/caretakers/", DogCaretakersView.as_view(), name="dog-caretakers"),
     path("dogs/<int:pk>/update/", DogUpdateView.as_view(), name="dog-update"),
     path("dogs/<int:pk>/delete/", DogDeleteView.as_view(), name="dog-delete"),
+    path(
+        "dogs/<int:pk>/photos/", DogPhotoUploadView.as_view(), name="dog-photo-upload"
+    ),
+    path(
+        "dogs/<int:pk>/photos/<uuid:upload_id>/",
+        DogPhotoChunkView.as_view(),
+        name="dog-photo-chunk",
+    ),
+    path("media/photos/<path:name>", PhotoFileView.as_view(), name="photo-file"),
     path("caretakers/", CaretakerListView.as_view(), name="caretaker-list"),
     path(
         "caretakers/<int:pk>/", CaretakerDetailView.as_view(), name="caretaker-detail"
     ),
     path("caretakers/create/", CaretakerCreateView.as_view(), name="caretaker-create"),
+    path(
+        "caretakers/over-capacity/",
+        CaretakerOverCapacityView.as_view(),
+        name="caretaker-over-capacity",
+    ),
+    path(
+        "caretakers/autocomplete/",
+        CaretakerAutocompleteView.as_view(),
+        name="caretaker-autocomplete",
+    ),
     path(
         "caretakers/<int:pk>/update/",
         CaretakerUpdateView.as_view(),
@@ -61,6 +114,12 @@ urlpatterns = [
         CaretakerDeleteView.as_view(),
         name="caretaker-delete",
     ),
+    path("vaccination/due/", VaccinationDueView.as_view(), name="vaccination-due"),
+    path(
+        "vaccination/bulk/",
+        VaccinationBulkCreateView.as_view(),
+        name="vaccination-bulk-create",
+    ),
     path(
         "vaccination/create/<int:dog_id>/",
         VaccinationCreateView.as_view(),
@@ -76,6 +135,50 @@ urlpatterns = [
         VaccinationDeleteView.as_view(),
         name="vaccination-delete",
     ),
+    path(
+        "api/dogs/",
+        ResourceListView.as_view(resource=DOGS),
+        name="api-dog-list",
+    ),
+    path(
+        "api/dogs/<int:pk>/",
+        ResourceDetailView.as_view(resource=DOGS),
+        name="api-dog-detail",
+    ),
+    path(
+        "api/breeds/",
+        ResourceListView.as_view(resource=BREEDS),
+        name="api-breed-list",
+    ),
+    path(
+        "api/breeds/<int:pk>/",
+        ResourceDetailView.as_view(resource=BREEDS),
+        name="api-breed-detail",
+    ),
+    path(
+        "api/vaccines/",
+        ResourceListView.as_view(resource=VACCINES),
+        name="api-vaccine-list",
+    ),
+    path(
+        "api/vaccines/<int:pk>/",
+        ResourceDetailView.as_view(resource=VACCINES),
+        name="api-vaccine-detail",
+    ),
+    path(
+        "api/vaccinations/",
+        ResourceListView.as_view(resource=VACCINATIONS),
+        name="api-vaccination-list",
+    ),
+    path(
+        "api/vaccinations/<int:pk>/",
+        ResourceDetailView.as_view(resource=VACCINATIONS),
+        name="api-vaccination-detail",
+    ),
+    path("jobs/", JobListView.as_view(), name="job-list"),
+    path("jobs/<int:pk>/", JobDetailView.as_view(), name="job-detail"),
+    path("jobs/<int:pk>/download/", JobDownloadView.as_view(), name="job-download"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
 
 app_name = "shelter"
@@ -1,33 +1,101 @@
-from typing import Any, Dict
+import hmac
+import os
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+from django.db.models import Count
 from django.db.models.query import QuerySet
-from django.http import HttpResponse
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.views import View, generic
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth import get_user_model
+from prometheus_client import CONTENT_TYPE_LATEST
+from shelter import jobs, metrics, photos, rollups, schedule
+from shelter.cache import CachedResponseMixin
+from shelter.caretaking import (
+    SELF_ACTIONS,
+    over_capacity,
+    toggle_caretaker,
+    with_workload,
+)
+from shelter.exports import EXPORT_FORMATS, export_stream
 from shelter.forms import (
     BreedSearchForm,
+    BulkVaccinationForm,
     CaretakerCreationForm,
     CaretakerSearchForm,
     CaretakerUpdateForm,
+    DogCaretakerAssignmentForm,
     DogForm,
     DogSearchForm,
 )
 
-from shelter.models import Breed, Caretaker, Dog, Vaccination, Vaccine
+from shelter.models import (
+    Breed,
+    Caretaker,
+    Dog,
+    DogPhoto,
+    Job,
+    ShelterStats,
+    Vaccination,
+    Vaccine,
+)
+from shelter.pagination import CursorPaginationMixin, CursorPaginator, InvalidCursor
+from shelter.search import search
+from shelter.timeline import vaccination_timeline
+from shelter.transactions import WriteTransactionMixin
+
+
+class IndexView(CachedResponseMixin, View):
+    cache_models = ("dog", "breed")
+    template_name = "shelter/index.html"
 
+    def get_context_data(self) -> Dict[str, Any]:
+        stats = ShelterStats.load()
+        return {"number_of_dogs": stats.total_dogs, "stats": stats}
 
-class IndexView(View):
     def get(self, request, *args, **kwargs) -> HttpResponse:
-        number_of_dogs = Dog.objects.count()
-        context = {"number_of_dogs": number_of_dogs}
-        return render(request, "shelter/index.html", context=context)
+        return render(request, self.template_name, context=self.get_context_data())
+
+
+class DashboardView(IndexView):
+    # Charts are read from the intake rollups, never from the Dog table.
+    cache_models = ("dog", "breed", "caretaker")
+    template_name = "shelter/dashboard.html"
+    months = 12
+    max_months = 60
+
+    def get_context_data(self) -> Dict[str, Any]:
+        context = super().get_context_data()
+        try:
+            months = int(self.request.GET.get("months", self.months))
+        except ValueError:
+            months = self.months
+        months = min(max(months, 1), self.max_months)
+        context["months"] = months
+        context["intake"] = rollups.dashboard(months, timezone.localdate())
+        return context
 
 
-class BreedListView(generic.ListView):
+class BreedListView(CachedResponseMixin, CursorPaginationMixin, generic.ListView):
+    cache_models = ("breed", "dog")
     model = Breed
     paginate_by = 15
+    cursor_ordering = ("name", "id")
     context_object_name = "breed_list"
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
@@ -37,19 +105,20 @@ class BreedListView(generic.ListView):
         return context
 
     def get_queryset(self) -> QuerySet[Any]:
-        queryset = Breed.objects.prefetch_related("dogs")
+        queryset = Breed.objects.all()
         form = BreedSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
+        if form.is_valid() and form.cleaned_data["name"]:
+            return search(queryset, form.cleaned_data["name"])
         return queryset
 
 
-class BreedDetailView(generic.DetailView):
+class BreedDetailView(CachedResponseMixin, generic.DetailView):
+    cache_models = ("breed", "dog")
     model = Breed
     queryset = Breed.objects.prefetch_related("dogs")
 
 
-class BreedCreateView(LoginRequiredMixin, generic.CreateView):
+class BreedCreateView(LoginRequiredMixin, WriteTransactionMixin, generic.CreateView):
     model = Breed
     fields = "__all__"
 
@@ -57,7 +126,7 @@ class BreedCreateView(LoginRequiredMixin, generic.CreateView):
         return self.object.get_absolute_url()
 
 
-class BreedUpdateView(LoginRequiredMixin, generic.UpdateView):
+class BreedUpdateView(LoginRequiredMixin, WriteTransactionMixin, generic.UpdateView):
     model = Breed
     fields = "__all__"
 
@@ -65,74 +134,253 @@ class BreedUpdateView(LoginRequiredMixin, generic.UpdateView):
         return self.object.get_absolute_url()
 
 
-class BreedDeleteView(LoginRequiredMixin, generic.DeleteView):
+class BreedDeleteView(LoginRequiredMixin, WriteTransactionMixin, generic.DeleteView):
     model = Breed
     success_url = reverse_lazy("shelter:breed-list")
 
 
-class VaccineListView(generic.ListView):
+class VaccineListView(CachedResponseMixin, generic.ListView):
+    cache_models = ("vaccine",)
     model = Vaccine
     context_object_name = "vaccine_list"
 
 
-class VaccineCreateView(LoginRequiredMixin, generic.CreateView):
+class VaccineCreateView(LoginRequiredMixin, WriteTransactionMixin, generic.CreateView):
     model = Vaccine
     fields = "__all__"
     success_url = reverse_lazy("shelter:vaccine-list")
 
 
-class VaccineUpdateView(LoginRequiredMixin, generic.UpdateView):
+class VaccineUpdateView(LoginRequiredMixin, WriteTransactionMixin, generic.UpdateView):
     model = Vaccine
     fields = "__all__"
     success_url = reverse_lazy("shelter:vaccine-list")
 
 
-class VaccineDeleteView(LoginRequiredMixin, generic.DeleteView):
+class VaccineDeleteView(LoginRequiredMixin, WriteTransactionMixin, generic.DeleteView):
     model = Vaccine
     success_url = reverse_lazy("shelter:vaccine-list")
 
 
-class DogListView(generic.ListView):
+class DogListView(CachedResponseMixin, CursorPaginationMixin, generic.ListView):
+    cache_models = ("dog", "breed", "caretaker")
     model = Dog
     context_object_name = "dog_list"
     paginate_by = 10
+    cursor_ordering = ("date_registered", "id")
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super(DogListView, self).get_context_data(**kwargs)
-        name = self.request.GET.get("name", "")
-        context["search_form"] = DogSearchForm(initial={"name": name})
+        self.search_form.add_facet_counts(Dog.objects.all())
+        context["search_form"] = self.search_form
         return context
 
     def get_queryset(self) -> QuerySet[Any]:
-        queryset = Dog.objects.select_related("breed")
-        form = DogSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
+        queryset = Dog.objects.select_related("breed", "cover_photo")
+        self.search_form = DogSearchForm(self.request.GET)
+        if self.search_form.is_valid():
+            return self.search_form.filter_queryset(queryset)
         return queryset
 
 
-class DogDetailView(generic.DetailView):
+class DogDetailView(CachedResponseMixin, WriteTransactionMixin, generic.DetailView):
+    cache_models = ("dog", "breed", "vaccine", "vaccination", "caretaker")
     model = Dog
+    queryset = Dog.objects.select_related("breed")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         dog = self.object
-        vaccinations = Vaccination.objects.filter(dog=dog)
-        context["vaccinations"] = vaccinations
+        user = self.request.user
+        # Callables, so the queries only run if their {% fragment %} misses.
+        context["caretakers"] = partial(list, dog.caretakers.all())
+        context["timeline"] = partial(vaccination_timeline, dog.pk)
+        context["photos"] = partial(
+            list, dog.photos.filter(status=DogPhoto.READY).order_by("uploaded_at")
+        )
+        context["is_caretaker"] = (
+            user.is_authenticated and dog.caretakers.filter(pk=user.pk).exists()
+        )
         return context
 
     def post(self, request, pk):
-        user = request.user
-        dog = get_object_or_404(Dog, pk=pk)
-
-        if user in dog.caretakers.all():
-            dog.caretakers.remove(user)
-        else:
-            dog.caretakers.add(user)
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if not Dog.objects.filter(pk=pk).exists():
+            raise Http404("No dog found matching the query")
+
+        toggle_caretaker(
+            pk, request.user.pk, SELF_ACTIONS.get(request.POST.get("action"))
+        )
         return redirect("shelter:dog-detail", pk)
 
 
-class DogCreateView(LoginRequiredMixin, generic.CreateView):
+class DogCaretakersView(PermissionRequiredMixin, WriteTransactionMixin, View):
+    permission_required = "shelter.change_dog"
+
+    def post(self, request, *args, **kwargs) -> JsonResponse:
+        form = DogCaretakerAssignmentForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        dog_ids = [dog.pk for dog in form.cleaned_data["dogs"]]
+        form.save(dog_ids)
+        return JsonResponse(
+            {
+                "operation": form.cleaned_data["operation"],
+                "dogs": dog_ids,
+                "caretakers": [
+                    caretaker.pk for caretaker in form.cleaned_data["caretakers"]
+                ],
+            }
+        )
+
+
+class DogPhotoUploadView(LoginRequiredMixin, View):
+    # Not a WriteTransactionMixin view: hashing and storing a large upload
+    # must not hold the database write lock.
+    def post(self, request, pk: int) -> HttpResponse:
+        dog = get_object_or_404(Dog, pk=pk)
+        uploads = request.FILES.getlist("photo")
+        if not uploads:
+            return JsonResponse({"error": "No photo uploaded"}, status=400)
+        try:
+            # Django spools large multipart files to disk while they arrive.
+            stored = [photos.store_photo(dog, upload) for upload in uploads]
+        except photos.PhotoError as error:
+            return error.response()
+        if request.accepts("text/html"):
+            return redirect("shelter:dog-detail", pk)
+        return JsonResponse(
+            {"photos": [photo_json(photo) for photo, _ in stored]},
+            status=201 if any(created for _, created in stored) else 200,
+        )
+
+
+class DogPhotoChunkView(LoginRequiredMixin, View):
+    """Resumable upload: PUT each chunk with Content-Range to the same id.
+
+    Answers 202 with the received length until the last chunk arrives, and
+    409 with it when a chunk doesn't continue the upload.
+    """
+
+    def put(self, request, pk: int, upload_id) -> JsonResponse:
+        dog = get_object_or_404(Dog, pk=pk)
+        try:
+            received, path = photos.append_chunk(
+                request.user.pk,
+                dog.pk,
+                str(upload_id),
+                request.headers.get("Content-Range"),
+                request,
+            )
+            if path is None:
+                return JsonResponse({"received": received}, status=202)
+            try:
+                with open(path, "rb") as upload:
+                    photo, created = photos.store_photo(dog, upload)
+            finally:
+                photos.discard_upload(path)
+        except photos.PhotoError as error:
+            return error.response()
+        return JsonResponse(photo_json(photo), status=201 if created else 200)
+
+
+def photo_json(photo: DogPhoto) -> Dict[str, Any]:
+    return {"id": photo.pk, "hash": photo.content_hash, "status": photo.status}
+
+
+class PhotoFileView(View):
+    """Serves stored photos. Names carry the content hash, so a name never
+    changes content and is cached for a year.
+    """
+
+    CONTENT_TYPES = {
+        ".jpg": "image/jpeg",
+        ".png": "image/png",
+        ".webp": "image/webp",
+        ".gif": "image/gif",
+    }
+
+    def get(self, request, name: str) -> HttpResponse:
+        name = f"photos/{name}"
+        if not photos.STORED_NAME.match(name) or not default_storage.exists(name):
+            raise Http404("No such photo")
+        etag = f'"{os.path.basename(name)}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "Accept-Ranges": "bytes",
+        }
+        if request.headers.get("If-None-Match") == etag:
+            return HttpResponseNotModified(headers=headers)
+
+        size = default_storage.size(name)
+        content_type = self.CONTENT_TYPES[os.path.splitext(name)[1]]
+        byte_range = None
+        if request.headers.get("If-Range", etag) == etag:
+            try:
+                byte_range = photos.parse_range(request.headers.get("Range"), size)
+            except ValueError:
+                return HttpResponse(
+                    status=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+                )
+        if byte_range is None:
+            return FileResponse(
+                default_storage.open(name), content_type=content_type, headers=headers
+            )
+        start, end = byte_range
+        return StreamingHttpResponse(
+            photos.file_range(default_storage.open(name), start, end),
+            status=206,
+            content_type=content_type,
+            headers={
+                **headers,
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+            },
+        )
+
+
+class DogExportView(LoginRequiredMixin, View):
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Unsupported export format")
+        compress = request.GET.get("compress") == "gzip"
+
+        queryset = Dog.objects.order_by("date_registered", "id")
+        form = DogSearchForm(request.GET)
+        if form.is_valid():
+            queryset = form.filter_queryset(queryset)
+
+        filename = f"dogs.{export_format}"
+        content_type = EXPORT_FORMATS[export_format]
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        response = StreamingHttpResponse(
+            export_stream(queryset, export_format, compress=compress),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        # The same export as GET, written to a file by a background job.
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest("Unsupported export format")
+        job = jobs.enqueue(
+            "shelter.export_dogs",
+            export_format=export_format,
+            compress=request.GET.get("compress") == "gzip",
+            query=request.GET.urlencode(),
+            created_by=request.user,
+        )
+        return job_accepted(request, job)
+
+
+class DogCreateView(LoginRequiredMixin, WriteTransactionMixin, generic.CreateView):
     model = Dog
     form_class = DogForm
 
@@ -140,7 +388,7 @@ class DogCreateView(LoginRequiredMixin, generic.CreateView):
         return self.object.get_absolute_url()
 
 
-class DogUpdateView(LoginRequiredMixin, generic.UpdateView):
+class DogUpdateView(LoginRequiredMixin, WriteTransactionMixin, generic.UpdateView):
     model = Dog
     form_class = DogForm
 
@@ -148,35 +396,117 @@ class DogUpdateView(LoginRequiredMixin, generic.UpdateView):
         return self.object.get_absolute_url()
 
 
-class DogDeleteView(LoginRequiredMixin, generic.DeleteView):
+class DogDeleteView(LoginRequiredMixin, WriteTransactionMixin, generic.DeleteView):
     model = Dog
     success_url = reverse_lazy("shelter:dog-list")
 
 
-class CaretakerListView(LoginRequiredMixin, generic.ListView):
+class CaretakerListView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = Caretaker
     paginate_by = 15
+    cursor_ordering = ("username", "id")
     context_object_name = "caretaker_list"
+    # Orderings for CaretakerSearchForm's sort choices; counts sort busiest
+    # first and the ids keep cursor pages stable.
+    sort_orderings = {"dogs": ("-dog_count", "username", "id")} | {
+        size: (f"-{size}_dogs", "username", "id") for size, _ in Breed.DOG_SIZES
+    }
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super(CaretakerListView, self).get_context_data(**kwargs)
-        username = self.request.GET.get("username", "")
-        context["search_form"] = CaretakerSearchForm(initial={"username": username})
+        context["search_form"] = CaretakerSearchForm(
+            initial={
+                "username": self.request.GET.get("username", ""),
+                "sort": self.request.GET.get("sort", ""),
+            }
+        )
         return context
 
+    def get_cursor_ordering(self, queryset) -> Optional[Tuple[str, ...]]:
+        sort = self.request.GET.get("sort")
+        if sort in self.sort_orderings:
+            return self.sort_orderings[sort]
+        return super().get_cursor_ordering(queryset)
+
     def get_queryset(self) -> QuerySet[Any]:
-        queryset = get_user_model().objects.all()
+        queryset = with_workload(get_user_model().objects.all())
         form = CaretakerSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(username__icontains=form.cleaned_data["username"])
-        return queryset
+        if form.is_valid() and form.cleaned_data["username"]:
+            queryset = search(queryset, form.cleaned_data["username"])
+        return queryset.order_by(*self.get_cursor_ordering(queryset))
+
+
+class CaretakerAutocompleteView(LoginRequiredMixin, View):
+    paginate_by = 20
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            return HttpResponseBadRequest("page must be an integer")
+        queryset = get_user_model().objects.only(
+            "id", "username", "first_name", "last_name", "expert_level"
+        )
+        term = request.GET.get("q", "").strip()
+        if term:
+            queryset = search(queryset, term).order_by("search_rank")
+        else:
+            queryset = queryset.order_by("username", "id")
+
+        # One extra row tells whether there is a next page without a COUNT.
+        start = (page - 1) * self.paginate_by
+        caretakers = list(queryset[start : start + self.paginate_by + 1])
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": caretaker.pk, "text": str(caretaker)}
+                    for caretaker in caretakers[: self.paginate_by]
+                ],
+                "more": len(caretakers) > self.paginate_by,
+            }
+        )
 
 
 class CaretakerDetailView(LoginRequiredMixin, generic.DetailView):
     model = Caretaker
+    paginate_dogs_by = 20
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return with_workload(get_user_model().objects.all())
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        dogs = self.object.dogs.select_related("breed")
+        paginator = CursorPaginator(
+            dogs, self.paginate_dogs_by, ("date_registered", "id")
+        )
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        context.update(
+            dog_list=page.object_list,
+            page_obj=page,
+            paginator=paginator,
+            is_paginated=page.has_other_pages(),
+        )
+        return context
+
+
+class CaretakerOverCapacityView(LoginRequiredMixin, generic.ListView):
+    context_object_name = "caretaker_list"
+    template_name = "shelter/caretaker_over_capacity.html"
 
+    def get_queryset(self) -> QuerySet[Any]:
+        return over_capacity(get_user_model().objects.all())
 
-class CaretakerCreateView(generic.CreateView):
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["capacity"] = settings.SHELTER_CARETAKER_CAPACITY
+        return context
+
+
+class CaretakerCreateView(WriteTransactionMixin, generic.CreateView):
     model = Caretaker
     form_class = CaretakerCreationForm
 
@@ -184,7 +514,9 @@ class CaretakerCreateView(generic.CreateView):
         return self.object.get_absolute_url()
 
 
-class CaretakerUpdateView(LoginRequiredMixin, generic.UpdateView):
+class CaretakerUpdateView(
+    LoginRequiredMixin, WriteTransactionMixin, generic.UpdateView
+):
     model = Caretaker
     form_class = CaretakerUpdateForm
 
@@ -192,12 +524,57 @@ class CaretakerUpdateView(LoginRequiredMixin, generic.UpdateView):
         return self.object.get_absolute_url()
 
 
-class CaretakerDeleteView(LoginRequiredMixin, generic.DeleteView):
+class CaretakerDeleteView(
+    LoginRequiredMixin, WriteTransactionMixin, generic.DeleteView
+):
     model = Caretaker
     success_url = reverse_lazy("shelter:caretaker-list")
 
 
-class VaccinationCreateView(LoginRequiredMixin, generic.CreateView):
+class VaccinationBulkCreateView(PermissionRequiredMixin, View):
+    permission_required = "shelter.add_vaccination"
+
+    def post(self, request, *args, **kwargs) -> HttpResponse:
+        form = BulkVaccinationForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": form.errors}, status=400)
+        job = jobs.enqueue(
+            "shelter.vaccinate_dogs",
+            dog_ids=[dog.pk for dog in form.cleaned_data["dogs"]],
+            vaccine_id=form.cleaned_data["vaccine"].pk,
+            vaccination_date=form.cleaned_data["vaccination_date"].isoformat(),
+            created_by=request.user,
+        )
+        return job_accepted(request, job)
+
+
+class VaccinationDueView(LoginRequiredMixin, CursorPaginationMixin, generic.ListView):
+    paginate_by = 50
+    cursor_ordering = ("next_due", "id")
+    context_object_name = "due_list"
+    template_name = "shelter/vaccination_due.html"
+
+    def get_upcoming_days(self) -> int:
+        default = settings.SHELTER_VACCINATION_UPCOMING_DAYS
+        try:
+            days = int(self.request.GET.get("days", default))
+        except ValueError:
+            days = default
+        return min(max(days, 0), 365)
+
+    def get_queryset(self) -> QuerySet[Any]:
+        return schedule.dashboard(timezone.localdate(), self.get_upcoming_days())
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["today"] = timezone.localdate()
+        context["days"] = self.get_upcoming_days()
+        return context
+
+
+class VaccinationCreateView(
+    LoginRequiredMixin, WriteTransactionMixin, generic.CreateView
+):
     model = Vaccination
     fields = ["vaccine", "vaccination_date"]
 
@@ -221,7 +598,9 @@ class VaccinationCreateView(LoginRequiredMixin, generic.CreateView):
         return context
 
 
-class VaccinationUpdateView(LoginRequiredMixin, generic.UpdateView):
+class VaccinationUpdateView(
+    LoginRequiredMixin, WriteTransactionMixin, generic.UpdateView
+):
     model = Vaccination
     fields = ["vaccine", "vaccination_date"]
 
@@ -249,7 +628,9 @@ class VaccinationUpdateView(LoginRequiredMixin, generic.UpdateView):
         return super().get_queryset().filter(dog_id=dog_id)
 
 
-class VaccinationDeleteView(LoginRequiredMixin, generic.DeleteView):
+class VaccinationDeleteView(
+    LoginRequiredMixin, WriteTransactionMixin, generic.DeleteView
+):
     model = Vaccination
 
     def get_success_url(self):
@@ -263,3 +644,112 @@ class VaccinationDeleteView(LoginRequiredMixin, generic.DeleteView):
         dog = get_object_or_404(Dog, id=dog_id)
         context["dog"] = dog
         return context
+
+
+def job_accepted(request, job: Job) -> HttpResponse:
+    # Answers as soon as the job is queued; clients poll its status.
+    if request.accepts("text/html"):
+        return redirect(job)
+    return JsonResponse(
+        job_json(job), status=202, headers={"Location": job.get_absolute_url()}
+    )
+
+
+def job_json(job: Job) -> Dict[str, Any]:
+    data = {
+        "id": job.pk,
+        "task": job.task,
+        "status": job.status,
+        "attempts": job.attempts,
+        "run_at": job.run_at,
+        "finished_at": job.finished_at,
+        "result": job.result,
+    }
+    if job.status == Job.DONE and (job.result or {}).get("file"):
+        data["download"] = reverse("shelter:job-download", args=[job.pk])
+    return data
+
+
+class JobListView(PermissionRequiredMixin, generic.ListView):
+    permission_required = "shelter.view_job"
+    model = Job
+    paginate_by = 50
+    template_name = "shelter/job_list.html"
+
+    def get_queryset(self) -> QuerySet[Any]:
+        queryset = Job.objects.all()
+        if self.request.GET.get("status") in dict(Job.STATUSES):
+            queryset = queryset.filter(status=self.request.GET["status"])
+        return queryset
+
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        now = timezone.now()
+        counts = dict(
+            Job.objects.values_list("status").annotate(count=Count("id")).order_by()
+        )
+        context["counts"] = [
+            (status, counts.get(status, 0)) for status, _ in Job.STATUSES
+        ]
+        context["oldest_due"] = (
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by("run_at")
+            .values_list("run_at", flat=True)
+            .first()
+        )
+        context["workers"] = (
+            Job.objects.filter(status=Job.RUNNING)
+            .values("worker")
+            .annotate(running=Count("id"))
+            .order_by("worker")
+        )
+        context["periodic"] = [
+            {**schedule, "name": name, "next_run": jobs.next_run(schedule["cron"], now)}
+            for name, schedule in settings.SHELTER_PERIODIC_JOBS.items()
+        ]
+        return context
+
+
+class JobDetailView(LoginRequiredMixin, View):
+    def get(self, request, pk: int) -> HttpResponse:
+        job = get_job(request, pk)
+        if request.accepts("text/html"):
+            context = {"job": job, "download": job_json(job).get("download")}
+            return render(request, "shelter/job_detail.html", context)
+        return JsonResponse(job_json(job))
+
+
+class JobDownloadView(LoginRequiredMixin, View):
+    def get(self, request, pk: int) -> HttpResponse:
+        job = get_job(request, pk)
+        if job.status != Job.DONE or not (job.result or {}).get("file"):
+            raise Http404("The job has no file")
+        return FileResponse(
+            default_storage.open(job.result["file"]),
+            as_attachment=True,
+            filename=job.result["filename"],
+            content_type=job.result["content_type"],
+        )
+
+
+def get_job(request, pk: int) -> Job:
+    # Users see the jobs they started; view_job shows every job.
+    job = get_object_or_404(Job, pk=pk)
+    if job.created_by_id != request.user.pk and not request.user.has_perm(
+        "shelter.view_job"
+    ):
+        raise Http404("No job found matching the query")
+    return job
+
+
+class MetricsView(View):
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        # Closed until a token is configured.
+        token = settings.SHELTER_METRICS_TOKEN
+        if not token:
+            return HttpResponseForbidden()
+        expected = f"Bearer {token}".encode()
+        given = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(given, expected):
+            return HttpResponse("Unauthorized", status=401)
+        return HttpResponse(metrics.render(), content_type=CONTENT_TYPE_LATEST)
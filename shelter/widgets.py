@@ -0,0 +1,44 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteSelectMultiple(forms.SelectMultiple):
+    """Multi-select for a ModelMultipleChoiceField over a large table.
+
+    Only the selected options are rendered; js/autocomplete.js fetches the
+    others from the JSON endpoint named by ``url_name`` as the user types.
+    """
+
+    class Media:
+        js = ["js/autocomplete.js"]
+
+    def __init__(self, url_name: str, attrs=None) -> None:
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["attrs"]["data-autocomplete-url"] = reverse(self.url_name)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        pks = [pk for pk in value if str(pk).isdigit()]
+        selected = field.queryset.filter(pk__in=pks) if pks else []
+        return [
+            (
+                None,
+                [
+                    self.create_option(
+                        name,
+                        field.prepare_value(obj),
+                        field.label_from_instance(obj),
+                        True,
+                        index,
+                        attrs=attrs,
+                    )
+                ],
+                index,
+            )
+            for index, obj in enumerate(selected)
+        ]
@@ -0,0 +1,76 @@
+// Adds a search box to every <select data-autocomplete-url>. Matches are
+// fetched a page at a time and picked ones are added to the select as
+// selected options; click a selected option to drop it.
+document.addEventListener("DOMContentLoaded", () => {
+  document.querySelectorAll("select[data-autocomplete-url]").forEach((select) => {
+    const input = document.createElement("input");
+    input.type = "search";
+    input.className = "form-control mb-1";
+    input.placeholder = "Type to search";
+    const results = document.createElement("div");
+    results.className = "list-group mb-2";
+    select.before(input, results);
+
+    let timer = null;
+    let query = "";
+    let page = 1;
+
+    const addOption = (item) => {
+      if (!select.querySelector(`option[value="${item.id}"]`)) {
+        select.add(new Option(item.text, item.id, true, true));
+      }
+    };
+
+    const load = async () => {
+      const url = new URL(select.dataset.autocompleteUrl, window.location.origin);
+      url.searchParams.set("q", query);
+      url.searchParams.set("page", page);
+      const response = await fetch(url, { headers: { Accept: "application/json" } });
+      const data = await response.json();
+      if (page === 1) {
+        results.replaceChildren();
+      }
+      results.querySelector(".autocomplete-more")?.remove();
+      data.results.forEach((item) => {
+        const button = document.createElement("button");
+        button.type = "button";
+        button.className = "list-group-item list-group-item-action";
+        button.textContent = item.text;
+        button.addEventListener("click", () => addOption(item));
+        results.append(button);
+      });
+      if (data.more) {
+        const more = document.createElement("button");
+        more.type = "button";
+        more.className = "list-group-item list-group-item-light autocomplete-more";
+        more.textContent = "More…";
+        more.addEventListener("click", () => {
+          page += 1;
+          load();
+        });
+        results.append(more);
+      }
+    };
+
+    input.addEventListener("input", () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => {
+        query = input.value.trim();
+        page = 1;
+        load();
+      }, 250);
+    });
+
+    select.addEventListener("mousedown", (event) => {
+      if (event.target.tagName === "OPTION") {
+        event.preventDefault();
+        event.target.remove();
+      }
+    });
+    select.form?.addEventListener("submit", () => {
+      Array.from(select.options).forEach((option) => {
+        option.selected = true;
+      });
+    });
+  });
+});